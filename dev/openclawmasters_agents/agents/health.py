@@ -0,0 +1,126 @@
+"""
+Health Probes — Cheap, Cached Service Checks for Heartbeats
+Runs service checks (LLM providers, ...) in parallel and keeps their results
+in a small JSON cache with a TTL, so heartbeats, dashboards and cron jobs can
+poll often without paying for a completion or waiting on the network each time.
+Agent availability is a module lookup (find_spec), not an import.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+HEALTH_CACHE_FILE = Path.home() / ".openclaw" / "cache" / "health.json"
+HEALTH_TTL_SECONDS = int(os.environ.get("HEALTH_TTL_SECONDS", "300"))
+FAILURE_TTL_SECONDS = 60     # failed checks are retried sooner
+PROBE_TIMEOUT = 5            # seconds per check
+
+_cache_lock = threading.Lock()
+
+
+def module_available(name):
+    """Whether module `name` can be found on the path, without importing it. Returns (ok, detail)."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError) as e:
+        return False, str(e)
+    return (True, "found") if spec is not None else (False, f"module {name} not found")
+
+
+def llm_checks(timeout=PROBE_TIMEOUT):
+    """One probe per configured LLM provider, for probe(): {"llm:<provider>": check}."""
+    from agents import llm
+    return {f"llm:{name}": (lambda name=name: llm.probe_provider(name, timeout)) for name in llm.providers()}
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file, entries):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp, cache_file)
+
+
+def _fresh(entry, ttl, now):
+    age = now - entry.get("checked_at", 0)
+    return age < (ttl if entry.get("ok") else min(ttl, FAILURE_TTL_SECONDS))
+
+
+def probe(checks, ttl=HEALTH_TTL_SECONDS, force=False, timeout=PROBE_TIMEOUT, cache_file=HEALTH_CACHE_FILE):
+    """
+    Run `checks` ({name: callable returning (ok, detail)}) in parallel, serving
+    results younger than `ttl` seconds from the cache (failures: at most
+    FAILURE_TTL_SECONDS). A check still running after `timeout` counts as failed.
+
+    Returns:
+        {name: {"ok", "detail", "latency", "checked_at", "cached"}}
+    """
+    now = time.time()
+    with _cache_lock:
+        cached = _load_cache(cache_file) if cache_file else {}
+    results = {name: dict(cached[name], cached=True) for name in checks
+               if not force and name in cached and _fresh(cached[name], ttl, now)}
+    stale = [name for name in checks if name not in results]
+    if not stale:
+        return results
+
+    def run(name):
+        started = time.monotonic()
+        try:
+            ok, detail = checks[name]()
+        except Exception as e:
+            ok, detail = False, f"check failed: {e}"
+        return {"ok": bool(ok), "detail": detail, "latency": round(time.monotonic() - started, 3)}
+
+    executor = ThreadPoolExecutor(max_workers=len(stale))
+    futures = {executor.submit(run, name): name for name in stale}
+    done, _ = wait(futures, timeout=timeout)
+    executor.shutdown(wait=False)
+    checked_at = time.time()
+    fresh = {}
+    for future, name in futures.items():
+        if future in done:
+            fresh[name] = dict(future.result(), checked_at=checked_at)
+        else:
+            fresh[name] = {"ok": False, "detail": f"timed out after {timeout}s",
+                           "latency": timeout, "checked_at": checked_at}
+
+    if cache_file:
+        with _cache_lock:
+            entries = _load_cache(cache_file)
+            entries.update(fresh)
+            _save_cache(cache_file, entries)
+    results.update({name: dict(entry, cached=False) for name, entry in fresh.items()})
+    return results
+
+
+def summary(results):
+    """One line per check for heartbeat output."""
+    lines = []
+    for name, entry in sorted(results.items()):
+        age = ""
+        if entry.get("cached"):
+            checked = datetime.fromtimestamp(entry["checked_at"], timezone.utc)
+            age = f", checked {checked.strftime('%H:%M UTC')}"
+        lines.append(f"{name}: {'ok' if entry['ok'] else 'FAIL'} ({entry['detail']}{age})")
+    return lines
+
+
+if __name__ == "__main__":
+    import sys
+    for line in summary(probe(llm_checks(), force="--force" in sys.argv)):
+        print(f"  {line}")
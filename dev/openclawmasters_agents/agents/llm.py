@@ -0,0 +1,455 @@
+"""
+LLM Gateway — Shared Completion Access for OpenClawMasters Agents
+One entry point for every agent's LLM calls: OpenAI-compatible providers
+(Z.ai, DeepSeek, local Ollama) tried in order with failover, a global
+concurrency limit, per-provider rate limits, an optional response cache
+and per-call accounting (provider, tokens, latency).
+
+    generate(prompt, system=None, max_tokens=1024, temperature=0.7, prefer=None) -> str | None
+             (deadline=seconds bounds the whole call, retries and failover included)
+    agenerate(...)        — awaitable generate
+    generate_stream(...)  — yields text chunks as they arrive
+
+Provider base URLs, keys and models come from the environment (ZAI_BASE_URL,
+ZAI_API_KEY, ZAI_MODEL, ...), so any OpenAI-compatible server can stand in.
+"""
+
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+
+
+PROVIDERS = {
+    "zai": {
+        "base_url": os.environ.get("ZAI_BASE_URL", "https://api.z.ai/api/paas/v4"),
+        "api_key": os.environ.get("ZAI_API_KEY"),
+        "model": os.environ.get("ZAI_MODEL", "glm-4.5"),
+        "rpm": int(os.environ.get("ZAI_RPM", "60")),
+    },
+    "deepseek": {
+        "base_url": os.environ.get("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1"),
+        "api_key": os.environ.get("DEEPSEEK_API_KEY"),
+        "model": os.environ.get("DEEPSEEK_MODEL", "deepseek-chat"),
+        "rpm": int(os.environ.get("DEEPSEEK_RPM", "60")),
+    },
+    "ollama": {
+        "base_url": os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
+        "api_key": None,  # local server, no key
+        "model": os.environ.get("OLLAMA_MODEL", "llama3.1"),
+        "rpm": int(os.environ.get("OLLAMA_RPM", "600")),
+    },
+}
+PROVIDER_ORDER = [p.strip() for p in os.environ.get("LLM_PROVIDER_ORDER", "zai,deepseek,ollama").split(",")
+                  if p.strip() in PROVIDERS]
+
+MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))   # calls in flight, all providers
+REQUEST_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+RETRIES_PER_PROVIDER = 2        # extra attempts on 429 / 5xx / network errors before failing over
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 20.0
+PROVIDER_COOLDOWN_SECONDS = 60  # a provider that just failed is tried last for this long
+
+# Response cache, off unless LLM_CACHE=1 or generate(..., cache=True)
+CACHE_ENABLED = os.environ.get("LLM_CACHE", "0") == "1"
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 24 * 3600
+
+# Per-call accounting: recent calls in memory, optionally appended to a JSONL file
+CALL_LOG_SIZE = 1000
+USAGE_LOG_FILE = os.environ.get("LLM_USAGE_LOG")
+
+_semaphore = threading.BoundedSemaphore(MAX_CONCURRENCY)
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_calls = deque(maxlen=CALL_LOG_SIZE)
+_totals = {}
+_accounting_lock = threading.Lock()
+_failed_at = {}
+
+
+class _ProviderError(Exception):
+    """A failed provider request; `retryable` errors are retried before failing over."""
+
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class _RateLimiter:
+    """Token bucket allowing `rpm` requests per minute (bursts up to rpm)."""
+
+    def __init__(self, rpm):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, float(rpm))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, end=None):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if end is not None and now + wait >= end:
+                raise _ProviderError("deadline exceeded waiting for rate limit")
+            time.sleep(wait)
+
+
+_limiters = {name: _RateLimiter(cfg["rpm"]) for name, cfg in PROVIDERS.items()}
+
+
+def _enabled(name):
+    """Hosted providers need an API key; Ollama is always worth a try."""
+    return name in PROVIDERS and (name == "ollama" or bool(PROVIDERS[name]["api_key"]))
+
+
+def _provider_order(prefer=None):
+    """Providers to try: `prefer` first, recently failed ones last."""
+    names = [n for n in PROVIDER_ORDER if _enabled(n)]
+    if prefer in names:
+        names.remove(prefer)
+        names.insert(0, prefer)
+    cutoff = time.monotonic() - PROVIDER_COOLDOWN_SECONDS
+    healthy = [n for n in names if _failed_at.get(n, 0) < cutoff]
+    return healthy + [n for n in names if n not in healthy]
+
+
+def _messages(prompt, system):
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _remaining(timeout, end):
+    """Per-request timeout, capped by what is left before `end` (monotonic; None = no deadline)."""
+    if end is None:
+        return timeout
+    left = end - time.monotonic()
+    if left <= 0:
+        raise _ProviderError("deadline exceeded")
+    return min(timeout, left)
+
+
+def _open(name, payload, timeout, end=None):
+    """POST a chat completion to one provider. Returns the open HTTP response."""
+    cfg = PROVIDERS[name]
+    headers = {"Content-Type": "application/json"}
+    if cfg["api_key"]:
+        headers["Authorization"] = f"Bearer {cfg['api_key']}"
+    request = urllib.request.Request(
+        cfg["base_url"].rstrip("/") + "/chat/completions",
+        data=json.dumps(dict(payload, model=cfg["model"])).encode("utf-8"),
+        headers=headers,
+        method="POST",
+    )
+    _limiters[name].acquire(end)
+    try:
+        return urllib.request.urlopen(request, timeout=_remaining(timeout, end))
+    except urllib.error.HTTPError as e:
+        retry_after = e.headers.get("Retry-After") if e.headers else None
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None
+        e.close()
+        raise _ProviderError(f"HTTP {e.code}", retryable=e.code == 429 or e.code >= 500,
+                             retry_after=retry_after)
+    except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+        raise _ProviderError(str(getattr(e, "reason", e)) or type(e).__name__, retryable=True)
+
+
+def _with_retries(name, attempt, end=None):
+    """
+    Run `attempt()` against one provider, retrying retryable errors with jittered
+    backoff; a retry that could not start before `end` (monotonic) is not made.
+    """
+    for retry in range(RETRIES_PER_PROVIDER + 1):
+        try:
+            return attempt()
+        except _ProviderError as e:
+            if not e.retryable or retry == RETRIES_PER_PROVIDER:
+                raise
+            delay = e.retry_after or random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** retry))
+            delay = min(delay, RETRY_MAX_SECONDS)
+            if end is not None and time.monotonic() + delay >= end:
+                raise
+            time.sleep(delay)
+
+
+def _record(provider, started, prompt_tokens=None, completion_tokens=None, ok=True,
+            cached=False, stream=False, error=None):
+    """Account one call (or one failed provider attempt)."""
+    entry = {
+        "provider": provider,
+        "model": PROVIDERS[provider]["model"] if provider in PROVIDERS else None,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency": round(time.monotonic() - started, 3),
+        "ok": ok,
+        "cached": cached,
+        "stream": stream,
+        "error": error,
+        "at": time.time(),
+    }
+    with _accounting_lock:
+        _calls.append(entry)
+        totals = _totals.setdefault(provider, {"calls": 0, "failures": 0, "cached": 0,
+                                               "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0})
+        totals["calls"] += 1
+        totals["failures"] += 0 if ok else 1
+        totals["cached"] += 1 if cached else 0
+        totals["prompt_tokens"] += prompt_tokens or 0
+        totals["completion_tokens"] += completion_tokens or 0
+        totals["latency"] += entry["latency"]
+        if not ok:
+            _failed_at[provider] = time.monotonic()
+        if USAGE_LOG_FILE:
+            with open(USAGE_LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def usage():
+    """Totals per provider since start: calls, failures, cached, tokens, latency."""
+    with _accounting_lock:
+        return {name: dict(totals, latency=round(totals["latency"], 3)) for name, totals in _totals.items()}
+
+
+def recent_calls(n=20):
+    """The last `n` accounted calls, oldest first."""
+    with _accounting_lock:
+        return list(_calls)[-n:]
+
+
+def _cache_key(prompt, system, max_tokens, temperature, prefer):
+    material = json.dumps([prompt, system, max_tokens, temperature, prefer])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > CACHE_TTL_SECONDS:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key, text):
+    with _cache_lock:
+        _cache[key] = (time.time(), text)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _acquire_slot(end):
+    """Take a concurrency slot, giving up at `end` (monotonic). Returns True if taken."""
+    if end is None:
+        return _semaphore.acquire()
+    return _semaphore.acquire(timeout=max(0.0, end - time.monotonic()))
+
+
+def generate(prompt, system=None, max_tokens=1024, temperature=0.7, prefer=None,
+             timeout=REQUEST_TIMEOUT, cache=None, deadline=None):
+    """
+    Complete `prompt`, failing over between providers.
+
+    Args:
+        prompt: User message
+        system: Optional system message
+        max_tokens, temperature: Passed to the provider
+        prefer: Provider name to try first ("zai", "deepseek", "ollama")
+        timeout: Seconds per HTTP request
+        cache: Serve/store identical requests from the response cache
+               (default: LLM_CACHE env)
+        deadline: Seconds the whole call may take, waiting for a slot, retries and
+                  failover included (None: bounded only per request by `timeout`)
+
+    Returns:
+        Completion text, or None when every provider failed (or the deadline passed)
+    """
+    end = None if deadline is None else time.monotonic() + deadline
+    use_cache = CACHE_ENABLED if cache is None else cache
+    key = _cache_key(prompt, system, max_tokens, temperature, prefer) if use_cache else None
+    if key:
+        cached = _cache_get(key)
+        if cached is not None:
+            _record("cache", time.monotonic(), cached=True)
+            return cached
+
+    payload = {"messages": _messages(prompt, system), "max_tokens": max_tokens, "temperature": temperature}
+    if not _acquire_slot(end):
+        return None
+    try:
+        for name in _provider_order(prefer):
+            if end is not None and time.monotonic() >= end:
+                break
+            text = _complete(name, payload, timeout, end=end)
+            if text:
+                if key:
+                    _cache_put(key, text)
+                return text
+    finally:
+        _semaphore.release()
+    return None
+
+
+def _complete(name, payload, timeout, retries=True, end=None):
+    """One chat completion from one provider, accounted. Returns the text or None."""
+    started = time.monotonic()
+
+    def attempt():
+        with _open(name, payload, timeout, end) as response:
+            try:
+                return json.loads(response.read().decode("utf-8"))
+            except ValueError:
+                raise _ProviderError("invalid JSON response", retryable=True)
+            except (OSError, http.client.HTTPException) as e:
+                # Timeouts, resets and truncated bodies while reading the response
+                raise _ProviderError(f"read failed: {str(e) or type(e).__name__}", retryable=True)
+
+    try:
+        data = _with_retries(name, attempt, end) if retries else attempt()
+        text = data["choices"][0]["message"]["content"]
+    except _ProviderError as e:
+        _record(name, started, ok=False, error=str(e))
+        return None
+    except (KeyError, IndexError, TypeError):
+        _record(name, started, ok=False, error="unexpected response shape")
+        return None
+    if not text:
+        _record(name, started, ok=False, error="empty completion")
+        return None
+    usage_info = data.get("usage") or {}
+    _record(name, started, usage_info.get("prompt_tokens"), usage_info.get("completion_tokens"))
+    return text
+
+
+async def agenerate(prompt, system=None, max_tokens=1024, temperature=0.7, prefer=None,
+                    timeout=REQUEST_TIMEOUT, cache=None, deadline=None):
+    """generate() for asyncio code; runs in a worker thread under the same limits."""
+    return await asyncio.to_thread(generate, prompt, system, max_tokens, temperature, prefer,
+                                   timeout, cache, deadline)
+
+
+def _sse_deltas(response):
+    """Text deltas (and the final usage, if sent) from an OpenAI-style event stream."""
+    for raw in response:
+        line = raw.decode("utf-8", "replace").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if event.get("usage"):
+            yield None, event["usage"]
+        for choice in event.get("choices") or []:
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                yield delta, None
+
+
+def generate_stream(prompt, system=None, max_tokens=1024, temperature=0.7, prefer=None,
+                    timeout=REQUEST_TIMEOUT, deadline=None):
+    """
+    Stream a completion as text chunks. Fails over between providers until the
+    first chunk arrives; after that a broken stream just ends. `deadline` bounds
+    the time spent getting a stream open (retries and failover included); reading
+    it is up to the caller, `timeout` per read. Closing the generator early
+    closes the connection (the provider stops generating). Token counts are the provider's final usage chunk (None when it sent none,
+    e.g. a stream closed early).
+    """
+    payload = {"messages": _messages(prompt, system), "max_tokens": max_tokens,
+               "temperature": temperature, "stream": True, "stream_options": {"include_usage": True}}
+    end = None if deadline is None else time.monotonic() + deadline
+    if not _acquire_slot(end):
+        return
+    try:
+        for name in _provider_order(prefer):
+            if end is not None and time.monotonic() >= end:
+                break
+            started = time.monotonic()
+            try:
+                response = _with_retries(name, lambda: _open(name, payload, timeout, end), end)
+            except _ProviderError as e:
+                _record(name, started, ok=False, stream=True, error=str(e))
+                continue
+            chunks, reported, error = 0, {}, None
+            try:
+                for delta, usage_info in _sse_deltas(response):
+                    if usage_info:
+                        reported = usage_info
+                        continue
+                    chunks += 1
+                    yield delta
+            except (OSError, http.client.HTTPException) as e:
+                # Before the first chunk this fails over to the next provider
+                error = f"read failed: {str(e) or type(e).__name__}"
+            finally:
+                response.close()
+                _record(name, started, reported.get("prompt_tokens"),
+                        reported.get("completion_tokens"), ok=bool(chunks),
+                        stream=True, error=error or (None if chunks else "empty completion"))
+            if chunks:
+                return
+    finally:
+        _semaphore.release()
+
+
+def providers():
+    """Names of the configured providers, in failover order."""
+    return [n for n in PROVIDER_ORDER if _enabled(n)]
+
+
+def probe_provider(name, timeout=5):
+    """
+    Cheap liveness check for one provider: GET {base_url}/models, which costs
+    nothing. Only a server without a models endpoint (404/405) gets a tiny
+    completion instead. Returns (ok, detail).
+    """
+    cfg = PROVIDERS[name]
+    headers = {"Authorization": f"Bearer {cfg['api_key']}"} if cfg["api_key"] else {}
+    request = urllib.request.Request(cfg["base_url"].rstrip("/") + "/models", headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read(65536)
+        return True, "models endpoint"
+    except urllib.error.HTTPError as e:
+        e.close()
+        if e.code not in (404, 405):
+            return False, f"models endpoint: HTTP {e.code}"
+    except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+        return False, str(getattr(e, "reason", e))
+    payload = {"messages": _messages("Say OK", None), "max_tokens": 5, "temperature": 0}
+    if _complete(name, payload, timeout, retries=False) is not None:
+        return True, "completion"
+    return False, "completion failed"
+
+
+if __name__ == "__main__":
+    import sys
+    text = generate(" ".join(sys.argv[1:]) or "Say OK", max_tokens=20, temperature=0)
+    print(text)
+    print(json.dumps(usage(), indent=2))
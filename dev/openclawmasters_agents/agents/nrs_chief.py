@@ -11,35 +11,14 @@ from pathlib import Path
 
 
 SQUADRON_DIR = Path.home() / ".openclaw" / "squadrons" / "nrs-v2"
-STATE_FILE = SQUADRON_DIR / "data" / "state.json"
 HEARTBEAT_LOG_DIR = SQUADRON_DIR / "logs"
 TARGETS_FILE = SQUADRON_DIR / "config" / "targets.json"
-QUEUE_DIR = Path("content/queue/nrs")
-APPROVED_DIR = Path("content/approved/nrs")
-SENT_DIR = Path("content/sent/nrs")
 
 
 def _load_state():
-    """Load current squadron state."""
-    if STATE_FILE.exists():
-        with open(STATE_FILE) as f:
-            return json.load(f)
-    return {
-        "last_run": None,
-        "last_heartbeat": None,
-        "total_scans": 0,
-        "total_findings": 0,
-        "total_outreach_queued": 0,
-        "total_outreach_sent": 0,
-        "status": "initialized",
-    }
-
-
-def _save_state(state):
-    """Persist squadron state."""
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2, default=str)
+    """Load current squadron state (SQLite state store; state.json is migrated once)."""
+    from agents import nrs_state
+    return nrs_state.get_state()
 
 
 def _load_targets():
@@ -66,14 +45,16 @@ def _load_targets_config():
     return {"settings": {}, "pools": []}
 
 
-def _check_llm():
-    """Verify LLM availability."""
+def _check_llm(force=False):
+    """
+    Probe LLM providers via their model-list endpoints (cached, see agents.health).
+    Returns {"llm:<provider>": result}; empty when no provider is configured.
+    """
     try:
-        from agents.llm import generate
-        result = generate("Say OK", max_tokens=5, temperature=0)
-        return result is not None
-    except Exception:
-        return False
+        from agents import health
+        return health.probe(health.llm_checks(), force=force)
+    except Exception as e:
+        return {"llm": {"ok": False, "detail": str(e)}}
 
 
 def _check_email_config():
@@ -84,29 +65,37 @@ def _check_email_config():
 
 def _count_queue():
     """Count pending outreach in queue."""
-    if QUEUE_DIR.exists():
-        return len(list(QUEUE_DIR.glob("*.json")))
-    return 0
+    from agents import nrs_queue
+    return nrs_queue.count("queued")
 
 
 def _count_approved():
     """Count approved outreach ready to send."""
-    if APPROVED_DIR.exists():
-        return len(list(APPROVED_DIR.glob("*.json")))
-    return 0
+    from agents import nrs_queue
+    return nrs_queue.count("approved")
 
 
 def _count_sent():
     """Count sent outreach."""
-    if SENT_DIR.exists():
-        return len(list(SENT_DIR.glob("*.json")))
-    return 0
+    from agents import nrs_queue
+    return nrs_queue.count("sent")
 
 
-def heartbeat():
+def _sync_queue():
+    """Pick up Governor decisions (files moved between queue/approved/sent dirs, or deleted)."""
+    try:
+        from agents import nrs_queue
+        return nrs_queue.import_dirs()
+    except Exception as e:
+        print(f"  Queue sync failed: {e}")
+        return None
+
+
+def heartbeat(force=False):
     """
     Daily heartbeat check.
     Returns status of all sub-agents and pending/sent outreach stats.
+    Provider probes are served from the health cache unless `force`.
     """
     print("\n" + "=" * 60)
     print("  NRS v2 — Daily Heartbeat")
@@ -122,26 +111,32 @@ def heartbeat():
         "issues": [],
     }
 
-    # Check agent availability
-    agents = ["nrs_scanner", "nrs_ranker", "nrs_enricher", "nrs_outreach"]
+    # Check agent availability (module lookup, no import)
+    from agents.health import module_available
+    agents = ["nrs_scanner", "nrs_ranker", "nrs_enricher", "nrs_outreach", "nrs_sender"]
     for agent_name in agents:
-        try:
-            __import__(f"agents.{agent_name}")
+        ok, detail = module_available(f"agents.{agent_name}")
+        if ok:
             hb["agents"][agent_name] = "available"
             print(f"  {agent_name}: available")
-        except ImportError as e:
-            hb["agents"][agent_name] = f"error: {e}"
-            hb["issues"].append(f"{agent_name} import failed: {e}")
+        else:
+            hb["agents"][agent_name] = f"error: {detail}"
+            hb["issues"].append(f"{agent_name} not found: {detail}")
             hb["status"] = "degraded"
-            print(f"  {agent_name}: ERROR — {e}")
+            print(f"  {agent_name}: ERROR — {detail}")
 
-    # Check LLM
-    llm_ok = _check_llm()
+    # Check LLM providers (parallel, cached probes)
+    probes = _check_llm(force=force)
+    llm_ok = any(result["ok"] for result in probes.values())
     hb["agents"]["llm"] = "available" if llm_ok else "unavailable"
+    hb["probes"] = probes
     if not llm_ok:
-        hb["issues"].append("LLM provider unavailable")
+        hb["issues"].append("LLM provider unavailable" if probes else "No LLM provider configured")
         hb["status"] = "degraded"
     print(f"  LLM: {'available' if llm_ok else 'UNAVAILABLE'}")
+    for name, result in sorted(probes.items()):
+        print(f"    {name}: {'ok' if result['ok'] else 'FAIL'} ({result['detail']}"
+              f"{', cached' if result.get('cached') else ''})")
 
     # Check email config
     email_ok = _check_email_config()
@@ -150,6 +145,14 @@ def heartbeat():
         hb["issues"].append("Email configuration missing")
     print(f"  Email: {'configured' if email_ok else 'NOT CONFIGURED'}")
 
+    # Governor approvals happen on the exported files; fold them into the store
+    sync = _sync_queue()
+    if sync is None:
+        hb["issues"].append("Outreach store sync failed")
+    elif sync["added"] or sync["moved"] or sync["rejected"]:
+        print(f"  Queue sync: {sync['added']} added, {sync['moved']} moved forward, "
+              f"{sync['rejected']} rejected")
+
     # Stats
     targets = _load_targets()
     config = _load_targets_config()
@@ -188,9 +191,8 @@ def heartbeat():
         json.dump(hb, f, indent=2, default=str)
 
     # Update state
-    state["last_heartbeat"] = hb["timestamp"]
-    state["status"] = hb["status"]
-    _save_state(state)
+    from agents import nrs_state
+    nrs_state.update_state(last_heartbeat=hb["timestamp"], status=hb["status"])
 
     print("=" * 60)
     return hb
@@ -211,10 +213,9 @@ def run_pipeline(targets=None):
 
     from agents.nrs_scanner import run as scan
     from agents.nrs_ranker import run as rank
-    from agents.nrs_enricher import run as enrich
-    from agents.nrs_outreach import run as outreach
-
-    state = _load_state()
+    from agents.nrs_enricher import run as enrich, RUN_STATS as enrich_stats
+    from agents.nrs_outreach import run as outreach, RUN_STATS as outreach_stats
+    from agents import nrs_state
 
     run_log = {
         "started_at": datetime.now(timezone.utc).isoformat(),
@@ -224,6 +225,7 @@ def run_pipeline(targets=None):
         "findings_ranked": 0,
         "findings_enriched": 0,
         "outreach_queued": 0,
+        "outreach_suppressed": 0,
         "errors": [],
     }
 
@@ -247,6 +249,10 @@ def run_pipeline(targets=None):
     try:
         findings = scan(targets)
         run_log["findings_total"] = len(findings)
+        by_domain = {t["domain"]: 0 for t in targets}
+        for finding in findings:
+            by_domain[finding.get("domain")] = by_domain.get(finding.get("domain"), 0) + 1
+        run_log["findings_by_domain"] = by_domain
     except Exception as e:
         print(f"  FATAL: Scanner failed: {e}")
         run_log["status"] = "failed"
@@ -279,6 +285,7 @@ def run_pipeline(targets=None):
     try:
         enriched = enrich(ranked)
         run_log["findings_enriched"] = len(enriched)
+        run_log["enrichment"] = dict(enrich_stats)
     except Exception as e:
         print(f"  WARNING: Enricher failed: {e}")
         enriched = ranked  # Continue with unenriched data
@@ -289,6 +296,8 @@ def run_pipeline(targets=None):
     try:
         outreach_results = outreach(enriched)
         run_log["outreach_queued"] = len(outreach_results)
+        run_log["outreach"] = dict(outreach_stats)
+        run_log["outreach_suppressed"] = len(outreach_stats.get("suppressed", []))
     except Exception as e:
         print(f"  WARNING: Outreach composer failed: {e}")
         run_log["errors"].append(f"outreach: {e}")
@@ -297,20 +306,27 @@ def run_pipeline(targets=None):
     run_log["status"] = "complete"
     run_log["finished_at"] = datetime.now(timezone.utc).isoformat()
 
-    # Update state
-    state["last_run"] = run_log["started_at"]
-    state["total_scans"] = state.get("total_scans", 0) + run_log["targets_scanned"]
-    state["total_findings"] = state.get("total_findings", 0) + run_log["findings_total"]
-    state["total_outreach_queued"] = state.get("total_outreach_queued", 0) + run_log["outreach_queued"]
-    state["status"] = "active"
-    _save_state(state)
+    # Update state (counters are incremented in place, so overlapping runs add up)
+    nrs_state.update_state(
+        {
+            "total_scans": run_log["targets_scanned"],
+            "total_findings": run_log["findings_total"],
+            "total_outreach_queued": run_log["outreach_queued"],
+        },
+        last_run=run_log["started_at"],
+        status="active",
+    )
+    nrs_state.log_run("pipeline", run_log)
 
     # Summary
     print("\n" + "=" * 60)
     print("  Pipeline Complete")
     print(f"  Scanned: {run_log['targets_scanned']} | Found: {run_log['findings_total']} | "
           f"Ranked: {run_log['findings_ranked']} | Enriched: {run_log['findings_enriched']} | "
-          f"Queued: {run_log['outreach_queued']}")
+          f"Queued: {run_log['outreach_queued']} | Suppressed: {run_log['outreach_suppressed']}")
+    for item in run_log.get("outreach", {}).get("suppressed", []):
+        print(f"    suppressed {item['company']} / {item['finding_type']} "
+              f"(already {item['existing_status']}, #{item['existing_id']})")
     if run_log["errors"]:
         print(f"  Errors: {len(run_log['errors'])}")
     print("=" * 60)
@@ -318,6 +334,32 @@ def run_pipeline(targets=None):
     return run_log
 
 
+def send(limit=None, retry_failed=False):
+    """
+    Send Governor-approved outreach and count it in the squadron state
+    (`retry_failed` also retries letters that failed before, see nrs_sender).
+    Returns the sender stats.
+    """
+    from agents.nrs_sender import run as send_approved, RUN_STATS as sender_stats
+
+    print("\n" + "=" * 60)
+    print("  NRS v2 — Send Approved Outreach")
+    print("=" * 60)
+
+    from agents import nrs_state
+    started_at = datetime.now(timezone.utc).isoformat()
+    sent = send_approved(limit=limit, retry_failed=retry_failed)
+    if sent:
+        nrs_state.update_state({"total_outreach_sent": len(sent)})
+    nrs_state.log_run("send", dict(sender_stats, started_at=started_at,
+                                   finished_at=datetime.now(timezone.utc).isoformat()))
+
+    print(f"  Sent: {sender_stats.get('sent', 0)} | Failed: {sender_stats.get('failed', 0)} | "
+          f"Retries: {sender_stats.get('retries', 0)} | SMTP sessions: {sender_stats.get('sessions', 0)}")
+    print("=" * 60)
+    return dict(sender_stats)
+
+
 def status():
     """Show current squadron status."""
     state = _load_state()
@@ -336,10 +378,12 @@ def run(mode="pipeline"):
     Main entry point.
 
     Args:
-        mode: "pipeline" | "heartbeat" | "status"
+        mode: "pipeline" | "heartbeat" | "status" | "send"
     """
     if mode == "heartbeat":
         return heartbeat()
+    elif mode == "send":
+        return send()
     elif mode == "status":
         return status()
     else:
@@ -4,15 +4,57 @@ Discovers contacts for dual targeting: responsible dept + dept above.
 Sources: WHOIS/RDAP, company website, email pattern discovery.
 """
 
+import atexit
+import codecs
+import contextvars
 import json
+import os
 import re
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
 import urllib.request
 import urllib.error
-from datetime import datetime, timezone
+import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
 
 
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 TIMEOUT = 8
+MAX_PAGE_BYTES = 2_000_000   # bytes read per page; corporate pages past this are mostly assets
+PAGE_CHUNK_BYTES = 65536
+ENOUGH_CONTACTS = 10         # stop reading a page once this many contacts are found
+
+# Stats for the last run() — read by nrs_chief for the run log
+RUN_STATS = {}
+
+# Network requests issued by this module (see _count_request); _request_counter
+# additionally counts the requests of one call (see _counting_requests)
+_network = {"requests": 0}
+_network_lock = threading.Lock()
+_request_counter = contextvars.ContextVar("nrs_enricher_requests", default=None)
+# Page fetches of one call that timed out or lost the connection (see _counting_fetch_errors)
+_fetch_errors = contextvars.ContextVar("nrs_enricher_fetch_errors", default=None)
+_cache_save_lock = threading.Lock()  # JSON caches are also saved from background refreshes
+
+# Persistent RDAP cache: domain -> {"info", "ok", "fetched_at"}
+RDAP_CACHE_FILE = Path("memory/rdap_cache.json")
+RDAP_CACHE_MAX_AGE_DAYS = 30      # successful lookups
+RDAP_FAILURE_TTL_MINUTES = 60     # failed lookups, so a flaky server isn't hammered
+_rdap_cache = {"entries": None, "dirty": False, "hits": 0, "misses": 0}
+
+# IANA RDAP bootstrap: TLD -> registry RDAP base URL, so lookups skip the rdap.org redirect
+RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
+RDAP_BOOTSTRAP_FILE = Path("memory/rdap_dns_bootstrap.json")
+RDAP_BOOTSTRAP_MAX_AGE_DAYS = 7
+RDAP_FALLBACK_URL = "https://rdap.org/domain/"  # used only when no bootstrap is available
+RDAP_SERVER_DOWN_MINUTES = 30  # registry unreachable -> skip its TLD for a while
+_rdap_bootstrap = {"index": None, "loaded_at": None, "down_until": {}, "no_service": 0}
 
 # Contact hierarchy by finding type
 # Maps finding_type -> (responsible_role, escalation_role)
@@ -94,27 +136,204 @@ DEPARTMENT_EMAILS = {
 }
 
 
-def _fetch_page(url, timeout=TIMEOUT):
-    """Fetch webpage content as text."""
+def _count_request():
+    """Record one outgoing network request."""
+    with _network_lock:
+        _network["requests"] += 1
+        counter = _request_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def _counting_requests(fn, *args):
+    """
+    Call fn(*args) and count the requests it makes, including those of worker
+    threads started through _submit (background refreshes are not counted).
+    Returns (result, requests).
+    """
+    counter = [0]
+    token = _request_counter.set(counter)
+    try:
+        return fn(*args), counter[0]
+    finally:
+        _request_counter.reset(token)
+
+
+def _counting_fetch_errors(fn, *args):
+    """
+    Call fn(*args) and count the page fetches (its own and those of workers
+    started through _submit) that timed out or lost the connection.
+    HTTP error statuses and TLS failures are answers, not errors. Returns (result, errors).
+    """
+    errors = [0]
+    token = _fetch_errors.set(errors)
+    try:
+        return fn(*args), errors[0]
+    finally:
+        _fetch_errors.reset(token)
+
+
+def _submit(executor, fn, *args):
+    """executor.submit() that carries the caller's request counter into the worker."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _iter_url_chunks(url, chunk_size=65536, max_bytes=None, timeout=TIMEOUT):
+    """Yield the body of `url` in chunks, stopping after max_bytes. Yields nothing on error."""
+    _count_request()
     req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return resp.read().decode("utf-8", errors="replace")
+            read = 0
+            while max_bytes is None or read < max_bytes:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                read += len(chunk)
+                yield chunk
+    except Exception as e:
+        errors = _fetch_errors.get()
+        if errors is not None and isinstance(getattr(e, "reason", e), (TimeoutError, ConnectionError)):
+            errors[0] += 1
+        return
+
+
+def _fetch_page(url, timeout=TIMEOUT):
+    """Fetch webpage content as text (first MAX_PAGE_BYTES only)."""
+    body = b"".join(_iter_url_chunks(url, max_bytes=MAX_PAGE_BYTES, timeout=timeout))
+    return body.decode("utf-8", errors="replace")
+
+
+def _download_rdap_bootstrap():
+    """Fetch the IANA DNS bootstrap file into RDAP_BOOTSTRAP_FILE. Returns True on success."""
+    req = urllib.request.Request(RDAP_BOOTSTRAP_URL, headers={"User-Agent": USER_AGENT})
+    _count_request()
+    try:
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            data = json.loads(resp.read().decode())
     except Exception:
-        return ""
+        return False
+    if not data.get("services"):
+        return False
 
+    RDAP_BOOTSTRAP_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = RDAP_BOOTSTRAP_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, RDAP_BOOTSTRAP_FILE)
+    return True
 
-def _whois_lookup(domain):
+
+def _rdap_index():
     """
-    Lookup domain WHOIS via RDAP (JSON-based, stdlib compatible).
-    Returns dict with registrant info.
+    In-memory TLD -> RDAP base URL index built from the local bootstrap file.
+    The file is re-downloaded when older than RDAP_BOOTSTRAP_MAX_AGE_DAYS; a stale
+    file is still used if the download fails. Returns None if no bootstrap exists.
     """
-    # Try RDAP first (JSON API)
-    rdap_url = f"https://rdap.org/domain/{domain}"
-    req = urllib.request.Request(rdap_url, headers={"User-Agent": USER_AGENT, "Accept": "application/json"})
+    now = datetime.now(timezone.utc)
+    loaded_at = _rdap_bootstrap["loaded_at"]
+    if loaded_at and now - loaded_at < timedelta(days=RDAP_BOOTSTRAP_MAX_AGE_DAYS):
+        return _rdap_bootstrap["index"]
+
+    file_age = None
+    if RDAP_BOOTSTRAP_FILE.exists():
+        mtime = datetime.fromtimestamp(RDAP_BOOTSTRAP_FILE.stat().st_mtime, timezone.utc)
+        file_age = now - mtime
+    if file_age is None or file_age >= timedelta(days=RDAP_BOOTSTRAP_MAX_AGE_DAYS):
+        _download_rdap_bootstrap()
+
+    index = None
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-            data = json.loads(resp.read().decode())
+        with open(RDAP_BOOTSTRAP_FILE) as f:
+            services = json.load(f).get("services", [])
+        index = {}
+        for tlds, urls in services:
+            # Prefer an HTTPS endpoint when a registry lists several
+            base = next((u for u in urls if u.startswith("https://")), urls[0] if urls else None)
+            if not base:
+                continue
+            for tld in tlds:
+                index[tld.lower()] = base if base.endswith("/") else base + "/"
+    except (OSError, ValueError, TypeError):
+        index = None
+
+    _rdap_bootstrap["index"] = index
+    _rdap_bootstrap["loaded_at"] = now
+    return index
+
+
+def _rdap_url(domain):
+    """
+    Registry RDAP URL for a domain, matched on its longest bootstrapped suffix.
+    Returns None when the TLD has no RDAP service, so no time is spent on it.
+    """
+    index = _rdap_index()
+    if index is None:
+        return f"{RDAP_FALLBACK_URL}{domain}"
+
+    labels = domain.lower().rstrip(".").split(".")
+    for i in range(1, len(labels)):
+        suffix = ".".join(labels[i:])
+        if suffix in index:
+            return f"{index[suffix]}domain/{domain}"
+
+    _rdap_bootstrap["no_service"] += 1
+    return None
+
+
+def _rdap_server_down(domain):
+    """Whether the RDAP server for `domain` is marked down (see _mark_rdap_server_down)."""
+    index = _rdap_bootstrap["index"] or {}
+    labels = domain.lower().rstrip(".").split(".")
+    for i in range(1, len(labels)):
+        suffix = ".".join(labels[i:])
+        if suffix in index:
+            down_until = _rdap_bootstrap["down_until"].get(suffix)
+            return bool(down_until and datetime.now(timezone.utc) < down_until)
+    return False
+
+
+def _mark_rdap_server_down(domain):
+    """Skip a domain's registry for RDAP_SERVER_DOWN_MINUTES after a server failure."""
+    index = _rdap_bootstrap["index"] or {}
+    labels = domain.lower().rstrip(".").split(".")
+    for i in range(1, len(labels)):
+        suffix = ".".join(labels[i:])
+        if suffix in index:
+            until = datetime.now(timezone.utc) + timedelta(minutes=RDAP_SERVER_DOWN_MINUTES)
+            _rdap_bootstrap["down_until"][suffix] = until
+            return
+
+
+def _rdap_fetch(domain):
+    """
+    Lookup domain WHOIS via RDAP (JSON-based, stdlib compatible), straight from
+    the registry's RDAP server.
+    Returns dict with registrant info ({} when the registry has no data: no RDAP
+    service for the TLD, or an unknown domain), or None if the lookup failed.
+    """
+    rdap_url = _rdap_url(domain)
+    if rdap_url is None:
+        return {}
+    if _rdap_server_down(domain):
+        return None
+
+    req = urllib.request.Request(rdap_url, headers={"User-Agent": USER_AGENT, "Accept": "application/rdap+json, application/json"})
+    _count_request()
+    try:
+        try:
+            with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+                data = json.loads(resp.read().decode())
+        except urllib.error.HTTPError as e:
+            # 404 is just an unknown domain; 5xx means the registry itself is struggling
+            if e.code == 404:
+                return {}
+            if e.code >= 500:
+                _mark_rdap_server_down(domain)
+            return None
+        except (urllib.error.URLError, OSError):
+            _mark_rdap_server_down(domain)
+            return None
 
         info = {
             "registrant": None,
@@ -162,55 +381,683 @@ def _whois_lookup(domain):
         return info
 
     except Exception:
-        return {}
+        return None
+
+
+def _load_rdap_cache():
+    """Load the on-disk RDAP cache once per process."""
+    if _rdap_cache["entries"] is None:
+        entries = {}
+        if RDAP_CACHE_FILE.exists():
+            try:
+                with open(RDAP_CACHE_FILE) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        _rdap_cache["entries"] = entries
+    return _rdap_cache["entries"]
+
+
+def _save_rdap_cache():
+    """Persist the RDAP cache if it changed (atomic replace)."""
+    with _cache_save_lock:
+        if not _rdap_cache["dirty"]:
+            return
+        _rdap_cache["dirty"] = False
+        RDAP_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = RDAP_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(dict(_rdap_cache["entries"]), f, indent=2, default=str)
+        os.replace(tmp, RDAP_CACHE_FILE)
+
+
+def _parse_date(value):
+    """Parse an ISO-8601 date (RDAP or our own), or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _rdap_entry_fresh(entry, now):
+    """
+    Whether a cached RDAP entry can still be used.
+    Successes live RDAP_CACHE_MAX_AGE_DAYS unless the domain's registration has
+    expired since (contacts likely changed); failures live RDAP_FAILURE_TTL_MINUTES.
+    """
+    fetched_at = _parse_date(entry.get("fetched_at"))
+    if fetched_at is None:
+        return False
+    if not entry.get("ok"):
+        return now - fetched_at < timedelta(minutes=RDAP_FAILURE_TTL_MINUTES)
+    if now - fetched_at >= timedelta(days=RDAP_CACHE_MAX_AGE_DAYS):
+        return False
+    expires = _parse_date((entry.get("info") or {}).get("expires"))
+    return expires is None or expires > now
+
+
+def _whois_lookup(domain):
+    """
+    Lookup domain WHOIS via RDAP, reading through the persistent RDAP cache.
+    Returns dict with registrant info ({} if the registry has no data), or None
+    if the lookup failed.
+    """
+    entries = _load_rdap_cache()
+    now = datetime.now(timezone.utc)
+
+    entry = entries.get(domain)
+    if entry and _rdap_entry_fresh(entry, now):
+        _rdap_cache["hits"] += 1
+        return (entry.get("info") or {}) if entry.get("ok") else None
+
+    _rdap_cache["misses"] += 1
+    info = _rdap_fetch(domain)
+    entries[domain] = {"info": info or {}, "ok": info is not None, "fetched_at": now.isoformat()}
+    _rdap_cache["dirty"] = True
+    return info
+
+
+# Candidate about/team pages, in default priority order
+ABOUT_PATHS = [
+    "/about", "/about-us", "/nosotros", "/quienes-somos", "/sobre-nosotros",
+    "/equipo", "/team", "/nuestro-equipo", "/directivos", "/liderazgo", "/leadership",
+    "/contacto", "/contact", "/contactenos", "/contactanos",
+    "/gobierno-corporativo", "/corporate-governance", "/junta-directiva",
+    "/ejecutivos", "/management", "/our-team", "/staff",
+]
+ABOUT_WAVE_SIZE = 4  # candidate pages fetched concurrently per wave
+
+
+def _about_paths_for(pool):
+    """
+    Candidate paths, reordered by what worked on other domains in the same pool
+    (hit counts live in the contact store, so they carry over between sprints).
+    """
+    conn = _contact_db()
+    try:
+        hits = dict(conn.execute("SELECT path, hits FROM about_paths WHERE pool = ?", (pool or "",)).fetchall())
+    finally:
+        conn.close()
+    return sorted(ABOUT_PATHS, key=lambda path: -hits.get(path, 0))
+
+
+def _record_about_hit(pool, path):
+    """Remember that `path` was the usable about page for a domain in `pool`."""
+    conn = _contact_db()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO about_paths (pool, path, hits) VALUES (?, ?, 1) "
+                "ON CONFLICT (pool, path) DO UPDATE SET hits = hits + 1",
+                (pool or "", path),
+            )
+    finally:
+        conn.close()
+
+
+# --- Streaming contact extraction ---
+
+MIN_PAGE_BYTES = 500  # smaller responses are error stubs, not about pages
+
+# Job titles worth a name match (CEO, CTO, Director, etc.), with the
+# CONTACT_HIERARCHY role each one fills
+TITLE_PATTERNS = [
+    (r'CEO|Chief Executive|Presidente|Director General|Director Ejecutivo|Gerente General', "CEO"),
+    (r'CTO|Chief Technology|Director de Tecnolog[ií]a|VP Tecnolog[ií]a|Vicepresidente de Tecnolog', "CTO"),
+    (r'CISO|Chief Information Security|Director de Seguridad|Oficial de Seguridad', "CISO"),
+    (r'CFO|Chief Financial|Director Financiero|Vicepresidente Financiero', "CFO"),
+    (r'COO|Chief Operating|Director de Operaciones|Gerente de Operaciones', "COO"),
+    (r'VP|Vice President|Vicepresidente', "VP"),
+    (r'Director de TI|IT Director|Director de Sistemas|Gerente de TI|Gerente de Sistemas', "IT Director"),
+    (r'Director de Infraestructura|Infrastructure Director|Head of IT', "DevOps Lead"),
+    (r'Gerente de Riesgos|Risk Manager|Director de Cumplimiento|Compliance', "CISO"),
+]
+
+# One pass finds both emails and "Firstname Lastname, Title" pairs;
+# the title alternatives are groups t0..tN so the match says which one hit
+_CONTACT_RE = re.compile(
+    r'(?P<email>[\w.+-]+@[\w-]+\.[\w.]+)'
+    r'|(?P<name>[A-Z][a-z]+ [A-Z][a-z]+)[\s,]*(?:'
+    + "|".join(f"(?P<t{i}>{pattern})" for i, (pattern, _) in enumerate(TITLE_PATTERNS))
+    + r')'
+)
+# JSON-LD blocks are kept: they often carry the organisation's contact email
+_SKIP_START_RE = re.compile(r'<(?:script|style)\b(?![^>]*ld\+json)', re.IGNORECASE)
+_SKIP_END_RE = re.compile(r'</(?:script|style)\s*>', re.IGNORECASE)
+_SCAN_OVERLAP = 256  # chars held back between chunks so matches can span them
+
+
+class _ContactScanner:
+    """
+    Incremental contact extractor: feed() decoded HTML chunks as they arrive.
+    Script/style content is dropped before matching. `done` turns true once
+    ENOUGH_CONTACTS have been found, so the caller can stop reading.
+    """
+
+    def __init__(self, domain, path):
+        self.domain = domain
+        self.domain_key = domain.split(".")[0]
+        self.source = f"website{path}"
+        self.emails = {}
+        self.names = {}
+        self._buffer = ""
+        self._carry = ""
+        self._in_skip = False
+
+    @property
+    def done(self):
+        return len(self.emails) + len(self.names) >= ENOUGH_CONTACTS
+
+    @property
+    def contacts(self):
+        return list(self.emails.values()) + list(self.names.values())
+
+    def feed(self, text, final=False):
+        self._buffer += text
+        visible = []
+        while self._buffer:
+            if self._in_skip:
+                end = _SKIP_END_RE.search(self._buffer)
+                if not end:
+                    # Keep enough to recognise a closing tag split across chunks
+                    self._buffer = "" if final else self._buffer[-16:]
+                    break
+                self._buffer = self._buffer[end.end():]
+                self._in_skip = False
+            else:
+                start = _SKIP_START_RE.search(self._buffer)
+                if not start:
+                    break
+                if not final and self._buffer.find(">", start.end()) == -1:
+                    # Tag still arriving: wait to see whether it is JSON-LD
+                    visible.append(self._buffer[:start.start()])
+                    self._buffer = self._buffer[start.start():]
+                    self._scan("".join(visible), final)
+                    return
+                visible.append(self._buffer[:start.start()] + " ")
+                self._buffer = self._buffer[start.end():]
+                self._in_skip = True
+
+        if not self._in_skip:
+            # Everything left is visible; hold back a tail in case a tag or
+            # match continues in the next chunk
+            hold = 0 if final else min(len(self._buffer), 16)
+            visible.append(self._buffer[:len(self._buffer) - hold])
+            self._buffer = self._buffer[len(self._buffer) - hold:]
+
+        self._scan("".join(visible), final)
+
+    def close(self):
+        self.feed("", final=True)
+        return self.contacts
+
+    def _scan(self, text, final):
+        text = self._carry + text
+        limit = len(text) if final else len(text) - _SCAN_OVERLAP
+        keep_from = max(limit, 0)
+        for match in _CONTACT_RE.finditer(text):
+            if match.start() >= limit:
+                break
+            keep_from = max(keep_from, match.end())
+            email = match.group("email")
+            if email:
+                if email not in self.emails and (self.domain in email or self.domain_key in email):
+                    self.emails[email] = {"email": email, "source": self.source}
+            else:
+                name = match.group("name")
+                role = TITLE_PATTERNS[int(match.lastgroup[1:])][1]
+                self.names.setdefault(name, {"name": name, "role": role, "source": self.source})
+            if self.done:
+                break
+        self._carry = "" if final else text[keep_from:]
+
+
+def _extract_contacts(html, domain, path):
+    """Extract emails and name+title pairs from an already-fetched page."""
+    scanner = _ContactScanner(domain, path)
+    for i in range(0, len(html), PAGE_CHUNK_BYTES):
+        scanner.feed(html[i:i + PAGE_CHUNK_BYTES])
+        if scanner.done:
+            break
+    return scanner.close()
+
+
+def _fetch_contacts(url, domain, path):
+    """
+    Stream a page and extract contacts while it downloads, reading at most
+    MAX_PAGE_BYTES and stopping early once ENOUGH_CONTACTS are found.
+    Returns list of contacts, or None if the page is missing or too small to use.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    scanner = _ContactScanner(domain, path)
+    size = 0
+    for chunk in _iter_url_chunks(url, chunk_size=PAGE_CHUNK_BYTES, max_bytes=MAX_PAGE_BYTES):
+        size += len(chunk)
+        scanner.feed(decoder.decode(chunk))
+        if scanner.done:
+            break
+    contacts = scanner.close()
+    if size < MIN_PAGE_BYTES:
+        return None
+    return contacts
+
+
+def _first_contact_page(domain, paths):
+    """
+    Fetch candidate paths concurrently in waves of ABOUT_WAVE_SIZE, in priority order.
+
+    A usable page wins as soon as every higher-priority candidate in its wave has
+    come back unusable, so the result is the same page a sequential sweep would pick.
+    Remaining fetches are then cancelled (those already in flight are abandoned).
+    Returns (path, contacts) or (None, None).
+    """
+    executor = ThreadPoolExecutor(max_workers=ABOUT_WAVE_SIZE)
+    try:
+        for start in range(0, len(paths), ABOUT_WAVE_SIZE):
+            wave = paths[start:start + ABOUT_WAVE_SIZE]
+            futures = [
+                _submit(executor, _fetch_contacts, f"https://{domain}{path}", domain, path)
+                for path in wave
+            ]
+            pending = set(futures)
+
+            while pending:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for path, future in zip(wave, futures):
+                    if not future.done():
+                        break  # a higher-priority candidate is still loading
+                    contacts = future.result()
+                    if contacts is not None:
+                        return path, contacts
+        return None, None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Sitemap / robots.txt contact-page locator ---
+
+SITEMAP_CACHE_FILE = Path("memory/sitemap_cache.json")
+SITEMAP_CACHE_DAYS = 30
+SITEMAP_MAX_FILES = 5        # sitemaps parsed per domain, nested indexes included
+SITEMAP_MAX_BYTES = 10_000_000  # per sitemap file (decompressed)
+SITEMAP_KEEP_URLS = 10       # candidate URLs cached per domain
+SITEMAP_FETCHES = 2          # targeted page fetches before falling back to guessing
+
+# Path keyword -> weight; team/leadership pages name people, contact pages rarely do
+CONTACT_PAGE_KEYWORDS = {
+    "equipo": 3, "team": 3, "directivos": 3, "liderazgo": 3, "leadership": 3,
+    "ejecutivos": 3, "management": 3, "junta-directiva": 3, "staff": 2,
+    "gobierno-corporativo": 2, "corporate-governance": 2,
+    "nosotros": 2, "quienes-somos": 2, "sobre-nosotros": 2, "about": 2,
+    "contacto": 1, "contact": 1, "contactenos": 1, "contactanos": 1,
+}
+_SKIP_SEGMENTS = {"blog", "news", "noticias", "tag", "category", "categoria", "author", "wp-content"}
+_SKIP_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".doc", ".docx", ".xls", ".xlsx", ".zip")
+
+_sitemap_cache = {"entries": None, "dirty": False}
+
+
+def _iter_sitemap_locs(url):
+    """
+    Parse a sitemap incrementally as it downloads (gzip supported).
+    Yields ("sitemap", loc) for sitemap index entries and ("page", loc) for URLs.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if url.endswith(".gz") else None
+    kind = None
+    size = 0
+
+    for chunk in _iter_url_chunks(url):
+        if inflate is not None:
+            chunk = inflate.decompress(chunk)
+        size += len(chunk)
+        try:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                tag = elem.tag.rsplit("}", 1)[-1]
+                if event == "start":
+                    if kind is None:
+                        kind = "sitemap" if tag == "sitemapindex" else "page"
+                elif tag == "loc" and elem.text:
+                    yield kind, elem.text.strip()
+                elif tag in ("url", "sitemap"):
+                    elem.clear()
+        except ET.ParseError:
+            return
+        if size >= SITEMAP_MAX_BYTES:
+            return
+
+
+def _contact_url_score(url, domain):
+    """Weight of a sitemap URL as a contact page (0 = not a candidate)."""
+    parsed = urllib.parse.urlparse(url)
+    host = parsed.netloc.lower().split(":")[0]
+    if host != domain and not host.endswith("." + domain):
+        return 0
+    path = parsed.path.lower().rstrip("/")
+    if not path or path.endswith(_SKIP_EXTENSIONS):
+        return 0
+    segments = [seg for seg in path.split("/") if seg]
+    if _SKIP_SEGMENTS.intersection(segments):
+        return 0
+    return max(
+        (weight for keyword, weight in CONTACT_PAGE_KEYWORDS.items()
+         if any(keyword in seg for seg in segments)),
+        default=0,
+    )
+
 
+def _load_sitemap_cache():
+    """Load the per-domain sitemap candidate cache once per process."""
+    if _sitemap_cache["entries"] is None:
+        entries = {}
+        if SITEMAP_CACHE_FILE.exists():
+            try:
+                with open(SITEMAP_CACHE_FILE) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        _sitemap_cache["entries"] = entries
+    return _sitemap_cache["entries"]
 
-def _scrape_about_page(domain):
+
+def _save_sitemap_cache():
+    """Persist the sitemap candidate cache if it changed (atomic replace)."""
+    with _cache_save_lock:
+        if not _sitemap_cache["dirty"]:
+            return
+        _sitemap_cache["dirty"] = False
+        SITEMAP_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SITEMAP_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(dict(_sitemap_cache["entries"]), f, indent=2)
+        os.replace(tmp, SITEMAP_CACHE_FILE)
+
+
+def _locate_contact_pages(domain):
+    """
+    Find likely about/team/contact URLs from robots.txt and sitemap.xml.
+
+    Sitemaps listed in robots.txt (or /sitemap.xml) are parsed as they stream in,
+    following nested sitemap indexes up to SITEMAP_MAX_FILES files. URLs are ranked
+    by CONTACT_PAGE_KEYWORDS weight, then by path depth. The ranked list (possibly
+    empty) is cached per domain for SITEMAP_CACHE_DAYS.
+    Returns list of URLs, best first.
+    """
+    entries = _load_sitemap_cache()
+    now = datetime.now(timezone.utc)
+    entry = entries.get(domain)
+    if entry:
+        fetched_at = _parse_date(entry.get("fetched_at"))
+        if fetched_at and now - fetched_at < timedelta(days=SITEMAP_CACHE_DAYS):
+            return entry.get("urls", [])
+
+    robots = _fetch_page(f"https://{domain}/robots.txt")
+    queue = [
+        line.split(":", 1)[1].strip()
+        for line in robots.splitlines()
+        if line.lower().startswith("sitemap:")
+    ] or [f"https://{domain}/sitemap.xml"]
+
+    candidates = {}
+    parsed_files = 0
+    while queue and parsed_files < SITEMAP_MAX_FILES:
+        sitemap_url = queue.pop(0)
+        parsed_files += 1
+        nested = []
+        for kind, loc in _iter_sitemap_locs(sitemap_url):
+            if kind == "sitemap":
+                nested.append(loc)
+                continue
+            score = _contact_url_score(loc, domain)
+            if score:
+                candidates[loc] = score
+        # Page sitemaps (WordPress page-sitemap.xml etc.) before posts/products
+        nested.sort(key=lambda u: 0 if "page" in u.lower() else 1)
+        queue.extend(nested)
+
+    urls = sorted(
+        candidates,
+        key=lambda u: (-candidates[u], urllib.parse.urlparse(u).path.rstrip("/").count("/"), len(u)),
+    )[:SITEMAP_KEEP_URLS]
+
+    entries[domain] = {"urls": urls, "fetched_at": now.isoformat()}
+    _sitemap_cache["dirty"] = True
+    return urls
+
+
+def _scrape_about_page(domain, pool=None):
     """
     Attempt to find team/about page and extract names and titles.
+    Pages located through the sitemap are tried first (SITEMAP_FETCHES targeted
+    fetches); otherwise candidate paths are guessed, ordered by what worked on
+    other domains in `pool`.
     Returns list of contact dicts.
     """
-    contacts = []
-    about_paths = [
-        "/about", "/about-us", "/nosotros", "/quienes-somos", "/sobre-nosotros",
-        "/equipo", "/team", "/nuestro-equipo", "/directivos", "/liderazgo", "/leadership",
-        "/contacto", "/contact", "/contactenos", "/contactanos",
-        "/gobierno-corporativo", "/corporate-governance", "/junta-directiva",
-        "/ejecutivos", "/management", "/our-team", "/staff",
-    ]
-
-    for path in about_paths:
-        url = f"https://{domain}{path}"
-        html = _fetch_page(url)
-        if not html or len(html) < 500:
+    for url in _locate_contact_pages(domain)[:SITEMAP_FETCHES]:
+        contacts = _fetch_contacts(url, domain, urllib.parse.urlparse(url).path or "/")
+        if contacts is not None:
+            return contacts
+
+    path, contacts = _first_contact_page(domain, _about_paths_for(pool))
+    if path is None:
+        return []
+
+    _record_about_hit(pool, path)
+    return contacts  # Only process first successful page
+
+
+# --- Mail acceptance (MX) and email pattern ranking ---
+
+DNS_RESOLVE_URL = os.environ.get("NRS_DOH_URL", "https://dns.google/resolve")
+MX_CACHE_FILE = Path("memory/mx_cache.json")
+MX_CACHE_DAYS = 7                 # DNS answers, positive or negative
+MX_FAILURE_TTL_MINUTES = 60       # resolver errors: retry soon, keep addresses meanwhile
+MX_WORKERS = 8                    # domains resolved concurrently per sprint
+_mx_cache = {"entries": None, "dirty": False, "hits": 0, "misses": 0}
+_mx_lock = threading.Lock()
+
+# EMAIL_PATTERNS that name a person, checked when inferring a domain's convention
+PERSONAL_PATTERNS = [p for p in EMAIL_PATTERNS if "{f" in p or "{last}" in p]
+
+
+def _dns_query(name, record_type):
+    """
+    Query DNS via Google DNS-over-HTTPS (same resolver as nrs_scanner).
+    Returns (status, answers) where status is the DNS RCODE (0 NOERROR, 3 NXDOMAIN),
+    or None if the resolver could not be reached.
+    """
+    _count_request()
+    url = f"{DNS_RESOLVE_URL}?name={urllib.parse.quote(name)}&type={record_type}"
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    try:
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            data = json.loads(resp.read().decode())
+    except Exception:
+        return None
+    answers = [a for a in data.get("Answer", []) if a.get("type") in (1, 15, 28)]
+    return data.get("Status"), answers
+
+
+def _mx_resolve(domain):
+    """
+    Decide whether `domain` can receive mail.
+    MX records -> yes; null MX ("0 .", RFC 7505) or NXDOMAIN -> no; no MX -> implicit
+    MX on the A record (RFC 5321 5.1). `accepts` is None when DNS could not be reached.
+    """
+    result = _dns_query(domain, "MX")
+    if result is None:
+        return {"accepts": None, "reason": "lookup_failed", "mx": []}
+    status, answers = result
+    if status == 3:
+        return {"accepts": False, "reason": "nxdomain", "mx": []}
+
+    hosts = []
+    for answer in answers:
+        if answer.get("type") != 15:
             continue
+        parts = answer.get("data", "").split()
+        if len(parts) == 2:
+            hosts.append((int(parts[0]) if parts[0].isdigit() else 0, parts[1].rstrip(".")))
+    if hosts:
+        if all(host == "" for _, host in hosts):
+            return {"accepts": False, "reason": "null_mx", "mx": []}
+        return {"accepts": True, "reason": "mx", "mx": [h for _, h in sorted(hosts) if h]}
 
-        # Extract email addresses from page
-        emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.]+', html)
-        for email in set(emails):
-            if domain in email or domain.split(".")[0] in email:
-                contacts.append({"email": email, "source": f"website{path}"})
-
-        # Look for common title patterns (CEO, CTO, Director, etc.)
-        title_patterns = [
-            r'(?:CEO|Chief Executive|Presidente|Director General|Director Ejecutivo|Gerente General)',
-            r'(?:CTO|Chief Technology|Director de Tecnolog[ií]a|VP Tecnolog[ií]a|Vicepresidente de Tecnolog)',
-            r'(?:CISO|Chief Information Security|Director de Seguridad|Oficial de Seguridad)',
-            r'(?:CFO|Chief Financial|Director Financiero|Vicepresidente Financiero)',
-            r'(?:COO|Chief Operating|Director de Operaciones|Gerente de Operaciones)',
-            r'(?:VP|Vice President|Vicepresidente)',
-            r'(?:Director de TI|IT Director|Director de Sistemas|Gerente de TI|Gerente de Sistemas)',
-            r'(?:Director de Infraestructura|Infrastructure Director|Head of IT)',
-            r'(?:Gerente de Riesgos|Risk Manager|Director de Cumplimiento|Compliance)',
-        ]
-        for pattern in title_patterns:
-            matches = re.findall(rf'([A-Z][a-z]+ [A-Z][a-z]+)[\s,]*(?:{pattern})', html)
-            for name in matches:
-                contacts.append({"name": name, "source": f"website{path}"})
-
-        break  # Only process first successful page
+    result = _dns_query(domain, "A")
+    if result is None:
+        return {"accepts": None, "reason": "lookup_failed", "mx": []}
+    if any(a.get("type") == 1 for a in result[1]):
+        return {"accepts": True, "reason": "a_fallback", "mx": [domain]}
+    return {"accepts": False, "reason": "no_mx", "mx": []}
 
-    return contacts
+
+def _load_mx_cache():
+    """Load the on-disk MX cache once per process."""
+    if _mx_cache["entries"] is None:
+        entries = {}
+        if MX_CACHE_FILE.exists():
+            try:
+                with open(MX_CACHE_FILE) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        _mx_cache["entries"] = entries
+    return _mx_cache["entries"]
+
+
+def _save_mx_cache():
+    """Persist the MX cache if it changed (atomic replace)."""
+    with _cache_save_lock:
+        if not _mx_cache["dirty"]:
+            return
+        _mx_cache["dirty"] = False
+        MX_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = MX_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(dict(_mx_cache["entries"]), f, indent=2, default=str)
+        os.replace(tmp, MX_CACHE_FILE)
+
+
+def _mx_entry_fresh(entry, now):
+    """Whether a cached MX answer can still be used."""
+    checked_at = _parse_date(entry.get("checked_at"))
+    if checked_at is None:
+        return False
+    if entry.get("accepts") is None:
+        return now - checked_at < timedelta(minutes=MX_FAILURE_TTL_MINUTES)
+    return now - checked_at < timedelta(days=MX_CACHE_DAYS)
+
+
+def _mail_status(domain):
+    """Mail acceptance for one domain, reading through the MX cache."""
+    entries = _load_mx_cache()
+    now = datetime.now(timezone.utc)
+    with _mx_lock:
+        entry = entries.get(domain)
+        if entry and _mx_entry_fresh(entry, now):
+            _mx_cache["hits"] += 1
+            return entry
+
+    entry = _mx_resolve(domain)
+    entry["checked_at"] = now.isoformat()
+    with _mx_lock:
+        _mx_cache["misses"] += 1
+        entries[domain] = entry
+        _mx_cache["dirty"] = True
+    return entry
+
+
+def verify_mail_domains(domains):
+    """
+    Resolve mail acceptance for every domain of a sprint in one batch.
+    Cached answers are served directly; the rest resolve MX_WORKERS at a time.
+    Returns dict: domain -> {"accepts", "reason", "mx", "checked_at"}.
+    """
+    domains = list(dict.fromkeys(domains))
+    if not domains:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(MX_WORKERS, len(domains))) as executor:
+        statuses = [f.result() for f in [_submit(executor, _mail_status, d) for d in domains]]
+    _save_mx_cache()
+    return dict(zip(domains, statuses))
+
+
+def _ascii_lower(text):
+    """Lowercase and strip accents (mailboxes are ASCII)."""
+    table = str.maketrans("áéíóúüñàèìòùç", "aeiouunaeiouc")
+    return text.lower().translate(table)
+
+
+def _name_parts(name):
+    """('maria', 'lopez') from 'María López', or None if it isn't a two-part name."""
+    parts = re.findall(r"[a-z]+", _ascii_lower(name or ""))
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[-1]
+
+
+def _email_profile(website_contacts, domain):
+    """
+    Learn a domain's mailbox conventions from contacts scraped off its site.
+    Returns dict with 'observed' (mailboxes seen at the domain) and 'patterns'
+    (EMAIL_PATTERNS entries that reproduce a scraped person's address, most common first).
+    """
+    emails = {c["email"].lower() for c in website_contacts if c.get("email")}
+    observed = {e for e in emails if e.endswith("@" + domain)}
+    names = [n for n in (_name_parts(c.get("name")) for c in website_contacts) if n]
+
+    counts = {}
+    for email in observed:
+        for first, last in names:
+            values = {"first": first, "last": last, "f": first[0], "domain": domain}
+            for pattern in PERSONAL_PATTERNS:
+                if pattern.format(**values) == email:
+                    counts[pattern] = counts.get(pattern, 0) + 1
+                    break
+    patterns = sorted(counts, key=lambda p: (-counts[p], PERSONAL_PATTERNS.index(p)))
+    return {"observed": observed, "patterns": patterns}
+
+
+def _separator(pattern_or_local):
+    """Word separator used by a pattern or mailbox ('.', '_' or '')."""
+    for sep in (".", "_"):
+        if sep in pattern_or_local.split("@")[0].replace("{", "").replace("}", ""):
+            return sep
+    return ""
+
+
+def _rank_emails(candidates, profile, pinned=()):
+    """
+    Order candidate addresses by how well they fit the domain's conventions:
+    `pinned` addresses (known contacts) first, then mailboxes seen on the site,
+    then ones using the same word separator as the site's personal addresses
+    (e.g. first.last -> director.ti), then the rest. Original order breaks ties.
+    """
+    separator = _separator(profile["patterns"][0]) if profile["patterns"] else ""
+
+    def rank(email):
+        if email in pinned:
+            return -1
+        if email.lower() in profile["observed"]:
+            return 0
+        if separator and _separator(email) == separator:
+            return 1
+        return 2
+
+    return sorted(dict.fromkeys(candidates), key=rank)
+
+
+def _personal_email(name, domain, profile):
+    """Address for a named contact using the domain's dominant pattern, or None."""
+    parts = _name_parts(name)
+    if not parts or not profile["patterns"]:
+        return None
+    first, last = parts
+    return profile["patterns"][0].format(first=first, last=last, f=first[0], domain=domain)
 
 
 def _generate_department_emails(domain, role):
@@ -219,9 +1066,231 @@ def _generate_department_emails(domain, role):
     return [p.format(domain=domain) for p in patterns]
 
 
-def enrich_finding(finding):
+def _domain_intel(domain, pool=None, mail=None):
+    """
+    Gather all network-sourced intel for a domain (RDAP + website contacts + MX).
+    `pool` groups similar domains so about-page discovery can learn path order.
+    `mail` is the domain's verify_mail_domains() entry when resolved in batch.
+    Returns dict with 'whois', 'website_contacts', 'mail', 'requests' (network
+    requests spent) and 'failed' (lookups that errored rather than answered:
+    rdap, mail, website). A registry or site with nothing to offer is an answer.
+    """
+    def gather():
+        whois_info = _whois_lookup(domain)
+        website_contacts, website_errors = _counting_fetch_errors(_scrape_about_page, domain, pool)
+        domain_mail = mail
+        if domain_mail is None:
+            domain_mail = _mail_status(domain)
+            _save_mx_cache()
+        return whois_info, website_contacts, website_errors, domain_mail
+
+    (whois_info, website_contacts, website_errors, mail), requests = _counting_requests(gather)
+    # Contacts found despite a timed-out candidate page still count as an answer
+    checks = (("rdap", whois_info is not None), ("mail", mail.get("accepts") is not None),
+              ("website", bool(website_contacts) or not website_errors))
+    return {
+        "whois": whois_info or {},
+        "website_contacts": website_contacts,
+        "mail": mail,
+        "requests": requests,
+        "failed": [name for name, ok in checks if not ok],
+    }
+
+
+def _finding_pool(finding):
+    """Target pool of a finding (industry when the target came without one)."""
+    return finding.get("pool") or finding.get("industry", "unknown")
+
+
+# --- Contact knowledge base ---
+
+CONTACT_DB_FILE = Path("memory/contacts.db")
+CONTACT_STALE_DAYS = 30     # stored intel older than this is served, then refreshed in background
+CONTACT_REFRESH_WORKERS = 2
+_CONTACT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    whois TEXT NOT NULL,
+    mail TEXT,
+    refreshed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (domain, role, name, email)
+);
+CREATE INDEX IF NOT EXISTS contacts_domain_role ON contacts (domain, role);
+CREATE TABLE IF NOT EXISTS about_paths (
+    pool TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (pool, path)
+);
+"""
+_contact_store = {"ready": False, "served": 0, "scheduled": 0, "refreshing": set(),
+                  "executor": None, "atexit": False}
+_contact_store_lock = threading.Lock()
+
+
+def _contact_db():
+    """Open the contact store (WAL, so background refreshes don't block readers)."""
+    CONTACT_DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CONTACT_DB_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _contact_store["ready"]:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_CONTACT_SCHEMA)
+        _contact_store["ready"] = True
+    return conn
+
+
+def _store_intel(domain, intel):
+    """
+    Record fresh intel for a domain; contacts accumulate, last_seen moves forward.
+    The domain row (and its refreshed_at) is written whenever every lookup
+    answered, even with no data; a lookup that errored (see _domain_intel) leaves
+    it unwritten, so the domain is looked up again next time instead of being
+    served for CONTACT_STALE_DAYS.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    whois_info = intel.get("whois") or {}
+    rows = []
+    for role in ("tech_contact", "admin_contact"):
+        contact = whois_info.get(role) or {}
+        if contact.get("name") or contact.get("email"):
+            rows.append((role, contact.get("name") or "", contact.get("email") or "", "rdap"))
+    for contact in intel.get("website_contacts", []):
+        rows.append((contact.get("role", "website"), contact.get("name", ""),
+                     contact.get("email", ""), contact["source"]))
+
+    conn = _contact_db()
+    try:
+        with conn:
+            if not intel.get("failed"):
+                conn.execute(
+                    "INSERT INTO domains (domain, whois, mail, refreshed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (domain) DO UPDATE SET whois = excluded.whois, mail = excluded.mail, "
+                    "refreshed_at = excluded.refreshed_at",
+                    (domain, json.dumps(whois_info, default=str), json.dumps(intel.get("mail")), now),
+                )
+            conn.executemany(
+                "INSERT INTO contacts (domain, role, name, email, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (domain, role, name, email) DO UPDATE SET "
+                "source = excluded.source, last_seen = excluded.last_seen",
+                [(domain, role, name, email, source, now, now) for role, name, email, source in rows],
+            )
+    finally:
+        conn.close()
+
+
+def _stored_intel(domain):
+    """
+    Intel for a domain from the contact store, or None if the domain is unknown.
+    Website contacts come back most recently seen first. Adds 'refreshed_at'.
+    """
+    conn = _contact_db()
+    try:
+        row = conn.execute("SELECT * FROM domains WHERE domain = ?", (domain,)).fetchone()
+        if row is None:
+            return None
+        contacts = conn.execute(
+            "SELECT role, name, email, source FROM contacts "
+            "WHERE domain = ? AND source LIKE 'website%' ORDER BY last_seen DESC, id",
+            (domain,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    website_contacts = []
+    for c in contacts:
+        contact = {"email": c["email"]} if c["email"] else {"name": c["name"], "role": c["role"]}
+        contact["source"] = c["source"]
+        website_contacts.append(contact)
+    return {
+        "whois": json.loads(row["whois"]),
+        "website_contacts": website_contacts,
+        "mail": json.loads(row["mail"]) if row["mail"] else None,
+        "requests": 0,
+        "refreshed_at": row["refreshed_at"],
+    }
+
+
+def _refresh_intel(domain, pool):
+    """Background job: re-gather a stale domain's intel and store it."""
+    try:
+        intel = _domain_intel(domain, pool)
+        _store_intel(domain, intel)
+        _save_rdap_cache()
+        _save_sitemap_cache()
+    except Exception as e:
+        print(f"  [nrs_enricher] Background refresh of {domain} failed: {e}")
+    finally:
+        with _contact_store_lock:
+            _contact_store["refreshing"].discard(domain)
+
+
+def _schedule_refresh(domain, pool):
+    """Queue a background refresh for `domain` unless one is already pending."""
+    with _contact_store_lock:
+        if domain in _contact_store["refreshing"]:
+            return False
+        _contact_store["refreshing"].add(domain)
+        _contact_store["scheduled"] += 1
+        if _contact_store["executor"] is None:
+            _contact_store["executor"] = ThreadPoolExecutor(
+                max_workers=CONTACT_REFRESH_WORKERS, thread_name_prefix="nrs-contact-refresh")
+            if not _contact_store["atexit"]:
+                # Refreshes write to the store; let them land before the process exits
+                atexit.register(wait_for_refreshes)
+                _contact_store["atexit"] = True
+        _contact_store["executor"].submit(_refresh_intel, domain, pool)
+    return True
+
+
+def wait_for_refreshes():
+    """Block until queued background refreshes have finished (runs at process exit)."""
+    with _contact_store_lock:
+        executor, _contact_store["executor"] = _contact_store["executor"], None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _known_domain_intel(domain, pool=None):
+    """
+    Stored intel for a known domain (no network), scheduling a background refresh
+    when it is older than CONTACT_STALE_DAYS. Returns None for unknown domains.
+    """
+    intel = _stored_intel(domain)
+    if intel is None:
+        return None
+    refreshed_at = _parse_date(intel["refreshed_at"])
+    if refreshed_at is None or datetime.now(timezone.utc) - refreshed_at > timedelta(days=CONTACT_STALE_DAYS):
+        _schedule_refresh(domain, pool)
+    _contact_store["served"] += 1
+    return intel
+
+
+def _intel_for(domain, pool=None, mail=None):
+    """Intel for a domain: from the contact store when known, else gathered live and stored."""
+    intel = _known_domain_intel(domain, pool)
+    if intel is None:
+        intel = _domain_intel(domain, pool, mail)
+        _store_intel(domain, intel)
+    return intel
+
+
+def enrich_finding(finding, intel=None):
     """
     Enrich a single finding with company contact information.
+    Contacts come from the contact store when the company is already known;
+    pass `intel` to reuse lookups already made for the domain.
     Returns finding dict with added contact fields.
     """
     domain = finding["domain"]
@@ -232,8 +1301,12 @@ def enrich_finding(finding):
     responsible_role, escalation_role = CONTACT_HIERARCHY.get(ftype, ("IT Director", "CTO"))
 
     # Gather intel
-    whois_info = _whois_lookup(domain)
-    website_contacts = _scrape_about_page(domain)
+    if intel is None:
+        intel = _intel_for(domain, _finding_pool(finding))
+    whois_info = intel["whois"]
+    website_contacts = intel["website_contacts"]
+    mail = intel.get("mail") or {}
+    profile = _email_profile(website_contacts, domain)
 
     # Build company info
     company_info = {
@@ -246,6 +1319,9 @@ def enrich_finding(finding):
         "domain_created": whois_info.get("created"),
         "domain_expires": whois_info.get("expires"),
         "website_contacts": website_contacts[:5],
+        "mail_accepts": mail.get("accepts"),
+        "mail_check": mail.get("reason"),
+        "email_pattern": profile["patterns"][0] if profile["patterns"] else None,
     }
 
     # Build outreach targets
@@ -278,6 +1354,26 @@ def enrich_finding(finding):
         if ac.get("email"):
             escalation_contact["emails"].insert(0, ac["email"])
 
+    # Known addresses first (RDAP, then the site's pattern applied to the contact's
+    # name), guessed department mailboxes ranked by the site's conventions after
+    for contact in (responsible_contact, escalation_contact):
+        if not contact.get("name"):
+            # Someone the site lists under this role (e.g. "Maria Lopez, CTO")
+            person = next((c for c in website_contacts
+                           if c.get("role") == contact["role"] and c.get("name")), None)
+            if person:
+                contact["name"] = person["name"]
+        generated = _generate_department_emails(domain, contact["role"])
+        known = [e for e in contact["emails"] if e not in generated]
+        personal = _personal_email(contact.get("name"), domain, profile)
+        if personal and personal not in known:
+            known.append(personal)
+        emails = _rank_emails(known + generated, profile, pinned=known)
+        if mail.get("accepts") is False:
+            # Domain can't receive mail: keep only addresses hosted elsewhere
+            emails = [e for e in emails if not e.lower().endswith("@" + domain)]
+        contact["emails"] = emails
+
     # Add enrichment to finding
     finding["company_info"] = company_info
     finding["outreach_targets"] = [responsible_contact, escalation_contact]
@@ -325,25 +1421,141 @@ def run(ranked_findings):
     print("[nrs_enricher] Enriching findings with contact data...")
     enriched = []
 
-    # Group by domain to avoid duplicate lookups
-    domains_processed = set()
+    # Network lookups happen once per domain; every finding reuses them
     domain_cache = {}
+    requests_saved = 0
+    rdap_hits, rdap_misses = _rdap_cache["hits"], _rdap_cache["misses"]
+    rdap_no_service = _rdap_bootstrap["no_service"]
+
+    served, scheduled = _contact_store["served"], _contact_store["scheduled"]
+
+    # Companies already in the contact store need no network at all
+    for finding in ranked_findings:
+        domain = finding["domain"]
+        if domain not in domain_cache:
+            intel = _known_domain_intel(domain, _finding_pool(finding))
+            if intel is not None:
+                domain_cache[domain] = intel
+
+    # Mail acceptance for the rest of the sprint in one batch
+    mx_hits = _mx_cache["hits"]
+    mail_status, mx_requests = _counting_requests(
+        verify_mail_domains, [f["domain"] for f in ranked_findings if f["domain"] not in domain_cache])
 
     for finding in ranked_findings:
         domain = finding["domain"]
 
-        if domain not in domains_processed:
+        if domain not in domain_cache:
             print(f"  [nrs_enricher] Enriching {finding['company_name']} ({domain})...")
-            domains_processed.add(domain)
+            domain_cache[domain] = _domain_intel(domain, _finding_pool(finding), mail_status[domain])
+            _store_intel(domain, domain_cache[domain])
+        else:
+            requests_saved += domain_cache[domain]["requests"]
 
-        enriched_finding = enrich_finding(finding)
+        enriched_finding = enrich_finding(finding, intel=domain_cache[domain])
         enriched.append(enriched_finding)
 
-    print(f"[nrs_enricher] Enriched {len(enriched)} findings across {len(domains_processed)} companies")
+    _save_rdap_cache()
+    _save_sitemap_cache()
+
+    requests_made = mx_requests + sum(intel["requests"] for intel in domain_cache.values())
+    rdap_hits = _rdap_cache["hits"] - rdap_hits
+    rdap_misses = _rdap_cache["misses"] - rdap_misses
+    rdap_lookups = rdap_hits + rdap_misses
+    RUN_STATS.clear()
+    RUN_STATS.update({
+        "findings": len(enriched),
+        "domains": len(domain_cache),
+        "network_requests": requests_made,
+        "network_requests_saved": requests_saved,
+        "rdap_cache_hits": rdap_hits,
+        "rdap_cache_misses": rdap_misses,
+        "rdap_cache_hit_ratio": round(rdap_hits / rdap_lookups, 3) if rdap_lookups else 0.0,
+        "rdap_no_service": _rdap_bootstrap["no_service"] - rdap_no_service,
+        "mx_cache_hits": _mx_cache["hits"] - mx_hits,
+        "domains_without_mail": sorted(
+            d for d, intel in domain_cache.items() if (intel.get("mail") or {}).get("accepts") is False),
+        "contact_store_hits": _contact_store["served"] - served,
+        "background_refreshes": _contact_store["scheduled"] - scheduled,
+        "incomplete_lookups": {d: intel["failed"] for d, intel in domain_cache.items() if intel.get("failed")},
+    })
+
+    print(f"[nrs_enricher] Enriched {len(enriched)} findings across {len(domain_cache)} companies")
+    print(f"[nrs_enricher] Network requests: {requests_made} made, {requests_saved} saved by per-domain reuse")
+    print(f"[nrs_enricher] RDAP cache: {rdap_hits}/{rdap_lookups} hits ({RUN_STATS['rdap_cache_hit_ratio']:.0%})")
+    print(f"[nrs_enricher] Contact store: {RUN_STATS['contact_store_hits']} companies served, "
+          f"{RUN_STATS['background_refreshes']} stale ones queued for background refresh")
+    if RUN_STATS["incomplete_lookups"]:
+        print(f"[nrs_enricher] Lookups to retry next sprint: {len(RUN_STATS['incomplete_lookups'])} companies")
+    if RUN_STATS["domains_without_mail"]:
+        print(f"[nrs_enricher] No mail service (addresses dropped): {', '.join(RUN_STATS['domains_without_mail'])}")
     return enriched
 
 
+def _legacy_extract_contacts(html, domain, path):
+    """Pre-streaming extractor (one regex pass per title pattern), kept for benchmark()."""
+    contacts = []
+    for email in set(re.findall(r'[\w.+-]+@[\w-]+\.[\w.]+', html)):
+        if domain in email or domain.split(".")[0] in email:
+            contacts.append({"email": email, "source": f"website{path}"})
+    for pattern, _ in TITLE_PATTERNS:
+        for name in re.findall(rf'([A-Z][a-z]+ [A-Z][a-z]+)[\s,]*(?:{pattern})', html):
+            contacts.append({"name": name, "source": f"website{path}"})
+    return contacts
+
+
+def _synthetic_page(size, contacts=6):
+    """An about page of ~`size` bytes: inline script/style bulk plus a few contacts."""
+    filler = "<p>Somos una empresa líder en servicios financieros del Caribe.</p>\n"
+    script = "<script>window.__DATA__ = {\"items\": [" + ", ".join(["1"] * 200) + "]};</script>\n"
+    style = "<style>.card { margin: 0 auto; padding: 4px; }</style>\n"
+    blocks = []
+    people = [("Maria", "Lopez", "CTO"), ("Juan", "Perez", "CEO"), ("Ana", "Diaz", "CFO"),
+              ("Luis", "Gomez", "CISO"), ("Rosa", "Castro", "COO"), ("Pedro", "Reyes", "Head of IT")]
+    step = max(size // (contacts + 1), 1)
+    total = 0
+    placed = 0
+    while total < size:
+        block = filler * 20 + script + style
+        if placed < contacts and total >= placed * step:
+            first, last, title = people[placed % len(people)]
+            block += f"<li>{first} {last}, {title} &mdash; {first.lower()}@example.com.do</li>\n"
+            placed += 1
+        blocks.append(block)
+        total += len(block)
+    return "".join(blocks)
+
+
+def benchmark(sizes=(250_000, 1_000_000, 4_000_000)):
+    """Compare the legacy multi-pass extractor against the streaming scanner."""
+    print(f"  {'page (KB)':>10} {'legacy (s)':>11} {'stream (s)':>11} {'speedup':>8}")
+    results = []
+    for size in sizes:
+        html = _synthetic_page(size, contacts=4)  # below ENOUGH_CONTACTS: full scan, no early stop
+
+        start = time.perf_counter()
+        expected = _legacy_extract_contacts(html, "example.com.do", "/about")
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = _extract_contacts(html, "example.com.do", "/about")
+        stream_s = time.perf_counter() - start
+
+        key = lambda c: (c.get("email", ""), c.get("name", ""))
+        if sorted(map(key, found)) != sorted(set(map(key, expected))):
+            raise AssertionError(f"streaming extractor differs from legacy at {size} bytes")
+
+        speedup = legacy_s / stream_s if stream_s else float("inf")
+        print(f"  {len(html) // 1000:>10} {legacy_s:>11.4f} {stream_s:>11.4f} {speedup:>7.1f}x")
+        results.append({"bytes": len(html), "legacy_s": legacy_s, "stream_s": stream_s})
+    return results
+
+
 if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit(0)
+
     test = [{
         "domain": "apap.com.do",
         "company_name": "APAP",
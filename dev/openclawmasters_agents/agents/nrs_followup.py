@@ -0,0 +1,344 @@
+"""
+NRS Follow-up Agent — Scheduled Follow-up Letters for NRS v2
+Keeps queued and sent outreach in a heap ordered by follow_up_date, fed
+incrementally from the outreach store (updated_at watermark), so finding
+what is due costs O(log n) per item instead of a queue-directory scan.
+Due sent letters get a short follow-up, composed in batches with the
+original letter as context, and queued for Governor approval.
+"""
+
+import heapq
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from agents import nrs_queue
+from agents import nrs_outreach
+
+
+FOLLOW_UP_DAYS = 7          # follow_up_date of a queued follow-up
+MAX_FOLLOW_UPS = 2          # follow-ups per original letter
+FOLLOW_UP_BATCH = int(os.environ.get("NRS_FOLLOW_UP_BATCH", "10"))  # composed per cycle
+INDEXED_STATUSES = ("queued", "sent")
+CLAIM_LEASE_SECONDS = 900   # overlapping runners skip a letter claimed this recently
+
+FOLLOW_UP_PROMPT = """Write in {lang_name}. This is a short follow-up to the email below, which we sent
+{sent_ago} to {contact_name} at {company} ({domain}) and which has had no reply.
+
+ORIGINAL EMAIL:
+{original}
+
+Do not repeat the original. One sentence recalling the observation, one sentence on why it
+still matters, then the same 15-minute call offer. 50-80 words. End with:
+{sign_off}"""
+
+# Stats for the last run() — read by nrs_runner for the loop log
+RUN_STATS = {}
+
+
+class FollowUpScheduler:
+    """
+    Min-heap of (follow_up_date, id) over queued and sent outreach.
+
+    refresh() pulls only records changed since the last refresh. Entries whose
+    record changed (new date, new status, follow-up written) are superseded lazily:
+    `_keys` holds each record's current date and stale heap entries are skipped
+    when they surface. Due entries are read with peek_due() and stay indexed
+    until done(), so a letter whose follow-up could not be queued comes up again.
+    """
+
+    def __init__(self, store_path=None):
+        self.store_path = store_path
+        self._heap = []
+        self._keys = {}
+        self._status = {}
+        self._watermark = None
+        self._at_watermark = set()  # ids already read at the watermark timestamp
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def refresh(self):
+        """Fold store changes since the last refresh into the heap. Returns rows read."""
+        rows = nrs_queue.changed_since(self._watermark, path=self.store_path)
+        with self._lock:
+            rows = [r for r in rows
+                    if not (r["updated_at"] == self._watermark and r["id"] in self._at_watermark)]
+            for row in rows:
+                record_id, date = row["id"], row["follow_up_date"]
+                if row["status"] not in INDEXED_STATUSES or not date:
+                    self._keys.pop(record_id, None)
+                    self._status.pop(record_id, None)
+                    continue
+                self._status[record_id] = row["status"]
+                if self._keys.get(record_id) != date:
+                    self._keys[record_id] = date
+                    heapq.heappush(self._heap, (date, record_id))
+            if rows:
+                if rows[-1]["updated_at"] != self._watermark:
+                    self._watermark = rows[-1]["updated_at"]
+                    self._at_watermark = set()
+                self._at_watermark.update(r["id"] for r in rows if r["updated_at"] == self._watermark)
+        return len(rows)
+
+    def next_due(self):
+        """Earliest follow_up_date in the index, or None."""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def peek_due(self, now=None, limit=None):
+        """(id, status, date) for entries due at `now`, earliest first; they stay indexed."""
+        now = (now or datetime.now(timezone.utc)).isoformat()
+        taken, due = [], {}
+        with self._lock:
+            while self._heap and (limit is None or len(due) < limit):
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                date, record_id = heapq.heappop(self._heap)
+                if record_id not in due:  # a date set twice leaves a twin entry
+                    taken.append((date, record_id))
+                    due[record_id] = (record_id, self._status[record_id], date)
+            for entry in taken:
+                heapq.heappush(self._heap, entry)
+        return list(due.values())
+
+    def done(self, record_id, date):
+        """Drop a due entry once handled, unless its record has moved to another date since."""
+        with self._lock:
+            if self._keys.get(record_id) == date:
+                del self._keys[record_id]
+                self._status.pop(record_id, None)
+
+    def _drop_stale(self):
+        while self._heap and self._keys.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+
+_scheduler = None
+
+
+def _get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FollowUpScheduler()
+    return _scheduler
+
+
+def _parse_time(value):
+    """ISO timestamp from the store as an aware datetime, or None."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _as_finding(record):
+    """The finding-shaped view of an outreach record that nrs_outreach helpers take."""
+    return {
+        "company_name": record["company"],
+        "domain": record["domain"],
+        "finding_type": record.get("finding_type", ""),
+        "severity": record.get("severity", ""),
+        "risk_score": record.get("risk_score", 0),
+        "outreach_targets": record.get("outreach_targets", []),
+        "details": record.get("details", {}),
+    }
+
+
+def _follow_up_prompt(record, language):
+    finding = _as_finding(record)
+    contact_name = nrs_outreach._letter_facts(finding, language)["contact_name"]
+    sent_at = _parse_time(record.get("sent_at") or record.get("created_at"))
+    days = (datetime.now(timezone.utc) - sent_at).days if sent_at else None
+    if language == "es":
+        sent_ago = f"hace {days} dias" if days is not None else "recientemente"
+    else:
+        sent_ago = f"{days} days ago" if days is not None else "recently"
+    prompt = FOLLOW_UP_PROMPT.format(
+        lang_name="Spanish" if language == "es" else "English",
+        sent_ago=sent_ago,
+        contact_name=contact_name,
+        company=record["company"],
+        domain=record["domain"],
+        original=record.get(f"letter_{language}", ""),
+        sign_off=nrs_outreach.SIGN_OFFS[language],
+    )
+    return prompt, contact_name
+
+
+def _fallback_follow_up(record, language, contact_name):
+    """Template follow-up when the LLM is unavailable."""
+    domain = record["domain"]
+    if language == "es":
+        return f"""Estimado/a {contact_name},
+
+Le escribo brevemente para retomar la nota que le enviamos sobre una configuracion visible en {domain}. La observacion sigue presente en nuestra ultima revision.
+
+Si le resulta util, con gusto la repasamos en una llamada de 15 minutos.
+
+{nrs_outreach.SIGN_OFFS['es']}"""
+    return f"""Dear {contact_name},
+
+A brief follow-up on the note we sent about a publicly visible configuration on {domain}. The observation is still present in our latest review.
+
+If useful, I am glad to walk through it on a 15-minute call.
+
+{nrs_outreach.SIGN_OFFS['en']}"""
+
+
+def _compose_follow_up(record, language, timeout):
+    """One follow-up letter. Returns (letter, outcome) like nrs_outreach._compose."""
+    prompt, contact_name = _follow_up_prompt(record, language)
+    letter, outcome = nrs_outreach._generate_with_timeout(prompt, timeout, max_tokens=320)
+    if not letter:
+        letter = _fallback_follow_up(record, language, contact_name)
+    return letter.strip(), outcome
+
+
+def compose_follow_ups(records, concurrency=nrs_outreach.COMPOSE_CONCURRENCY,
+                       timeout=nrs_outreach.COMPOSE_TIMEOUT):
+    """
+    Compose Spanish and English follow-ups for a batch of sent records concurrently.
+    Returns list (same order) of {language: (letter, outcome)}, or None for a
+    record whose composition failed (the rest of the batch is unaffected).
+    """
+    jobs = [(i, language) for i in range(len(records)) for language in nrs_outreach.LANGUAGES]
+    results = [{} for _ in records]
+    if not jobs:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs)))) as executor:
+        futures = {job: executor.submit(_compose_follow_up, records[job[0]], job[1], timeout)
+                   for job in jobs}
+        for (i, language), future in futures.items():
+            try:
+                letter = future.result()
+            except Exception as e:
+                print(f"  [nrs_followup] Could not compose follow-up for {records[i]['company']}: {e}")
+                results[i] = None
+                continue
+            if results[i] is not None:
+                results[i][language] = letter
+    return results
+
+
+def queue_follow_up(record, letters, token):
+    """
+    Queue a follow-up for Governor approval and retire the original's follow-up
+    date (one store transaction, guarded by the original's claim `token`).
+    Returns the queued record, or None if another runner took the original over.
+    """
+    now = datetime.now(timezone.utc)
+    number = record.get("follow_up_number", 0) + 1
+    follow_up = {
+        "company": record["company"],
+        "domain": record["domain"],
+        "finding_type": record.get("finding_type", ""),
+        "severity": record.get("severity", ""),
+        "risk_score": record.get("risk_score", 0),
+        "outreach_targets": record.get("outreach_targets", []),
+        "letter_es": letters["es"][0],
+        "letter_en": letters["en"][0],
+        "subject_es": "Re: " + record.get("subject_es", ""),
+        "subject_en": "Re: " + record.get("subject_en", ""),
+        "fingerprint": record.get("fingerprint"),
+        "kind": "follow_up",
+        "follow_up_of": record["id"],
+        "follow_up_number": number,
+        "follow_up_date": ((now + timedelta(days=FOLLOW_UP_DAYS)).isoformat()
+                           if number < MAX_FOLLOW_UPS else None),
+        "status": "queued",
+        "created_at": now.isoformat(),
+    }
+    stamp = now.strftime("%Y%m%d_%H%M%S")
+    slug = record["company"].lower().replace(" ", "_")
+    queued = nrs_queue.add_follow_up(record["id"], follow_up, token, filename=f"followup_{slug}_{stamp}.json")
+    if queued is not None and nrs_outreach.QUEUE_EXPORT:
+        nrs_queue.export_record(queued)
+    return queued
+
+
+def run(limit=FOLLOW_UP_BATCH, now=None):
+    """
+    One follow-up cycle: refresh the index, read what is due, compose and queue
+    follow-ups for sent letters. Due letters still waiting for approval are only
+    reported (and rescheduled) — there is nothing to follow up on yet.
+    Sent letters are claimed before composing, so overlapping runners never
+    follow up on the same letter twice. A letter leaves the index only once its
+    follow-up is queued; one that could not be claimed, composed or queued is
+    tried again next cycle.
+
+    Returns:
+        List of queued follow-up records
+    """
+    scheduler = _get_scheduler()
+    changed = scheduler.refresh()
+    now = now or datetime.now(timezone.utc)
+
+    due = scheduler.peek_due(now, limit)
+    token = uuid.uuid4().hex
+    records, awaiting, claimed_elsewhere, failed = [], [], 0, 0
+    for record_id, status, date in due:
+        if status == "sent":
+            record = nrs_queue.claim(record_id, "sent", token, lease_seconds=CLAIM_LEASE_SECONDS)
+            # Still due once claimed: another runner may have just followed it up
+            if record is None or not record.get("follow_up_date") or record["follow_up_date"] > now.isoformat():
+                claimed_elsewhere += 1
+                continue
+            if record.get("follow_up_number", 0) < MAX_FOLLOW_UPS:
+                records.append((record, date))
+            else:
+                scheduler.done(record_id, date)
+            continue
+        record = nrs_queue.get(record_id)
+        if record is not None and status == "queued":
+            awaiting.append(record)
+            nrs_queue.update(record_id, follow_up_date=(now + timedelta(days=FOLLOW_UP_DAYS)).isoformat())
+        scheduler.done(record_id, date)
+
+    queued = []
+    if records:
+        print(f"[nrs_followup] Composing follow-ups for {len(records)} letter(s)...")
+        composed = compose_follow_ups([record for record, _ in records])
+        for (record, date), letters in zip(records, composed):
+            if letters is None:
+                failed += 1
+                continue
+            try:
+                follow_up = queue_follow_up(record, letters, token)
+            except Exception as e:
+                print(f"  [nrs_followup] Could not queue follow-up for {record['company']}: {e}")
+                failed += 1
+                continue
+            if follow_up is None:
+                claimed_elsewhere += 1
+                continue
+            scheduler.done(record["id"], date)
+            queued.append(follow_up)
+            print(f"    Follow-up queued: {record['company']} (#{record['id']})")
+    if awaiting:
+        print(f"[nrs_followup] {len(awaiting)} letter(s) past follow-up date still awaiting approval: "
+              + ", ".join(r["company"] for r in awaiting))
+
+    RUN_STATS.clear()
+    RUN_STATS.update({
+        "index_size": len(scheduler),
+        "index_changes": changed,
+        "due": len(due),
+        "follow_ups_queued": len(queued),
+        "awaiting_approval": len(awaiting),
+        "claimed_elsewhere": claimed_elsewhere,
+        "failed": failed,
+        "next_due": scheduler.next_due(),
+    })
+    return queued
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"[nrs_followup] {len(results)} follow-up(s) queued | next due: {RUN_STATS['next_due'] or 'none'}")
@@ -2,21 +2,56 @@
 NRS Outreach Composer Agent — Professional Letter Generation for NRS v2
 Uses llm.generate() with specialized system prompt.
 Generates bilingual outreach letters (Spanish primary, English secondary).
-Queues to content/queue/nrs/ for Governor approval.
+Queues to the outreach store (exported to content/queue/nrs/) for Governor approval.
 """
 
+import hashlib
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 # Import LLM from same agents directory
 from agents.llm import generate
+try:
+    from agents.llm import generate_stream
+except ImportError:
+    generate_stream = None
+from agents import nrs_queue
 
 
 QUEUE_DIR = Path("content/queue/nrs")
+# The outreach store is the source of truth; each queued letter is also written
+# to QUEUE_DIR for the Governor unless NRS_QUEUE_EXPORT=0 (use nrs_queue --export later)
+QUEUE_EXPORT = os.environ.get("NRS_QUEUE_EXPORT", "1") != "0"
+# A finding already queued/approved, or sent within this many days (or before its
+# follow_up_date), is not written up again
+SUPPRESS_WINDOW_DAYS = int(os.environ.get("NRS_SUPPRESS_DAYS", "30"))
 TEMPLATES_DIR = Path.home() / ".openclaw" / "squadrons" / "nrs-v2" / "config" / "templates"
 
+# Letters composed in parallel (also the LLM requests in flight); an LLM request
+# that times out after COMPOSE_TIMEOUT seconds falls back to the template
+COMPOSE_CONCURRENCY = int(os.environ.get("NRS_COMPOSE_CONCURRENCY", "4"))
+COMPOSE_TIMEOUT = float(os.environ.get("NRS_COMPOSE_TIMEOUT", "60"))
+LANGUAGES = ("es", "en")
+
+# Generated letters are reused when the exact same prompt comes back (same
+# company, finding, score bucket, language...). Bump SYSTEM_PROMPT_VERSION
+# whenever SYSTEM_PROMPT changes so stale wording is not served.
+LETTER_CACHE_FILE = Path("memory/letter_cache.json")
+LETTER_CACHE_DAYS = 30
+LETTER_CACHE_ENABLED = os.environ.get("NRS_LETTER_CACHE", "1") != "0"
+SCORE_BUCKET = 0.1  # risk score granularity in prompts (and so in cache keys)
+_letter_cache = {"entries": None, "dirty": False}
+_letter_cache_lock = threading.Lock()
+
+# Stats for the last run() — read by nrs_chief for the run log
+RUN_STATS = {}
+
 # System prompt for outreach generation
 SYSTEM_PROMPT = """You write cold outreach emails for OpenClaw Masters, a cybersecurity intelligence firm
 based in Santo Domingo that provides silent infrastructure monitoring to enterprises across Latin America.
@@ -41,6 +76,41 @@ ABSOLUTE RULES:
 - Total letter: 100-130 words. Not 150. Shorter is stronger.
 - Write ONLY the letter body. No headers, no JSON, no markdown.
 - Sound like a person wrote this at 10pm after reviewing their notes, not like a template."""
+SYSTEM_PROMPT_VERSION = "1"
+
+# Words SYSTEM_PROMPT forbids (with their Spanish forms) and its length window;
+# used to validate letters from the bilingual single-call mode
+BANNED_WORDS = [
+    "vulnerability", "hack", "breach", "attack", "threat", "danger",
+    "best-in-class", "cutting-edge", "state-of-the-art",
+    "vulnerabilidad", "hackeo", "hacker", "brecha", "ataque", "amenaza", "peligro",
+]
+LETTER_MIN_WORDS = 100
+LETTER_MAX_WORDS = 130
+
+# Bilingual mode asks for both letters in one JSON completion
+COMPOSE_BILINGUAL = os.environ.get("NRS_COMPOSE_BILINGUAL", "0") == "1"
+SIGN_OFFS = {
+    "es": "Atentamente,\nOpenClaw Masters",
+    "en": "Best regards,\nOpenClaw Masters",
+}
+_bilingual_stats = {"calls": 0, "parts_rejected": 0}
+_bilingual_lock = threading.Lock()
+
+# Per-language letters are streamed when the LLM module offers generate_stream:
+# the stream is cut once the sign-off has been written or the letter runs
+# STREAM_WORD_SLACK words past LETTER_MAX_WORDS (NRS_STREAM_LETTERS=0 waits for
+# the full completion instead)
+STREAM_LETTERS = os.environ.get("NRS_STREAM_LETTERS", "1") != "0"
+STREAM_WORD_SLACK = 15
+LETTER_MAX_TOKENS = 512
+_SIGN_OFF_RES = {
+    language: re.compile(r"\s*\n\s*".join(re.escape(line) for line in sign_off.split("\n")), re.IGNORECASE)
+    for language, sign_off in SIGN_OFFS.items()
+}
+# One entry per LLM letter (chunks, latency, why generation stopped); run() reports its slice
+_generation_log = []
+_generation_lock = threading.Lock()
 
 
 # Finding-specific context for the LLM — business impact oriented
@@ -67,16 +137,11 @@ FINDING_CONTEXT = {
 }
 
 
-def compose_letter(finding, language="es"):
+def _letter_facts(finding, language):
     """
-    Compose a personalized outreach letter for a finding.
-
-    Args:
-        finding: Enriched finding dict from nrs_enricher
-        language: "es" (Spanish) or "en" (English)
-
-    Returns:
-        Letter text string
+    Everything a letter prompt says about the finding and its recipient. The risk
+    score is rounded to SCORE_BUCKET, so a rescan whose score drifted a little
+    writes the same prompt and hits the letter cache.
     """
     company = finding["company_name"]
     domain = finding["domain"]
@@ -96,28 +161,404 @@ def compose_letter(finding, language="es"):
 
     finding_context = FINDING_CONTEXT.get(ftype, "a security signal was detected")
 
+    return {
+        "company": company,
+        "domain": domain,
+        "contact_name": contact_name,
+        "finding_context": finding_context,
+        "issue": issue,
+        "narrative": narrative,
+        "severity": severity,
+        "risk_score": round(round(risk_score / SCORE_BUCKET) * SCORE_BUCKET, 2),
+    }
+
+
+def _letter_prompt(finding, language):
+    """Build the LLM prompt for one letter. Returns (prompt, contact_name)."""
+    facts = _letter_facts(finding, language)
     lang_name = 'Spanish' if language == 'es' else 'English'
-    sign_off = 'Atentamente,\nOpenClaw Masters' if language == 'es' else 'Best regards,\nOpenClaw Masters'
 
-    prompt = f"""Write in {lang_name}. Company: {company} ({domain}). Recipient: {contact_name}.
+    prompt = f"""Write in {lang_name}. Company: {facts['company']} ({facts['domain']}). Recipient: {facts['contact_name']}.
 
-WHAT WE FOUND: {finding_context}
-SPECIFIC: {issue}
-WHY IT MATTERS: {narrative}
-SEVERITY: {severity.upper()} (score {risk_score:.0%})
+WHAT WE FOUND: {facts['finding_context']}
+SPECIFIC: {facts['issue']}
+WHY IT MATTERS: {facts['narrative']}
+SEVERITY: {facts['severity'].upper()} (score {facts['risk_score']:.0%})
 
 Write the email body only. End with:
-{sign_off}
+{SIGN_OFFS[language]}
 
 100-130 words maximum. Sound like a real person, not a template."""
 
-    letter = generate(prompt, system=SYSTEM_PROMPT, max_tokens=512, temperature=0.6)
+    return prompt, facts["contact_name"]
+
+
+def _bilingual_prompt(finding):
+    """Prompt asking for the Spanish and English letters as one JSON object."""
+    es = _letter_facts(finding, "es")
+    en = _letter_facts(finding, "en")
+
+    return f"""Write the same email twice: once in Spanish ("es"), once in English ("en").
+Company: {es['company']} ({es['domain']}). Recipient: {es['contact_name']} (Spanish) / {en['contact_name']} (English).
+
+WHAT WE FOUND: {es['finding_context']}
+SPECIFIC: {es['issue']}
+WHY IT MATTERS: {es['narrative']}
+SEVERITY: {es['severity'].upper()} (score {es['risk_score']:.0%})
+
+End the Spanish letter with:
+{SIGN_OFFS['es']}
+End the English letter with:
+{SIGN_OFFS['en']}
+
+Each letter 100-130 words. Sound like a real person, not a template.
+For this request only, return the two letter bodies as a single JSON object and nothing else:
+{{"es": "<Spanish letter>", "en": "<English letter>"}}"""
+
+
+def _generate_with_timeout(prompt, timeout, max_tokens=512):
+    """
+    Run one LLM completion in the caller's thread within `timeout` seconds in all,
+    retries and provider failover included (None: the LLM module's defaults). The
+    request is dropped on timeout, so nothing keeps generating after the letter has
+    fallen back to the template.
+    Returns (text or None, outcome) with outcome "ok", "empty", "timeout" or "error".
+    """
+    started = time.monotonic()
+    options = {} if timeout is None else {"timeout": timeout, "deadline": timeout}
+    try:
+        text = generate(prompt, system=SYSTEM_PROMPT, max_tokens=max_tokens, temperature=0.6, **options)
+    except Exception:
+        return None, "error"
+    if text:
+        return text, "ok"
+    if timeout is not None and time.monotonic() - started >= timeout:
+        return None, "timeout"
+    return None, "empty"
+
+
+def _stream_with_timeout(prompt, language, timeout, max_tokens=LETTER_MAX_TOKENS):
+    """
+    Stream one letter in the caller's thread, stopping at the sign-off or the word
+    budget. `timeout` bounds opening the stream (retries and failover included),
+    each read of it and the letter as a whole (checked per chunk); the stream is
+    closed either way, so the provider stops generating.
+    Returns (text or None, outcome, metrics); metrics hold the streamed chunks
+    (SSE deltas, not tokens), latency, time to first chunk and the stop reason
+    ("sign_off", "word_budget", "timeout" or "end").
+    """
+    text, chunks, stop, first_chunk, failed = "", 0, "end", None, False
+    started = time.monotonic()
+    word_budget = LETTER_MAX_WORDS + STREAM_WORD_SLACK
+    options = {} if timeout is None else {"timeout": timeout, "deadline": timeout}
+    stream = None
+    try:
+        stream = generate_stream(prompt, system=SYSTEM_PROMPT, max_tokens=max_tokens, temperature=0.6, **options)
+        for chunk in stream:
+            if first_chunk is None:
+                first_chunk = time.monotonic() - started
+            text += chunk
+            chunks += 1
+            if _SIGN_OFF_RES[language].search(text):
+                stop = "sign_off"
+                break
+            if len(text.split()) > word_budget:
+                stop = "word_budget"
+                break
+            if timeout is not None and time.monotonic() - started > timeout:
+                stop = "timeout"
+                break
+    except Exception:
+        failed = True
+    finally:
+        # Closing the generator drops the connection, so the provider stops generating
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+    latency = time.monotonic() - started
+    if not text.strip() and timeout is not None and latency >= timeout:
+        stop = "timeout"
+    metrics = {
+        "mode": "stream",
+        "chunks": chunks,
+        "max_tokens": max_tokens,
+        "latency": round(latency, 3),
+        "first_chunk": round(first_chunk, 3) if first_chunk is not None else None,
+        "stop": stop,
+    }
+    if stop == "timeout":
+        return None, "timeout", metrics
+    if failed:
+        return None, "error", metrics
+    return (text, "ok", metrics) if text.strip() else (None, "empty", metrics)
+
+
+def _trim_letter(letter, language):
+    """
+    Cut a letter after its sign-off; a letter that never signed off and ran past
+    LETTER_MAX_WORDS keeps its whole sentences up to the limit, then gets the sign-off.
+    """
+    match = _SIGN_OFF_RES[language].search(letter)
+    if match:
+        return letter[:match.end()].strip()
+    if len(letter.split()) <= LETTER_MAX_WORDS:
+        return letter.strip()
+    budget = LETTER_MAX_WORDS - len(SIGN_OFFS[language].split())
+    kept, words = [], 0
+    for sentence in re.findall(r"[^.?!]+[.?!]+[\"')\]]*\s*|[^.?!]+$", letter):
+        if words + len(sentence.split()) > budget:
+            break
+        kept.append(sentence)
+        words += len(sentence.split())
+    body = "".join(kept).strip()
+    if words < LETTER_MIN_WORDS - len(SIGN_OFFS[language].split()):
+        # No usable sentence boundary (one run-on paragraph): cut after the last
+        # word within budget, keeping the letter's own line breaks
+        last_word = list(re.finditer(r"\S+", letter))[budget - 1]
+        body = letter[:last_word.end()].strip()
+    return body + "\n\n" + SIGN_OFFS[language]
+
+
+def _generate_letter(prompt, language, timeout):
+    """
+    One per-language LLM letter: streamed when the LLM module can stream
+    (and STREAM_LETTERS), otherwise one blocking call. The text is trimmed
+    to the sign-off / word limit. Returns (text or None, outcome, metrics).
+    """
+    if STREAM_LETTERS and generate_stream is not None:
+        text, outcome, metrics = _stream_with_timeout(prompt, language, timeout)
+    else:
+        started = time.monotonic()
+        text, outcome = _generate_with_timeout(prompt, timeout, max_tokens=LETTER_MAX_TOKENS)
+        metrics = {"mode": "blocking", "chunks": None, "max_tokens": LETTER_MAX_TOKENS,
+                   "latency": round(time.monotonic() - started, 3), "first_chunk": None, "stop": outcome}
+    if text:
+        metrics["words_generated"] = len(text.split())
+        text = _trim_letter(text, language)
+        metrics["words_kept"] = len(text.split())
+    return text, outcome, metrics
+
+
+def _letter_cache_key(prompt, language):
+    """Content address of a letter: everything that shapes the LLM output."""
+    material = "\x00".join([SYSTEM_PROMPT_VERSION, language, prompt])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _load_letter_cache():
+    """Load the on-disk letter cache once per process."""
+    if _letter_cache["entries"] is None:
+        entries = {}
+        if LETTER_CACHE_FILE.exists():
+            try:
+                with open(LETTER_CACHE_FILE, encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        _letter_cache["entries"] = entries
+    return _letter_cache["entries"]
+
+
+def _save_letter_cache():
+    """Persist the letter cache if it changed, dropping expired letters (atomic replace)."""
+    with _letter_cache_lock:
+        if not _letter_cache["dirty"]:
+            return
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=LETTER_CACHE_DAYS)).isoformat()
+        entries = {k: v for k, v in _letter_cache["entries"].items() if v.get("created_at", "") >= cutoff}
+        _letter_cache["entries"] = entries
+        _letter_cache["dirty"] = False
+    LETTER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = LETTER_CACHE_FILE.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, LETTER_CACHE_FILE)
+
+
+def _cached_letter(key):
+    """A cached letter younger than LETTER_CACHE_DAYS, or None."""
+    with _letter_cache_lock:
+        entry = _load_letter_cache().get(key)
+    if not entry:
+        return None
+    try:
+        created_at = datetime.fromisoformat(entry["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if datetime.now(timezone.utc) - created_at > timedelta(days=LETTER_CACHE_DAYS):
+        return None
+    return entry.get("letter")
+
+
+def _cache_letter(key, letter, finding, language):
+    """Remember an LLM-written letter under its prompt hash."""
+    with _letter_cache_lock:
+        _load_letter_cache()[key] = {
+            "letter": letter,
+            "company": finding["company_name"],
+            "finding_type": finding.get("finding_type", ""),
+            "language": language,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _letter_cache["dirty"] = True
+
+
+def letter_problems(letter):
+    """
+    Check a letter against SYSTEM_PROMPT's hard rules.
+    Returns a list of problems (empty when the letter is usable).
+    """
+    problems = []
+    words = len(letter.split())
+    if not LETTER_MIN_WORDS <= words <= LETTER_MAX_WORDS:
+        problems.append(f"{words} words")
+    lowered = letter.lower()
+    # Whole words, plurals included ("attacks"), but not "hackathon"
+    banned = [w for w in BANNED_WORDS if re.search(rf"\b{re.escape(w)}(?:s|es)?\b", lowered)]
+    if banned:
+        problems.append("banned: " + ", ".join(banned))
+    if "!" in letter or "¡" in letter:
+        problems.append("exclamation mark")
+    return problems
+
+
+def _parse_bilingual(text):
+    """Pull {"es": ..., "en": ...} out of a completion (tolerates code fences). Returns dict."""
+    if not text:
+        return {}
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        # strict=False: models often put raw newlines inside the letter strings
+        data = json.loads(text[start:end + 1], strict=False)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {lang: data[lang].strip() for lang in LANGUAGES if isinstance(data.get(lang), str)}
+
+
+def _compose(finding, language, timeout=None, use_cache=LETTER_CACHE_ENABLED, validate=False):
+    """
+    Compose one letter. Returns (letter, outcome); outcome is "ok" for a fresh LLM
+    letter, "cached" for a letter-cache hit, otherwise the template was used.
+    With `validate`, an LLM letter failing letter_problems() is replaced by the template
+    (outcome "invalid").
+    """
+    prompt, contact_name = _letter_prompt(finding, language)
+
+    key = _letter_cache_key(prompt, language) if use_cache else None
+    if key:
+        cached = _cached_letter(key)
+        if cached:
+            return cached, "cached"
+
+    letter, outcome, metrics = _generate_letter(prompt, language, timeout)
+    with _generation_lock:
+        _generation_log.append(dict(metrics, company=finding["company_name"], language=language))
+    if letter and validate and letter_problems(letter.strip()):
+        letter, outcome = None, "invalid"
+    if letter and key:
+        _cache_letter(key, letter.strip(), finding, language)
 
     if not letter:
         # Fallback to template
         letter = _fallback_template(finding, language, contact_name)
 
-    return letter.strip()
+    return letter.strip(), outcome
+
+
+def _compose_bilingual(finding, timeout=None, use_cache=LETTER_CACHE_ENABLED):
+    """
+    Compose both letters with one LLM call returning JSON.
+    Each part is validated on its own; only a part that is missing or fails
+    letter_problems() is redone with a per-language call (template if that fails too).
+    Returns {language: (letter, outcome)}.
+    """
+    keys = {}
+    results = {}
+    for language in LANGUAGES:
+        prompt, _ = _letter_prompt(finding, language)
+        keys[language] = _letter_cache_key(prompt, language) if use_cache else None
+        cached = _cached_letter(keys[language]) if keys[language] else None
+        if cached:
+            results[language] = (cached, "cached")
+
+    missing = [language for language in LANGUAGES if language not in results]
+    if len(missing) == len(LANGUAGES):
+        text, _ = _generate_with_timeout(_bilingual_prompt(finding), timeout, max_tokens=1024)
+        parts = _parse_bilingual(text)
+        rejected = 0
+        for language in LANGUAGES:
+            letter = parts.get(language)
+            if letter and not letter_problems(letter):
+                results[language] = (letter, "ok")
+                if keys[language]:
+                    _cache_letter(keys[language], letter, finding, language)
+            else:
+                rejected += 1
+        with _bilingual_lock:
+            _bilingual_stats["calls"] += 1
+            _bilingual_stats["parts_rejected"] += rejected
+
+    for language in LANGUAGES:
+        if language not in results:
+            results[language] = _compose(finding, language, timeout, use_cache, validate=True)
+    return {language: results[language] for language in LANGUAGES}
+
+
+def compose_letter(finding, language="es", timeout=None, use_cache=LETTER_CACHE_ENABLED):
+    """
+    Compose a personalized outreach letter for a finding.
+
+    Args:
+        finding: Enriched finding dict from nrs_enricher
+        language: "es" (Spanish) or "en" (English)
+        timeout: Seconds to wait for the LLM before using the template (None = no limit)
+        use_cache: Reuse a letter generated earlier for the identical prompt
+
+    Returns:
+        Letter text string
+    """
+    letter = _compose(finding, language, timeout, use_cache)[0]
+    _save_letter_cache()
+    return letter
+
+
+def compose_letters(findings, concurrency=COMPOSE_CONCURRENCY, timeout=COMPOSE_TIMEOUT,
+                    use_cache=LETTER_CACHE_ENABLED, bilingual=COMPOSE_BILINGUAL):
+    """
+    Compose the Spanish and English letters for every finding concurrently.
+    At most `concurrency` LLM calls run at once, each request timing out after `timeout` seconds;
+    a call that fails or times out falls back to the template for that letter only.
+    Letters already in the letter cache skip the LLM (unless use_cache is False).
+    With `bilingual`, each finding's two letters come from one JSON completion
+    (see _compose_bilingual).
+
+    Returns:
+        List (same order as `findings`) of {language: (letter, outcome)} dicts
+    """
+    if not findings:
+        return []
+
+    if bilingual:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(findings)))) as executor:
+            futures = [executor.submit(_compose_bilingual, f, timeout, use_cache) for f in findings]
+            results = [future.result() for future in futures]
+        _save_letter_cache()
+        return results
+
+    jobs = [(i, language) for i in range(len(findings)) for language in LANGUAGES]
+    results = [{} for _ in findings]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs)))) as executor:
+        futures = {job: executor.submit(_compose, findings[job[0]], job[1], timeout, use_cache)
+                   for job in jobs}
+        for (i, language), future in futures.items():
+            results[i][language] = future.result()
+    _save_letter_cache()
+    return results
 
 
 def _fallback_template(finding, language, contact_name):
@@ -225,11 +666,9 @@ def compose_subject(finding, language="es"):
 
 def queue_outreach(finding, letter_es, letter_en, subject_es, subject_en):
     """
-    Save outreach to queue for Governor approval.
-    Returns path to queued file.
+    Save outreach to the outreach store (status "queued") for Governor approval.
+    Returns path to the queued file, or the store reference when export is off.
     """
-    QUEUE_DIR.mkdir(parents=True, exist_ok=True)
-
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     company_slug = finding["company_name"].lower().replace(" ", "_")
     filename = f"outreach_{company_slug}_{timestamp}.json"
@@ -245,30 +684,48 @@ def queue_outreach(finding, letter_es, letter_en, subject_es, subject_en):
         "letter_en": letter_en,
         "subject_es": subject_es,
         "subject_en": subject_en,
+        "fingerprint": nrs_queue.fingerprint(finding),
         "follow_up_date": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
         "status": "queued",
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
-    filepath = QUEUE_DIR / filename
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(outreach, f, indent=2, ensure_ascii=False)
+    record = nrs_queue.add(outreach, filename=filename)
+    if not QUEUE_EXPORT:
+        return f"{nrs_queue.STORE_FILE}#{record['id']}"
+    return str(nrs_queue.export_record(record, {**nrs_queue.EXPORT_DIRS, "queued": QUEUE_DIR}))
 
-    return str(filepath)
 
+def _duplicate_of(finding, window_days):
+    """Outreach record that already covers this finding, or None."""
+    return nrs_queue.suppressing_record(
+        finding["domain"], finding.get("finding_type", ""), nrs_queue.fingerprint(finding), window_days)
 
-def run(enriched_findings):
+
+def run(enriched_findings, concurrency=COMPOSE_CONCURRENCY, timeout=COMPOSE_TIMEOUT,
+        use_cache=LETTER_CACHE_ENABLED, bilingual=COMPOSE_BILINGUAL, suppress_days=SUPPRESS_WINDOW_DAYS):
     """
     Compose outreach letters for each enriched finding.
 
     Args:
         enriched_findings: Findings from nrs_enricher
+        concurrency: Max LLM calls in flight (1 composes one letter at a time)
+        timeout: Seconds per LLM call before that letter uses the template
+        use_cache: Serve letters for unchanged prompts from the letter cache
+                   (NRS_LETTER_CACHE=0 turns it off by default)
+        bilingual: One JSON completion per company for both languages
+                   (NRS_COMPOSE_BILINGUAL=1 turns it on by default)
+        suppress_days: Dedup window for already-contacted findings (None disables)
 
     Returns:
         List of outreach dicts with letters and queue paths
     """
     print("[nrs_outreach] Composing outreach letters...")
     outreach_results = []
+    started = time.monotonic()
+    bilingual_calls = _bilingual_stats["calls"]
+    bilingual_rejected = _bilingual_stats["parts_rejected"]
+    generation_start = len(_generation_log)
 
     # Group findings by company to send one letter per company
     by_company = {}
@@ -278,14 +735,43 @@ def run(enriched_findings):
             by_company[company] = []
         by_company[company].append(f)
 
-    for company, findings in by_company.items():
-        # Use the highest severity finding as the primary
-        primary = findings[0]  # Already sorted by risk_score
-        print(f"  [nrs_outreach] Composing for {company} ({len(findings)} finding(s))...")
-
-        # Compose bilingual letters
-        letter_es = compose_letter(primary, language="es")
-        letter_en = compose_letter(primary, language="en")
+    # Use the highest severity finding as the primary, skipping findings the
+    # company was already written to about (checked before any LLM work)
+    suppressed = []
+    companies = []
+    for company, findings in by_company.items():  # Already sorted by risk_score
+        primary = None
+        for finding in findings:
+            existing = _duplicate_of(finding, suppress_days) if suppress_days is not None else None
+            if existing is None:
+                primary = finding
+                break
+            suppressed.append({
+                "company": company,
+                "domain": finding["domain"],
+                "finding_type": finding.get("finding_type", ""),
+                "existing_id": existing["id"],
+                "existing_status": existing["status"],
+            })
+        if primary is not None:
+            companies.append((company, findings, primary))
+    if suppressed:
+        print(f"  [nrs_outreach] Suppressed {len(suppressed)} finding(s) already in outreach")
+
+    primaries = [primary for _, _, primary in companies]
+    print(f"  [nrs_outreach] Composing {len(primaries) * len(LANGUAGES)} letters "
+          f"for {len(primaries)} companies ({concurrency} at a time)...")
+    letters = compose_letters(primaries, concurrency=concurrency, timeout=timeout,
+                              use_cache=use_cache, bilingual=bilingual)
+
+    outcomes = {}
+    for (company, findings, primary), composed in zip(companies, letters):
+        for _, outcome in composed.values():
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        # Bilingual letters
+        letter_es = composed["es"][0]
+        letter_en = composed["en"][0]
         subject_es = compose_subject(primary, language="es")
         subject_en = compose_subject(primary, language="en")
 
@@ -306,7 +792,42 @@ def run(enriched_findings):
 
         print(f"    Queued: {queue_path}")
 
+    with _generation_lock:
+        generation = _generation_log[generation_start:]
+    streamed = [g for g in generation if g["mode"] == "stream"]
+    latencies = [g["latency"] for g in generation if g["stop"] != "timeout"]
+
+    RUN_STATS.clear()
+    RUN_STATS.update({
+        "companies": len(outreach_results),
+        "suppressed": suppressed,
+        "letters_llm": outcomes.get("ok", 0),
+        "letters_cached": outcomes.get("cached", 0),
+        "letters_fallback": sum(n for outcome, n in outcomes.items() if outcome not in ("ok", "cached")),
+        "llm_timeouts": outcomes.get("timeout", 0),
+        "llm_errors": outcomes.get("error", 0) + outcomes.get("empty", 0),
+        "letters_invalid": outcomes.get("invalid", 0),
+        "bilingual_calls": _bilingual_stats["calls"] - bilingual_calls,
+        "bilingual_parts_rejected": _bilingual_stats["parts_rejected"] - bilingual_rejected,
+        "letters_streamed": len(streamed),
+        "stream_early_stops": sum(1 for g in streamed if g["stop"] in ("sign_off", "word_budget")),
+        # SSE deltas, not tokens: a stream cut early never gets the provider's usage chunk
+        "stream_chunks": sum(g["chunks"] for g in streamed),
+        "letter_latency_avg": round(sum(latencies) / len(latencies), 2) if latencies else None,
+        "letter_latency_max": max(latencies) if latencies else None,
+        "letter_generation": generation,
+        "compose_seconds": round(time.monotonic() - started, 2),
+    })
+
     print(f"[nrs_outreach] {len(outreach_results)} outreach letters queued for approval")
+    if RUN_STATS["letters_cached"]:
+        print(f"[nrs_outreach] {RUN_STATS['letters_cached']} letter(s) served from the letter cache")
+    if streamed:
+        print(f"[nrs_outreach] Streamed {len(streamed)} letter(s) in {RUN_STATS['stream_chunks']} chunks, "
+              f"{RUN_STATS['stream_early_stops']} cut early, {RUN_STATS['letter_latency_avg']}s avg per letter")
+    if RUN_STATS["letters_fallback"]:
+        print(f"[nrs_outreach] {RUN_STATS['letters_fallback']} letter(s) used the fallback template "
+              f"({RUN_STATS['llm_timeouts']} timed out)")
     return outreach_results
 
 
@@ -0,0 +1,574 @@
+"""
+NRS Queue — Indexed Outreach Store for NRS v2
+Holds queued, approved and sent outreach in one SQLite (WAL) database,
+indexed by company, domain, status and follow_up_date.
+Per-status counts are kept by triggers, so counting never scans.
+export_dirs()/import_dirs() mirror the store to content/{queue,approved,sent}/nrs/
+so the Governor approval flow keeps working on plain JSON files; a letter whose
+file the Governor deletes becomes "rejected".
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+
+STORE_FILE = Path("memory/nrs_outreach.db")
+STATUSES = ("queued", "approved", "sent", "rejected")
+PENDING_STATUSES = ("queued", "approved")   # waiting on the Governor (or the sender)
+EXPORT_DIRS = {
+    "queued": Path("content/queue/nrs"),
+    "approved": Path("content/approved/nrs"),
+    "sent": Path("content/sent/nrs"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    company TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    finding_type TEXT NOT NULL DEFAULT '',
+    fingerprint TEXT,
+    status TEXT NOT NULL,
+    follow_up_date TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outreach_company ON outreach (company);
+CREATE INDEX IF NOT EXISTS outreach_domain ON outreach (domain, finding_type);
+CREATE INDEX IF NOT EXISTS outreach_status ON outreach (status);
+CREATE INDEX IF NOT EXISTS outreach_follow_up ON outreach (follow_up_date);
+
+-- Files last seen in the export directories, so import_dirs() parses only
+-- changed files and notices deleted ones
+CREATE TABLE IF NOT EXISTS dir_files (
+    filename TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS status_counts (
+    status TEXT PRIMARY KEY,
+    n INTEGER NOT NULL DEFAULT 0
+);
+CREATE TRIGGER IF NOT EXISTS outreach_count_insert AFTER INSERT ON outreach BEGIN
+    INSERT INTO status_counts (status, n) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS outreach_count_delete AFTER DELETE ON outreach BEGIN
+    UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+END;
+CREATE TRIGGER IF NOT EXISTS outreach_count_update AFTER UPDATE OF status ON outreach
+WHEN OLD.status != NEW.status BEGIN
+    UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+    INSERT INTO status_counts (status, n) VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET n = n + 1;
+END;
+"""
+
+# Detail fields that change between scans of the same underlying problem
+VOLATILE_DETAIL_KEYS = {"issue", "error", "status"}
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def _connect(path=None):
+    """
+    Open the store. Autocommit mode: writers take BEGIN IMMEDIATE themselves so
+    read-modify-write sequences are atomic across processes.
+    """
+    path = Path(path or STORE_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    with _init_lock:
+        if str(path) not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _migrate(conn)
+            _initialized.add(str(path))
+    return conn
+
+
+def _migrate(conn):
+    """Bring stores created by older versions up to the current schema."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(outreach)")}
+    if "fingerprint" not in columns:
+        conn.execute("ALTER TABLE outreach ADD COLUMN fingerprint TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS outreach_suppression "
+                 "ON outreach (domain, finding_type, fingerprint)")
+    conn.execute("CREATE INDEX IF NOT EXISTS outreach_updated ON outreach (updated_at)")
+
+
+def fingerprint(finding):
+    """
+    Stable identity of a finding's details across rescans: volatile fields
+    (days_* counters, free-text issue/error, HTTP status) are left out. When
+    nothing else is left, the issue text with its numbers masked is used.
+    """
+    details = finding.get("details") or {}
+    stable = {k: v for k, v in details.items()
+              if k not in VOLATILE_DETAIL_KEYS and not k.startswith("days_")}
+    if not stable:
+        stable = {"issue": re.sub(r"\d+", "#", str(details.get("issue", "")))}
+    material = json.dumps(stable, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _row_to_record(row):
+    """Stored outreach dict with its store id and filename."""
+    record = json.loads(row["data"])
+    record["id"] = row["id"]
+    record["filename"] = row["filename"]
+    record["status"] = row["status"]
+    return record
+
+
+def _default_filename(outreach):
+    """Same naming the queue directory has always used."""
+    created = outreach.get("created_at") or _now()
+    try:
+        stamp = datetime.fromisoformat(created).strftime("%Y%m%d_%H%M%S")
+    except ValueError:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    company_slug = outreach["company"].lower().replace(" ", "_")
+    return f"outreach_{company_slug}_{stamp}.json"
+
+
+def _insert(conn, outreach, filename):
+    """Insert one outreach dict; a filename clash gets the row id appended."""
+    now = _now()
+    status = outreach.get("status", "queued")
+    if status not in STATUSES:
+        raise ValueError(f"unknown outreach status: {status}")
+    data = {k: v for k, v in outreach.items() if k not in ("id", "filename")}
+    data["status"] = status
+    values = (
+        outreach["company"], outreach["domain"], outreach.get("finding_type", ""),
+        outreach.get("fingerprint"), status,
+        outreach.get("follow_up_date"), outreach.get("created_at") or now, now,
+        json.dumps(data, ensure_ascii=False, default=str),
+    )
+    sql = ("INSERT INTO outreach (filename, company, domain, finding_type, fingerprint, status, "
+           "follow_up_date, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    try:
+        return conn.execute(sql, (filename,) + values).lastrowid
+    except sqlite3.IntegrityError:
+        row_id = conn.execute(sql, (f"pending-{now}-{id(outreach)}",) + values).lastrowid
+        stem = filename[:-5] if filename.endswith(".json") else filename
+        conn.execute("UPDATE outreach SET filename = ? WHERE id = ?", (f"{stem}_{row_id}.json", row_id))
+        return row_id
+
+
+def add(outreach, filename=None, path=None):
+    """
+    Store one outreach dict (the same shape queue_outreach always wrote).
+    Returns the stored record (with 'id' and 'filename').
+    """
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row_id = _insert(conn, outreach, filename or _default_filename(outreach))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_record(conn.execute("SELECT * FROM outreach WHERE id = ?", (row_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def add_follow_up(original_id, follow_up, token, filename=None, path=None):
+    """
+    Store a follow-up letter and retire its original's follow_up_date in one
+    transaction, provided the original is still sent and claimed with `token`
+    (see claim()). The original's claim is released.
+    Returns the stored follow-up, or None (nothing written) if the claim was lost.
+    """
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM outreach WHERE id = ? AND status = 'sent'",
+                               (original_id,)).fetchone()
+            data = json.loads(row["data"]) if row else None
+            if data is None or (data.get("claim") or {}).get("token") != token:
+                conn.execute("ROLLBACK")
+                return None
+            row_id = _insert(conn, follow_up, filename or _default_filename(follow_up))
+            data.update(follow_up_date=None, follow_up_id=row_id, claim=None)
+            conn.execute(
+                "UPDATE outreach SET follow_up_date = NULL, updated_at = ?, data = ? WHERE id = ?",
+                (_now(), json.dumps(data, ensure_ascii=False, default=str), original_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_record(conn.execute("SELECT * FROM outreach WHERE id = ?", (row_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def get(record_id, path=None):
+    """One outreach record by id, or None."""
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT * FROM outreach WHERE id = ?", (record_id,)).fetchone()
+        return _row_to_record(row) if row else None
+    finally:
+        conn.close()
+
+
+def find(status=None, company=None, domain=None, finding_type=None, due_before=None,
+         limit=None, path=None):
+    """
+    Search outreach through the indexes.
+    `due_before` (ISO timestamp) matches follow_up_date <= due_before.
+    Returns records, oldest first.
+    """
+    clauses, params = [], []
+    for column, value in (("status", status), ("company", company),
+                          ("domain", domain), ("finding_type", finding_type)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if due_before is not None:
+        clauses.append("follow_up_date <= ?")
+        params.append(due_before)
+    sql = "SELECT * FROM outreach"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY created_at, id"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+
+    conn = _connect(path)
+    try:
+        return [_row_to_record(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def suppressing_record(domain, finding_type, finding_fingerprint, window_days, path=None):
+    """
+    The outreach that makes a new letter about this finding a duplicate, or None.
+    Queued and approved outreach always suppress; sent outreach suppresses until
+    its follow_up_date, or for `window_days` after its sent_at, whichever is later
+    (later updates of the record don't extend it). Rejected outreach never does.
+    """
+    now = datetime.now(timezone.utc)
+    since = (now - timedelta(days=window_days)).isoformat()
+    conn = _connect(path)
+    try:
+        row = conn.execute(
+            "SELECT * FROM outreach WHERE domain = ? AND finding_type = ? AND fingerprint = ? "
+            "AND (status IN ('queued', 'approved') OR (status = 'sent' AND "
+            "(COALESCE(json_extract(data, '$.sent_at'), created_at) >= ? OR follow_up_date > ?))) "
+            "ORDER BY created_at DESC LIMIT 1",
+            (domain, finding_type, finding_fingerprint, since, now.isoformat()),
+        ).fetchone()
+        return _row_to_record(row) if row else None
+    finally:
+        conn.close()
+
+
+def changed_since(watermark=None, path=None):
+    """
+    Index entries (id, status, follow_up_date, updated_at) of records added or
+    changed after `watermark` (an updated_at value; None = everything), oldest
+    change first. Lets schedulers follow the store without rescanning it.
+    """
+    sql = "SELECT id, status, follow_up_date, updated_at FROM outreach"
+    params = ()
+    if watermark is not None:
+        sql += " WHERE updated_at >= ?"
+        params = (watermark,)
+    sql += " ORDER BY updated_at, id"
+    conn = _connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def counts(path=None):
+    """Outreach per status, read from the trigger-maintained counts table."""
+    conn = _connect(path)
+    try:
+        stored = {row["status"]: row["n"] for row in conn.execute("SELECT status, n FROM status_counts")}
+    finally:
+        conn.close()
+    return {status: stored.get(status, 0) for status in STATUSES}
+
+
+def count(status, path=None):
+    """Outreach in one status (O(1))."""
+    return counts(path)[status]
+
+
+def transition(record_id, from_status, to_status, path=None, **fields):
+    """
+    Atomically move a record from `from_status` to `to_status`, merging `fields`
+    into its data (e.g. sent_at=...). Returns the updated record, or None if the
+    record was not in `from_status` (someone else already moved it).
+    """
+    if to_status not in STATUSES:
+        raise ValueError(f"unknown outreach status: {to_status}")
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM outreach WHERE id = ? AND status = ?",
+                               (record_id, from_status)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            data = json.loads(row["data"])
+            data.update(fields)
+            data["status"] = to_status
+            conn.execute(
+                "UPDATE outreach SET status = ?, follow_up_date = ?, updated_at = ?, data = ? WHERE id = ?",
+                (to_status, data.get("follow_up_date"), _now(),
+                 json.dumps(data, ensure_ascii=False, default=str), record_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_record(conn.execute("SELECT * FROM outreach WHERE id = ?", (record_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def claim(record_id, status, token, lease_seconds=600, path=None):
+    """
+    Reserve a record for exclusive work (e.g. sending) while it stays in `status`.
+    Succeeds when the record is unclaimed or its previous lease has run out.
+    Returns the record, or None if it moved on or someone else holds the lease.
+    """
+    now = datetime.now(timezone.utc)
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM outreach WHERE id = ? AND status = ?",
+                               (record_id, status)).fetchone()
+            data = json.loads(row["data"]) if row else None
+            held = (data or {}).get("claim") or {}
+            if data is None or (held.get("token") not in (None, token) and held.get("until", "") > now.isoformat()):
+                conn.execute("ROLLBACK")
+                return None
+            data["claim"] = {"token": token, "until": (now + timedelta(seconds=lease_seconds)).isoformat()}
+            conn.execute("UPDATE outreach SET data = ? WHERE id = ?",
+                         (json.dumps(data, ensure_ascii=False, default=str), record_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_record(conn.execute("SELECT * FROM outreach WHERE id = ?", (record_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def update(record_id, path=None, **fields):
+    """Merge `fields` into a record's data without changing its status. Returns the record or None."""
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM outreach WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            data = json.loads(row["data"])
+            data.update({k: v for k, v in fields.items() if k != "status"})
+            conn.execute(
+                "UPDATE outreach SET follow_up_date = ?, updated_at = ?, data = ? WHERE id = ?",
+                (data.get("follow_up_date"), _now(), json.dumps(data, ensure_ascii=False, default=str), record_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return _row_to_record(conn.execute("SELECT * FROM outreach WHERE id = ?", (record_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+# --- Directory export / import (Governor approval flow) ---
+
+def _file_payload(record):
+    """A record as the JSON file the queue directories have always held."""
+    return {k: v for k, v in record.items() if k not in ("id", "filename")}
+
+
+def _track_file(conn, filename, status, st):
+    conn.execute(
+        "INSERT INTO dir_files (filename, status, mtime_ns, size) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (filename) DO UPDATE SET status = excluded.status, "
+        "mtime_ns = excluded.mtime_ns, size = excluded.size",
+        (filename, status, st.st_mtime_ns, st.st_size),
+    )
+
+
+def export_record(record, dirs=None, path=None):
+    """
+    Write one record into its status directory (and remember the file, so
+    import_dirs() neither re-reads it nor misses its deletion). Returns the file path.
+    """
+    dirs = dirs or EXPORT_DIRS
+    target = Path(dirs[record["status"]])
+    target.mkdir(parents=True, exist_ok=True)
+    filepath = target / record["filename"]
+    tmp = filepath.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_file_payload(record), f, indent=2, ensure_ascii=False)
+    tmp.replace(filepath)
+    conn = _connect(path)
+    try:
+        _track_file(conn, filepath.name, record["status"], filepath.stat())
+    finally:
+        conn.close()
+    return filepath
+
+
+def export_dirs(statuses=tuple(EXPORT_DIRS), dirs=None, path=None):
+    """
+    Produce the content/{queue,approved,sent}/nrs layout from the store.
+    A record's file is removed from the other status directories, so a letter
+    approved in the store disappears from the queue directory.
+    Returns {status: files written}.
+    """
+    dirs = dirs or EXPORT_DIRS
+    written = {}
+    for status in statuses:
+        records = find(status=status, path=path)
+        for record in records:
+            export_record(record, dirs, path)
+            for other in EXPORT_DIRS:
+                if other != status:
+                    stale = Path(dirs[other]) / record["filename"]
+                    if stale.exists():
+                        stale.unlink()
+        written[status] = len(records)
+    return written
+
+
+def _listing(dirs):
+    """{filename: (status, path, stat)} of the export directories; a file found in
+    several directories counts in the furthest one (queue -> approved -> sent)."""
+    listing = {}
+    for status in EXPORT_DIRS:
+        directory = Path(dirs[status])
+        if not directory.exists():
+            continue
+        for filepath in directory.glob("*.json"):
+            try:
+                listing[filepath.name] = (status, filepath, filepath.stat())
+            except OSError:
+                continue
+    return listing
+
+
+def import_dirs(dirs=None, path=None):
+    """
+    Bring directory changes into the store: unknown files are added (this is
+    also the one-time migration of existing queue files), files the Governor
+    moved forward (queue -> approved -> sent) move their record too, and a
+    pending letter whose file was deleted is marked "rejected". Only files that
+    are new or changed since the last import are parsed; all changes are
+    applied in one transaction.
+    Returns {"added": n, "moved": n, "rejected": n, "parsed": n}.
+    """
+    dirs = dirs or EXPORT_DIRS
+    added = moved = rejected = 0
+    listing = _listing(dirs)
+    conn = _connect(path)
+    try:
+        tracked = {row["filename"]: row for row in conn.execute("SELECT * FROM dir_files")}
+        changed = {}
+        for filename, (status, filepath, st) in sorted(listing.items()):
+            seen = tracked.get(filename)
+            if seen and (seen["status"], seen["mtime_ns"], seen["size"]) == (status, st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                with open(filepath, encoding="utf-8") as f:
+                    changed[filename] = (status, st, json.load(f))
+            except (OSError, ValueError):
+                changed[filename] = (status, st, None)
+        deleted = [filename for filename in tracked if filename not in listing]
+        if not changed and not deleted:
+            return {"added": 0, "moved": 0, "rejected": 0, "parsed": 0}
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for filename, (status, st, outreach) in changed.items():
+                _track_file(conn, filename, status, st)
+                if not isinstance(outreach, dict) or "company" not in outreach or "domain" not in outreach:
+                    continue
+                row = conn.execute("SELECT * FROM outreach WHERE filename = ?", (filename,)).fetchone()
+                if row is None:
+                    outreach["status"] = status
+                    _insert(conn, outreach, filename)
+                    added += 1
+                elif row["status"] in EXPORT_DIRS and STATUSES.index(status) > STATUSES.index(row["status"]):
+                    data = {**json.loads(row["data"]), **outreach, "status": status}
+                    data.pop("id", None)
+                    data.pop("filename", None)
+                    conn.execute(
+                        "UPDATE outreach SET status = ?, follow_up_date = ?, updated_at = ?, data = ? "
+                        "WHERE id = ?",
+                        (status, data.get("follow_up_date"), _now(),
+                         json.dumps(data, ensure_ascii=False, default=str), row["id"]),
+                    )
+                    moved += 1
+
+            for filename in deleted:
+                conn.execute("DELETE FROM dir_files WHERE filename = ?", (filename,))
+                # Deleted from the directory it was pending in: the Governor rejected it
+                row = conn.execute("SELECT * FROM outreach WHERE filename = ? AND status = ?",
+                                   (filename, tracked[filename]["status"])).fetchone()
+                if row is None or row["status"] not in PENDING_STATUSES:
+                    continue
+                data = json.loads(row["data"])
+                data.update(status="rejected", rejected_at=_now(), claim=None)
+                conn.execute(
+                    "UPDATE outreach SET status = 'rejected', updated_at = ?, data = ? WHERE id = ?",
+                    (_now(), json.dumps(data, ensure_ascii=False, default=str), row["id"]),
+                )
+                rejected += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return {"added": added, "moved": moved, "rejected": rejected, "parsed": len(changed)}
+
+
+if __name__ == "__main__":
+    if "--import" in sys.argv:
+        result = import_dirs()
+        print(f"[nrs_queue] Imported: {result['added']} added, {result['moved']} moved forward, "
+              f"{result['rejected']} rejected")
+    if "--export" in sys.argv:
+        result = export_dirs()
+        print(f"[nrs_queue] Exported: " + ", ".join(f"{s} {n}" for s, n in result.items()))
+    c = counts()
+    print(f"[nrs_queue] {c['queued']} queued | {c['approved']} approved | {c['sent']} sent | "
+          f"{c['rejected']} rejected")
@@ -2,11 +2,30 @@
 NRS Ranker Agent — Risk Severity Scoring for NRS v2
 Scores and ranks findings by business risk severity.
 Follows signal_ranker.py weighted scoring pattern.
+Scoring tables load from config/nrs_scoring.json and are recompiled
+whenever the file changes.
 """
 
+import heapq
 import json
+import os
+import random
+import sys
+import time
 from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # batch scoring falls back to score_finding
+    np = None
+
+
+# --- Config ---
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+SCORING_FILE = CONFIG_DIR / "nrs_scoring.json"
 
 # Scoring weights
 WEIGHTS = {
@@ -18,6 +37,7 @@ WEIGHTS = {
 
 RISK_THRESHOLD = 0.40
 MAX_FINDINGS_PER_TARGET = 3
+STREAM_CHUNK_SIZE = 4096  # findings scored per batch while streaming
 
 # Base severity scores (0-1)
 SEVERITY_SCORES = {
@@ -90,6 +110,44 @@ INDUSTRY_MULTIPLIER = {
     "unknown": 1.0,
 }
 
+# Urgency for finding types that are time-critical regardless of days_left
+TYPE_URGENCY = {
+    "ssl_expired": 1.0,             # Already expired
+    "dns_dangling_cname": 0.90,     # Immediate takeover risk
+    "subdomains_sensitive_exposed": 0.80,  # Immediate access risk
+}
+
+# Default urgency by severity
+SEVERITY_URGENCY = {"critical": 0.70, "high": 0.50, "medium": 0.30, "low": 0.15}
+
+# days_left urgency buckets: (max days, urgency); beyond the last bucket -> 0.30
+DAYS_LEFT_URGENCY = [(3, 1.0), (7, 0.85), (14, 0.70), (30, 0.50)]
+DAYS_LEFT_BUCKETS = len(DAYS_LEFT_URGENCY) + 1
+
+# Config file section -> module table it replaces
+_CONFIG_TABLES = {
+    "weights": WEIGHTS,
+    "severity_scores": SEVERITY_SCORES,
+    "business_impact": BUSINESS_IMPACT,
+    "exploitability": EXPLOITABILITY,
+    "industry_multiplier": INDUSTRY_MULTIPLIER,
+}
+_DEFAULT_TABLES = {name: dict(table) for name, table in _CONFIG_TABLES.items()}
+
+# Stand-in for values missing from every table when compiling the unknown slots
+_UNKNOWN_KEY = "\0unknown"
+
+# Compiled lookup tables, rebuilt by refresh_scoring_tables() on config mtime change
+_compiled = {"mtime": None, "tables": None}
+
+
+def _days_bucket(days):
+    """Index of the days_left urgency bucket."""
+    for i, (max_days, _) in enumerate(DAYS_LEFT_URGENCY):
+        if days <= max_days:
+            return i
+    return len(DAYS_LEFT_URGENCY)
+
 
 def _urgency_score(finding):
     """Calculate urgency based on time-sensitive factors."""
@@ -98,39 +156,21 @@ def _urgency_score(finding):
 
     # SSL expiring — urgency based on days left
     if "days_left" in details:
-        days = details["days_left"]
-        if days <= 3:
-            return 1.0
-        elif days <= 7:
-            return 0.85
-        elif days <= 14:
-            return 0.70
-        elif days <= 30:
-            return 0.50
+        bucket = _days_bucket(details["days_left"])
+        if bucket < len(DAYS_LEFT_URGENCY):
+            return DAYS_LEFT_URGENCY[bucket][1]
         return 0.30
 
-    # Already expired
-    if ftype == "ssl_expired":
-        return 1.0
-
-    # Dangling CNAME — immediate takeover risk
-    if ftype == "dns_dangling_cname":
-        return 0.90
-
-    # Sensitive subdomains — immediate access risk
-    if ftype == "subdomains_sensitive_exposed":
-        return 0.80
+    if ftype in TYPE_URGENCY:
+        return TYPE_URGENCY[ftype]
 
     # Default urgency by severity
     severity = finding.get("severity", "medium")
-    return {"critical": 0.70, "high": 0.50, "medium": 0.30, "low": 0.15}.get(severity, 0.30)
+    return SEVERITY_URGENCY.get(severity, 0.30)
 
 
-def score_finding(finding):
-    """
-    Calculate composite risk score for a finding.
-    Returns score 0-1.
-    """
+def _composite_score(finding):
+    """Weighted composite risk score (0-1) straight from the scoring tables."""
     ftype = finding.get("finding_type", "")
     severity = finding.get("severity", "medium")
     industry = finding.get("industry", "unknown")
@@ -155,6 +195,224 @@ def score_finding(finding):
     return round(final_score, 4)
 
 
+def _vocab(*tables):
+    """Ordered union of keys; index len(vocab) is reserved for unknown values."""
+    keys = {}
+    for table in tables:
+        for key in table:
+            keys.setdefault(key, len(keys))
+    return keys
+
+
+def _compile_tables():
+    """
+    Precompute the score of every (finding_type, severity, industry) combination.
+
+    'base' holds the score without days_left; 'days' holds one score per days_left
+    bucket. Both are flat lists indexed by combo = (type * S + severity) * I + industry,
+    where the last code of each axis stands for values missing from the tables.
+    """
+    vocab = {
+        "ftype": _vocab(BUSINESS_IMPACT, EXPLOITABILITY, TYPE_URGENCY),
+        "severity": _vocab(SEVERITY_SCORES, SEVERITY_URGENCY),
+        "industry": _vocab(INDUSTRY_MULTIPLIER),
+    }
+    # None marks the unknown slot of each axis
+    types = list(vocab["ftype"]) + [None]
+    severities = list(vocab["severity"]) + [None]
+    industries = list(vocab["industry"]) + [None]
+    days_samples = [max_days for max_days, _ in DAYS_LEFT_URGENCY] + [DAYS_LEFT_URGENCY[-1][0] + 1]
+
+    base = []
+    days = []
+    for ftype in types:
+        for severity in severities:
+            for industry in industries:
+                finding = {
+                    "finding_type": ftype if ftype is not None else _UNKNOWN_KEY,
+                    "severity": severity if severity is not None else _UNKNOWN_KEY,
+                    "industry": industry if industry is not None else _UNKNOWN_KEY,
+                    "details": {},
+                }
+                base.append(_composite_score(finding))
+                for sample in days_samples:
+                    finding["details"] = {"days_left": sample}
+                    days.append(_composite_score(finding))
+
+    return {
+        "vocab": vocab,
+        "shape": (len(types), len(severities), len(industries)),
+        "base": base,
+        "days": days,
+    }
+
+
+def _load_scoring_config():
+    """
+    Load scoring tables from SCORING_FILE into the module tables (in place).
+    A section present in the file replaces the default table; missing sections
+    fall back to the defaults above.
+    """
+    config = {}
+    if SCORING_FILE.exists():
+        with open(SCORING_FILE) as f:
+            config = json.load(f)
+
+    # Validate everything before touching the live tables
+    loaded = {
+        name: {k: float(v) for k, v in config.get(name, _DEFAULT_TABLES[name]).items()}
+        for name in _CONFIG_TABLES
+    }
+    missing = set(_DEFAULT_TABLES["weights"]) - set(loaded["weights"])
+    if missing:
+        raise ValueError(f"weights missing {', '.join(sorted(missing))}")
+
+    for name, table in _CONFIG_TABLES.items():
+        table.clear()
+        table.update(loaded[name])
+
+
+def refresh_scoring_tables():
+    """
+    Reload and recompile the scoring tables if SCORING_FILE changed since the
+    last compile (cheap stat otherwise). Keeps the previous tables if the file
+    is unreadable. Returns the compiled tables.
+    """
+    try:
+        mtime = os.stat(SCORING_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if _compiled["tables"] is not None and mtime == _compiled["mtime"]:
+        return _compiled["tables"]
+
+    try:
+        _load_scoring_config()
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"[nrs_ranker] WARNING: cannot load {SCORING_FILE}: {e} — keeping current tables")
+        if _compiled["tables"] is None:
+            _compiled["tables"] = _compile_tables()
+        return _compiled["tables"]
+
+    if _compiled["tables"] is not None:
+        print(f"[nrs_ranker] Scoring config changed — recompiled tables from {SCORING_FILE}")
+    _compiled.update(mtime=mtime, tables=_compile_tables())
+    return _compiled["tables"]
+
+
+def _tables():
+    """Current compiled tables, compiling on first use."""
+    return _compiled["tables"] or refresh_scoring_tables()
+
+
+def score_finding(finding):
+    """
+    Calculate composite risk score for a finding.
+    Returns score 0-1.
+    """
+    tables = _tables()
+    vocab = tables["vocab"]
+    _, n_sev, n_ind = tables["shape"]
+
+    t = vocab["ftype"].get(finding.get("finding_type", ""), len(vocab["ftype"]))
+    s = vocab["severity"].get(finding.get("severity", "medium"), len(vocab["severity"]))
+    i = vocab["industry"].get(finding.get("industry", "unknown"), len(vocab["industry"]))
+    combo = (t * n_sev + s) * n_ind + i
+
+    details = finding.get("details", {})
+    if "days_left" in details:
+        return tables["days"][combo * DAYS_LEFT_BUCKETS + _days_bucket(details["days_left"])]
+    return tables["base"][combo]
+
+
+# --- Batch scoring (NumPy) ---
+
+def encode_findings(findings):
+    """
+    Encode findings as NumPy arrays for score_encoded().
+    Encoding is the only per-finding Python work, so callers re-ranking the same
+    findings after the scoring config changes can encode once and score many times.
+
+    Returns dict with int arrays 'ftype', 'severity', 'industry' (codes into the
+    observed values in 'vocab'), and a float array 'days_left' (NaN when absent).
+    """
+    if np is None:
+        raise ImportError("numpy is required for encoded batch scoring")
+
+    type_vocab = {}
+    severity_vocab = {}
+    industry_vocab = {}
+
+    n = len(findings)
+    ftype = np.empty(n, dtype=np.int32)
+    severity = np.empty(n, dtype=np.int32)
+    industry = np.empty(n, dtype=np.int32)
+    days_left = np.full(n, np.nan, dtype=np.float64)
+
+    for i, f in enumerate(findings):
+        ftype[i] = type_vocab.setdefault(f.get("finding_type", ""), len(type_vocab))
+        severity[i] = severity_vocab.setdefault(f.get("severity", "medium"), len(severity_vocab))
+        industry[i] = industry_vocab.setdefault(f.get("industry", "unknown"), len(industry_vocab))
+        details = f.get("details", {})
+        if "days_left" in details:
+            days_left[i] = details["days_left"]
+
+    return {
+        "ftype": ftype,
+        "severity": severity,
+        "industry": industry,
+        "days_left": days_left,
+        "vocab": {"ftype": type_vocab, "severity": severity_vocab, "industry": industry_vocab},
+    }
+
+
+def _table_codes(codes, observed, table_vocab):
+    """Map codes of observed values onto the compiled table's vocabulary."""
+    unknown = len(table_vocab)
+    mapping = np.array([table_vocab.get(key, unknown) for key in observed], dtype=np.int64)
+    return mapping[codes] if len(mapping) else codes.astype(np.int64)
+
+
+def score_encoded(encoded):
+    """
+    Score encoded findings with the current compiled tables — two array reads
+    per finding. Returns a float64 array identical to score_finding() for each.
+    """
+    tables = _tables()
+    vocab = tables["vocab"]
+    _, n_sev, n_ind = tables["shape"]
+
+    observed = encoded["vocab"]
+    ftype = _table_codes(encoded["ftype"], observed["ftype"], vocab["ftype"])
+    severity = _table_codes(encoded["severity"], observed["severity"], vocab["severity"])
+    industry = _table_codes(encoded["industry"], observed["industry"], vocab["industry"])
+    combo = (ftype * n_sev + severity) * n_ind + industry
+
+    days = encoded["days_left"]
+    has_days = ~np.isnan(days)
+    with np.errstate(invalid="ignore"):
+        bucket = np.select(
+            [days <= max_days for max_days, _ in DAYS_LEFT_URGENCY],
+            list(range(len(DAYS_LEFT_URGENCY))),
+            len(DAYS_LEFT_URGENCY),
+        )
+
+    scores = np.asarray(tables["base"], dtype=np.float64)[combo]
+    days_table = np.asarray(tables["days"], dtype=np.float64)
+    scores[has_days] = days_table[combo[has_days] * DAYS_LEFT_BUCKETS + bucket[has_days]]
+    return scores
+
+
+def score_findings_batch(findings):
+    """
+    Score many findings at once. Returns list of scores matching score_finding().
+    Uses NumPy when available, otherwise scores one by one.
+    """
+    if np is None or not findings:
+        return [score_finding(f) for f in findings]
+    return score_encoded(encode_findings(findings)).tolist()
+
+
 def _impact_narrative(finding):
     """Generate a human-readable business impact narrative."""
     ftype = finding.get("finding_type", "")
@@ -181,12 +439,61 @@ def _impact_narrative(finding):
     return narratives.get(ftype, f"Security issue detected in {company}'s infrastructure.")
 
 
+def rank_stream(findings, top_n=MAX_FINDINGS_PER_TARGET, threshold=RISK_THRESHOLD):
+    """
+    Rank findings from any iterable, keeping only the top N per domain.
+
+    Findings are scored in chunks of STREAM_CHUNK_SIZE. Each domain keeps a bounded
+    min-heap of its best N findings, so memory is bounded by domains x N rather
+    than by total findings. The survivors are ordered through a global heap.
+
+    Returns the same ranked list as sorting every passing finding by risk_score,
+    grouping the top N per domain and sorting again (ties keep input order).
+    """
+    refresh_scoring_tables()
+    by_domain = {}
+    seq = 0
+    it = iter(findings)
+
+    for chunk in iter(lambda: list(islice(it, STREAM_CHUNK_SIZE)), []):
+        for f, score in zip(chunk, score_findings_batch(chunk)):
+            f["risk_score"] = score
+            seq += 1
+            if score < threshold:
+                continue
+
+            # Heap root is the weakest kept finding: lowest score, then latest seen
+            entry = (score, -seq, f)
+            heap = by_domain.setdefault(f["domain"], [])
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    # Domains rank by their best finding; ties fall back to the domain's rank,
+    # then arrival order — matching the stable sorts in the list-based ranker.
+    global_heap = []
+    for heap in by_domain.values():
+        best_score, best_neg_seq, _ = max(heap)
+        domain_key = (-best_score, -best_neg_seq)
+        for score, neg_seq, f in heap:
+            global_heap.append((-score, domain_key, -neg_seq, f))
+    heapq.heapify(global_heap)
+
+    ranked = []
+    while global_heap:
+        f = heapq.heappop(global_heap)[-1]
+        f["business_impact_narrative"] = _impact_narrative(f)
+        ranked.append(f)
+    return ranked
+
+
 def run(findings):
     """
     Rank and filter findings by risk score.
 
     Args:
-        findings: List of finding dicts from nrs_scanner
+        findings: Iterable of finding dicts from nrs_scanner
 
     Returns:
         List of top findings per target that pass the risk threshold,
@@ -194,40 +501,75 @@ def run(findings):
     """
     print("[nrs_ranker] Scoring findings...")
 
-    # Score all findings
-    scored = []
-    for f in findings:
-        score = score_finding(f)
-        f["risk_score"] = score
-        f["business_impact_narrative"] = _impact_narrative(f)
-        scored.append(f)
-
-    # Filter by threshold
-    passed = [f for f in scored if f["risk_score"] >= RISK_THRESHOLD]
+    ranked = rank_stream(findings)
+    domain_count = len({f["domain"] for f in ranked})
 
-    # Group by domain, take top N per target
-    by_domain = {}
-    for f in sorted(passed, key=lambda x: x["risk_score"], reverse=True):
-        domain = f["domain"]
-        if domain not in by_domain:
-            by_domain[domain] = []
-        if len(by_domain[domain]) < MAX_FINDINGS_PER_TARGET:
-            by_domain[domain].append(f)
-
-    # Flatten and sort
-    ranked = []
-    for domain_findings in by_domain.values():
-        ranked.extend(domain_findings)
-    ranked.sort(key=lambda x: x["risk_score"], reverse=True)
-
-    print(f"[nrs_ranker] {len(ranked)} findings passed threshold ({RISK_THRESHOLD}) from {len(by_domain)} targets")
+    print(f"[nrs_ranker] {len(ranked)} findings passed threshold ({RISK_THRESHOLD}) from {domain_count} targets")
     for f in ranked[:5]:
         print(f"  [{f['severity'].upper()} {f['risk_score']:.2f}] {f['company_name']}: {f['finding_type']}")
 
     return ranked
 
 
+def _synthetic_findings(n, seed=0):
+    """Generate n random findings covering every type, severity and industry."""
+    rng = random.Random(seed)
+    types = list(BUSINESS_IMPACT) + ["unknown_type"]
+    severities = list(SEVERITY_SCORES) + ["unknown"]
+    industries = list(INDUSTRY_MULTIPLIER) + ["mining"]
+    findings = []
+    for i in range(n):
+        details = {}
+        if rng.random() < 0.2:
+            details["days_left"] = rng.randint(-5, 60)
+        findings.append({
+            "domain": f"d{i % 5000}.example",
+            "finding_type": rng.choice(types),
+            "severity": rng.choice(severities),
+            "industry": rng.choice(industries),
+            "details": details,
+        })
+    return findings
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6)):
+    """Compare score_finding in a loop against the NumPy batch path."""
+    if np is None:
+        print("[nrs_ranker] numpy not installed — batch path unavailable")
+        return []
+
+    refresh_scoring_tables()
+    print(f"  {'findings':>10} {'loop (s)':>10} {'encode (s)':>11} {'score (s)':>10} {'speedup':>8}")
+    results = []
+    for n in sizes:
+        findings = _synthetic_findings(n)
+
+        start = time.perf_counter()
+        expected = [score_finding(f) for f in findings]
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encoded = encode_findings(findings)
+        encode_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = score_encoded(encoded).tolist()
+        score_s = time.perf_counter() - start
+
+        if scores != expected:
+            raise AssertionError(f"batch scores differ from score_finding at n={n}")
+
+        speedup = loop_s / score_s if score_s else float("inf")
+        print(f"  {n:>10} {loop_s:>10.3f} {encode_s:>11.3f} {score_s:>10.4f} {speedup:>7.0f}x")
+        results.append({"n": n, "loop_s": loop_s, "encode_s": encode_s, "score_s": score_s})
+    return results
+
+
 if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit(0)
+
     # Test with sample findings
     test_findings = [
         {
@@ -6,8 +6,10 @@ All scans are passive/non-intrusive — no exploitation.
 """
 
 import json
+import os
 import ssl
 import socket
+import urllib.parse
 import urllib.request
 import urllib.error
 import time
@@ -18,6 +20,12 @@ from pathlib import Path
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 SCAN_TIMEOUT = 8
 
+# GitHub API (override GITHUB_API_URL to point at a local mock)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_BATCH_SIZE = 10  # company aliases per GraphQL query
+GITHUB_ORG_CACHE_FILE = Path("memory/github_orgs.json")
+GITHUB_ORG_CACHE_DAYS = 30
+
 # Security headers that should be present
 EXPECTED_HEADERS = {
     "strict-transport-security": {
@@ -444,32 +452,10 @@ def scan_dns(domain):
     return findings
 
 
-def scan_github(company_name):
-    """
-    Check for exposed GitHub repos associated with the company.
-    Returns list of finding dicts.
-    """
+def _github_repo_findings(repos):
+    """Turn GitHub repo dicts (REST search shape) into finding dicts."""
     findings = []
 
-    # Search GitHub for repos — try company name and domain variations
-    search_term = company_name.replace(" ", "+")
-    query = urllib.request.quote(f"{search_term}")
-    url = f"https://api.github.com/search/repositories?q={query}+in:name,description,readme&sort=updated&per_page=15"
-    req = urllib.request.Request(url, headers={
-        "User-Agent": USER_AGENT,
-        "Accept": "application/vnd.github.v3+json",
-    })
-
-    try:
-        with urllib.request.urlopen(req, timeout=SCAN_TIMEOUT) as resp:
-            data = json.loads(resp.read().decode())
-    except Exception:
-        return findings
-
-    repos = data.get("items", [])
-    if not repos:
-        return findings
-
     for repo in repos[:5]:
         name = repo.get("full_name", "")
         desc = repo.get("description", "") or ""
@@ -523,6 +509,201 @@ def scan_github(company_name):
     return findings
 
 
+def scan_github(company_name):
+    """
+    Check for exposed GitHub repos associated with the company.
+    Returns list of finding dicts.
+    """
+    # Search GitHub for repos — try company name and domain variations
+    search_term = company_name.replace(" ", "+")
+    query = urllib.request.quote(f"{search_term}")
+    url = f"{GITHUB_API_URL}/search/repositories?q={query}+in:name,description,readme&sort=updated&per_page=15"
+    req = urllib.request.Request(url, headers={
+        "User-Agent": USER_AGENT,
+        "Accept": "application/vnd.github.v3+json",
+    })
+
+    try:
+        with urllib.request.urlopen(req, timeout=SCAN_TIMEOUT) as resp:
+            data = json.loads(resp.read().decode())
+    except Exception:
+        return []
+
+    return _github_repo_findings(data.get("items", []))
+
+
+# --- GitHub batch mode ---
+
+def _load_github_org_cache():
+    """Load cached company -> GitHub org login mappings, dropping stale entries."""
+    if not GITHUB_ORG_CACHE_FILE.exists():
+        return {}
+    try:
+        with open(GITHUB_ORG_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    now = datetime.now(timezone.utc)
+    fresh = {}
+    for company, entry in cache.items():
+        try:
+            resolved_at = datetime.fromisoformat(entry["resolved_at"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if (now - resolved_at).days < GITHUB_ORG_CACHE_DAYS:
+            fresh[company] = entry
+    return fresh
+
+
+def _save_github_org_cache(cache):
+    """Persist company -> GitHub org login mappings."""
+    GITHUB_ORG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(GITHUB_ORG_CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2)
+
+
+def _github_query(company_name, org_cache):
+    """Build the repository search query for a company (org-scoped when known)."""
+    entry = org_cache.get(company_name)
+    if entry and entry.get("org"):
+        return f"user:{entry['org']}"
+    return f"{company_name} in:name,description,readme"
+
+
+def _normalize_name(value):
+    """Lowercase alphanumerics only, for loose company/login comparison."""
+    return "".join(c for c in value.lower() if c.isalnum())
+
+
+def _resolve_org_login(company_name, repos):
+    """
+    Guess the company's GitHub org from search results.
+    The dominant owner must hold at least half the results and resemble the company name.
+    """
+    owners = {}
+    for repo in repos:
+        login = (repo.get("owner") or {}).get("login")
+        if login:
+            owners[login] = owners.get(login, 0) + 1
+    if not owners:
+        return None
+
+    login, count = max(owners.items(), key=lambda kv: kv[1])
+    if count < max(2, len(repos) / 2):
+        return None
+
+    company_norm = _normalize_name(company_name)
+    login_norm = _normalize_name(login)
+    if company_norm and (company_norm in login_norm or login_norm in company_norm):
+        return login
+    return None
+
+
+def _github_graphql_search(company_names, org_cache, token):
+    """
+    Resolve several companies in one GraphQL request, one aliased search per company.
+    Returns dict company_name -> list of repos (REST shape). Companies whose alias
+    failed are left out so the caller can fall back to REST.
+    """
+    fields = []
+    for i, name in enumerate(company_names):
+        query = json.dumps(_github_query(name, org_cache) + " sort:updated")
+        fields.append(
+            f"c{i}: search(query: {query}, type: REPOSITORY, first: 15) {{ nodes {{ "
+            "... on Repository { nameWithOwner description pushedAt isArchived "
+            "stargazerCount url owner { login } } } }"
+        )
+    body = json.dumps({"query": "query { " + " ".join(fields) + " }"}).encode()
+
+    req = urllib.request.Request(f"{GITHUB_API_URL}/graphql", data=body, method="POST", headers={
+        "User-Agent": USER_AGENT,
+        "Authorization": f"bearer {token}",
+        "Content-Type": "application/json",
+    })
+    try:
+        with urllib.request.urlopen(req, timeout=SCAN_TIMEOUT) as resp:
+            data = json.loads(resp.read().decode()).get("data") or {}
+    except Exception:
+        return {}
+
+    results = {}
+    for i, name in enumerate(company_names):
+        search = data.get(f"c{i}")
+        if search is None:
+            continue
+        results[name] = [
+            {
+                "full_name": node.get("nameWithOwner", ""),
+                "description": node.get("description"),
+                "pushed_at": node.get("pushedAt", ""),
+                "archived": node.get("isArchived", False),
+                "stargazers_count": node.get("stargazerCount", 0),
+                "html_url": node.get("url", ""),
+                "owner": node.get("owner") or {},
+            }
+            for node in search.get("nodes", []) if node
+        ]
+    return results
+
+
+def _github_rest_search(query):
+    """Run a single REST repository search. Returns list of repos, or None on failure."""
+    params = urllib.parse.urlencode({"q": query, "sort": "updated", "per_page": 15})
+    req = urllib.request.Request(f"{GITHUB_API_URL}/search/repositories?{params}", headers={
+        "User-Agent": USER_AGENT,
+        "Accept": "application/vnd.github.v3+json",
+    })
+    try:
+        with urllib.request.urlopen(req, timeout=SCAN_TIMEOUT) as resp:
+            return json.loads(resp.read().decode()).get("items", [])
+    except Exception:
+        return None
+
+
+def scan_github_batch(company_names):
+    """
+    Check GitHub exposure for all companies in a sprint at once.
+
+    With GITHUB_TOKEN set, companies are resolved GITHUB_BATCH_SIZE at a time through
+    a single GraphQL query with one aliased search each. Companies the batch could not
+    resolve fall back to one REST search apiece. Company -> org login mappings are
+    cached so later sprints search the org's repos directly.
+
+    Returns dict company_name -> list of finding dicts.
+    """
+    names = list(dict.fromkeys(company_names))
+    org_cache = _load_github_org_cache()
+    token = os.environ.get("GITHUB_TOKEN")
+
+    repos_by_company = {}
+    if token:
+        for i in range(0, len(names), GITHUB_BATCH_SIZE):
+            chunk = names[i:i + GITHUB_BATCH_SIZE]
+            repos_by_company.update(_github_graphql_search(chunk, org_cache, token))
+
+    for name in names:
+        if name not in repos_by_company:
+            repos = _github_rest_search(_github_query(name, org_cache))
+            if repos is not None:
+                repos_by_company[name] = repos
+
+    # Learn org logins for companies searched by name
+    now = datetime.now(timezone.utc).isoformat()
+    cache_changed = False
+    for name, repos in repos_by_company.items():
+        if name in org_cache:
+            continue
+        login = _resolve_org_login(name, repos)
+        if login:
+            org_cache[name] = {"org": login, "resolved_at": now}
+            cache_changed = True
+    if cache_changed:
+        _save_github_org_cache(org_cache)
+
+    return {name: _github_repo_findings(repos_by_company.get(name, [])) for name in names}
+
+
 def scan_subdomains(domain):
     """
     Probe common subdomains for exposed services.
@@ -615,6 +796,12 @@ def run(targets):
     print("[nrs_scanner] Iniciando scan de seguridad...")
     all_findings = []
 
+    # Resolve GitHub exposure for the whole sprint up front
+    print(f"  [nrs_scanner] GitHub (batch: {len(targets)} companies)...")
+    github_by_company = scan_github_batch(
+        [t.get("company_name", t["domain"]) for t in targets]
+    )
+
     for target in targets:
         domain = target["domain"]
         company = target.get("company_name", domain)
@@ -633,8 +820,8 @@ def run(targets):
         print(f"    DNS...")
         target_findings.extend(scan_dns(domain))
 
-        print(f"    GitHub...")
-        target_findings.extend(scan_github(company))
+        # Copies, so targets sharing a company name don't share finding dicts
+        target_findings.extend(dict(f) for f in github_by_company.get(company, []))
 
         print(f"    Subdomains...")
         target_findings.extend(scan_subdomains(domain))
@@ -644,6 +831,7 @@ def run(targets):
             f["domain"] = domain
             f["company_name"] = company
             f["industry"] = industry
+            f["pool"] = target.get("pool")
             f["scanned_at"] = datetime.now(timezone.utc).isoformat()
             f["raw_data"] = json.dumps(f.get("details", {}))
 
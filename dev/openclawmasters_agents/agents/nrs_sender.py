@@ -0,0 +1,375 @@
+"""
+NRS Sender Agent — Delivers Governor-approved Outreach for NRS v2
+Drains approved outreach from the store over a small pool of SMTP sessions
+(many messages per connection), spacing messages to the same destination
+domain, retrying transient failures with backoff and moving each letter to
+sent in one store transition.
+"""
+
+import heapq
+import json
+import os
+import random
+import smtplib
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+from agents import nrs_queue
+
+
+EMAIL_CONFIG_PATH = Path.home() / ".openclaw" / "config" / "email_global.json"
+
+SEND_CONNECTIONS = int(os.environ.get("NRS_SEND_CONNECTIONS", "2"))        # concurrent SMTP sessions
+MESSAGES_PER_SESSION = int(os.environ.get("NRS_SEND_PER_SESSION", "50"))    # reconnect after this many
+DOMAIN_INTERVAL = float(os.environ.get("NRS_SEND_DOMAIN_INTERVAL", "30"))   # seconds between mails to one domain
+SMTP_TIMEOUT = 30
+MAX_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 120.0
+CLAIM_LEASE_SECONDS = 900   # another sender may take over a claimed letter after this
+FOLLOW_UP_DAYS = 7          # follow_up_date of a sent letter (see nrs_followup)
+# A letter that failed for good is retried after this many hours, at most
+# MAX_SEND_FAILURES times in all; run(retry_failed=True) / --retry-failed retries it now
+FAILED_RETRY_HOURS = float(os.environ.get("NRS_SEND_RETRY_HOURS", "24"))
+MAX_SEND_FAILURES = 3
+
+LETTER_SEPARATOR = "\n\n" + "-" * 40 + "\n\n"
+
+# Stats for the last run() — read by nrs_chief for the run log
+RUN_STATS = {}
+
+
+def _load_email_config():
+    """
+    Load SMTP config from global OpenClaw config. NRS_SMTP_HOST / NRS_SMTP_PORT /
+    NRS_SMTP_TLS override it, e.g. to point the sender at a local debug server.
+    """
+    config = None
+    if EMAIL_CONFIG_PATH.exists():
+        with open(EMAIL_CONFIG_PATH) as f:
+            config = json.load(f)
+    if os.environ.get("NRS_SMTP_HOST"):
+        config = dict(config or {"from_email": "nrs@localhost"})
+        config["smtp_host"] = os.environ["NRS_SMTP_HOST"]
+        config["smtp_port"] = int(os.environ.get("NRS_SMTP_PORT", "25"))
+        config["use_tls"] = os.environ.get("NRS_SMTP_TLS", "0") == "1"
+    return config
+
+
+def _recipients(record):
+    """First (best-ranked) address of each outreach target, deduplicated."""
+    recipients = []
+    for target in record.get("outreach_targets", []):
+        emails = target.get("emails") or []
+        if emails and emails[0].lower() not in recipients:
+            recipients.append(emails[0].lower())
+    return recipients
+
+
+def _recipient_domain(address):
+    return address.rsplit("@", 1)[-1].lower()
+
+
+def build_message(record, config, recipients, message_id):
+    """The message for one outreach record: one plain-text part, Spanish letter first, then English."""
+    letters = [record[key] for key in ("letter_es", "letter_en") if record.get(key)]
+    msg = MIMEText(LETTER_SEPARATOR.join(letters), "plain", "utf-8")
+    msg["Subject"] = record.get("subject_es") or record.get("subject_en", "")
+    msg["From"] = config["from_email"]
+    msg["To"] = ", ".join(recipients)
+    msg["Date"] = formatdate(localtime=False)
+    msg["Message-ID"] = message_id
+    if record.get("kind") == "follow_up" and record.get("follow_up_of"):
+        original = nrs_queue.get(record["follow_up_of"])
+        if original and original.get("message_id"):
+            msg["In-Reply-To"] = original["message_id"]
+            msg["References"] = original["message_id"]
+    return msg
+
+
+class _SmtpSession:
+    """One reusable SMTP connection: opened lazily, recycled after MESSAGES_PER_SESSION."""
+
+    def __init__(self, config):
+        self.config = config
+        self.server = None
+        self.sent = 0
+        self.opened = 0
+
+    def _open(self):
+        server = smtplib.SMTP(self.config["smtp_host"], self.config["smtp_port"], timeout=SMTP_TIMEOUT)
+        if self.config.get("use_tls", True):
+            server.starttls()
+        if self.config.get("smtp_user"):
+            server.login(self.config["smtp_user"], self.config["smtp_password"])
+        self.server = server
+        self.sent = 0
+        self.opened += 1
+
+    def send(self, msg, recipients):
+        """Send one message. Returns {address: (code, reason)} for refused recipients."""
+        if self.server is not None and self.sent >= MESSAGES_PER_SESSION:
+            self.close()
+        if self.server is None:
+            self._open()
+        refused = self.server.sendmail(self.config["from_email"], recipients, msg.as_string())
+        self.sent += 1
+        return refused
+
+    def reset(self):
+        """Drop a connection that failed mid-conversation (no QUIT)."""
+        if self.server is not None:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+        self.server = None
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+        self.server = None
+
+
+class _SendQueue:
+    """
+    Heap of (ready_at, seq, job) shared by the sender threads. get() hands out
+    the earliest job whose destination domain is past its next free slot, so
+    mail to one domain is spaced by `interval` while other domains keep flowing.
+    """
+
+    def __init__(self, jobs, interval):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = 0
+        self._next_slot = {}
+        self._outstanding = 0
+        for job in jobs:
+            self._push(job, 0.0)
+            self._outstanding += 1
+
+    def _push(self, job, ready_at):
+        heapq.heappush(self._heap, (ready_at, self._seq, job))
+        self._seq += 1
+
+    def get(self):
+        """Next sendable job, or None once every job is done."""
+        with self._cond:
+            while True:
+                if self._outstanding == 0:
+                    return None
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    slot = self._next_slot.get(job["domain"], 0.0)
+                    if slot > now:
+                        self._push(job, slot)
+                        continue
+                    self._next_slot[job["domain"]] = now + self.interval
+                    return job
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def retry(self, job, delay):
+        with self._cond:
+            self._push(job, time.monotonic() + delay)
+            self._cond.notify()
+
+    def done(self):
+        with self._cond:
+            self._outstanding -= 1
+            self._cond.notify_all()
+
+
+def _is_transient(error):
+    """
+    4xx replies and dropped or failed connections are worth retrying. 5xx replies
+    are final, and so are SMTP errors without a reply code (e.g. the server offers
+    no STARTTLS or AUTH): retrying would only get the same answer.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # smtplib.SMTPException subclasses OSError, so it has to be ruled out first
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def _backoff(attempt):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _mark_sent(job, refused):
+    """Move the record to sent (one store transition) and mirror it to the sent directory."""
+    record = job["record"]
+    now = datetime.now(timezone.utc)
+    sent = nrs_queue.transition(
+        record["id"], "approved", "sent",
+        sent_at=now.isoformat(),
+        sent_to=[r for r in job["recipients"] if r not in refused],
+        refused={address: list(reply) for address, reply in refused.items()} or None,
+        message_id=job["message_id"],
+        follow_up_date=(now + timedelta(days=FOLLOW_UP_DAYS)).isoformat() if record.get("follow_up_date") else None,
+        send_error=None,
+        claim=None,
+    )
+    if sent is None:
+        return None
+    nrs_queue.export_record(sent)
+    approved_file = Path(nrs_queue.EXPORT_DIRS["approved"]) / sent["filename"]
+    if approved_file.exists():
+        approved_file.unlink()
+    return sent
+
+
+def _mark_failed(job, error):
+    """Leave the record approved, with the error, so it waits FAILED_RETRY_HOURS (see _retry_due)."""
+    nrs_queue.update(job["record"]["id"], send_error=str(error),
+                     send_failed_at=datetime.now(timezone.utc).isoformat(),
+                     send_failures=job["record"].get("send_failures", 0) + 1, claim=None)
+
+
+def _retry_due(record, retry_failed, now):
+    """Whether a letter that failed before may be sent again now."""
+    if retry_failed:
+        return True
+    if record.get("send_failures", 1) >= MAX_SEND_FAILURES:
+        return False
+    try:
+        failed_at = datetime.fromisoformat(record.get("send_failed_at") or "")
+    except ValueError:
+        return True
+    return now - failed_at >= timedelta(hours=FAILED_RETRY_HOURS)
+
+
+def _worker(queue, config, results, lock):
+    session = _SmtpSession(config)
+    try:
+        while True:
+            job = queue.get()
+            if job is None:
+                break
+            try:
+                refused = session.send(job["message"], job["recipients"])
+            except Exception as e:
+                if not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)):
+                    session.reset()
+                job["attempts"] += 1
+                if _is_transient(e) and job["attempts"] < MAX_ATTEMPTS:
+                    with lock:
+                        results["retries"] += 1
+                    queue.retry(job, _backoff(job["attempts"]))
+                    continue
+                _mark_failed(job, e)
+                with lock:
+                    results["failed"].append((job["record"], str(e)))
+                print(f"    Send failed: {job['record']['company']} (#{job['record']['id']}) — {e}")
+                queue.done()
+                continue
+            sent = _mark_sent(job, refused)
+            with lock:
+                if sent is not None:
+                    results["sent"].append(sent)
+            if sent is not None:
+                print(f"    Sent: {sent['company']} -> {', '.join(sent['sent_to'])}")
+            queue.done()
+    finally:
+        session.close()
+        with lock:
+            results["sessions"] += session.opened
+
+
+def _prepare(records, config, token, retry_failed=False):
+    """Claim approved records and build their messages. Returns (jobs, skipped)."""
+    jobs, skipped = [], {"claimed_elsewhere": 0, "no_recipients": 0, "failed_before": 0}
+    sender_domain = _recipient_domain(config["from_email"])
+    now = datetime.now(timezone.utc)
+    for record in records:
+        if record.get("send_error") and not _retry_due(record, retry_failed, now):
+            skipped["failed_before"] += 1
+            continue
+        recipients = _recipients(record)
+        if not recipients:
+            skipped["no_recipients"] += 1
+            continue
+        claimed = nrs_queue.claim(record["id"], "approved", token, lease_seconds=CLAIM_LEASE_SECONDS)
+        if claimed is None:
+            skipped["claimed_elsewhere"] += 1
+            continue
+        message_id = make_msgid(domain=sender_domain)
+        jobs.append({
+            "record": claimed,
+            "recipients": recipients,
+            "domain": _recipient_domain(recipients[0]),
+            "message_id": message_id,
+            "message": build_message(claimed, config, recipients, message_id),
+            "attempts": 0,
+        })
+    return jobs, skipped
+
+
+def run(limit=None, connections=SEND_CONNECTIONS, interval=DOMAIN_INTERVAL, config=None, retry_failed=False):
+    """
+    Send approved outreach.
+
+    Picks up Governor approvals from the directories first, then sends every
+    approved letter not already claimed by another sender. Letters that failed
+    are retried after FAILED_RETRY_HOURS (up to MAX_SEND_FAILURES failures),
+    or right away with `retry_failed`.
+
+    Returns:
+        List of sent records
+    """
+    started = time.monotonic()
+    RUN_STATS.clear()
+    config = config or _load_email_config()
+    if not config or not config.get("smtp_host"):
+        print("[nrs_sender] Email not configured — nothing sent")
+        RUN_STATS.update({"approved": 0, "sent": 0, "failed": 0, "error": "email not configured"})
+        return []
+
+    nrs_queue.import_dirs()
+    records = nrs_queue.find(status="approved", limit=limit)
+    jobs, skipped = _prepare(records, config, uuid.uuid4().hex, retry_failed)
+    results = {"sent": [], "failed": [], "retries": 0, "sessions": 0}
+
+    if jobs:
+        print(f"[nrs_sender] Sending {len(jobs)} letter(s) over "
+              f"{min(connections, len(jobs))} SMTP session(s)...")
+        queue = _SendQueue(jobs, interval)
+        lock = threading.Lock()
+        threads = [threading.Thread(target=_worker, args=(queue, config, results, lock), daemon=True)
+                   for _ in range(max(1, min(connections, len(jobs))))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    RUN_STATS.update({
+        "approved": len(records),
+        "sent": len(results["sent"]),
+        "failed": len(results["failed"]),
+        "retries": results["retries"],
+        "sessions": results["sessions"],
+        "skipped": skipped,
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+    })
+    return results["sent"]
+
+
+if __name__ == "__main__":
+    sent = run(retry_failed="--retry-failed" in sys.argv)
+    print(f"[nrs_sender] {RUN_STATS.get('sent', 0)} sent | {RUN_STATS.get('failed', 0)} failed | "
+          f"{RUN_STATS.get('sessions', 0)} SMTP session(s)")
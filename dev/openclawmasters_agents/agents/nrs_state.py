@@ -0,0 +1,443 @@
+"""
+NRS State — Squadron State, Rotation Memory and Run History for NRS v2
+One SQLite (WAL) database replaces state.json (nrs_chief) and
+memory/nrs_store.json (nrs_runner). Counters are incremented in place, each
+scanned domain is one row, and every write is a short BEGIN IMMEDIATE
+transaction, so overlapping runners never lose an update.
+Monthly scan counts reset lazily: a row counted in an earlier month reads as 0.
+The JSON files are imported once, the first time the store is opened.
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+STORE_FILE = Path("memory/nrs_state.db")
+LEGACY_STATE_FILE = Path.home() / ".openclaw" / "squadrons" / "nrs-v2" / "data" / "state.json"
+LEGACY_MEMORY_FILE = Path("memory/nrs_store.json")
+
+DEFAULT_STATE = {
+    "last_run": None,
+    "last_heartbeat": None,
+    "total_scans": 0,
+    "total_findings": 0,
+    "total_outreach_queued": 0,
+    "total_outreach_sent": 0,
+    "status": "initialized",
+}
+# Sprint rotation totals (the old nrs_store.json "stats"), kept next to the state counters
+ROTATION_STATS = {"total_runs": "rotation_runs", "total_findings": "rotation_findings",
+                  "total_sprints": "rotation_sprints"}
+NEVER_SCANNED = "1970-01-01T00:00:00"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    month TEXT,
+    monthly_count INTEGER NOT NULL DEFAULT 0,
+    total_scans INTEGER NOT NULL DEFAULT 0,
+    last_scanned TEXT,
+    last_findings INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS domains_month ON domains (month, monthly_count);
+CREATE INDEX IF NOT EXISTS domains_last_scanned ON domains (last_scanned);
+
+-- Sprint rotation index: one row per configured target in flatten order (id),
+-- with its domain's rotation data copied in so selection is an ordered index walk
+CREATE TABLE IF NOT EXISTS rotation (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    pool TEXT,
+    pool_priority INTEGER NOT NULL,
+    last_scanned TEXT NOT NULL,
+    month TEXT,
+    monthly_count INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rotation_order ON rotation (pool_priority, last_scanned, id);
+CREATE INDEX IF NOT EXISTS rotation_domain ON rotation (domain);
+CREATE INDEX IF NOT EXISTS rotation_cap ON rotation (month, monthly_count);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_kind ON runs (kind, started_at);
+"""
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+def _connect(path=None):
+    """
+    Open the store. Autocommit mode: writers take BEGIN IMMEDIATE themselves so
+    read-modify-write sequences are atomic across processes.
+    """
+    path = Path(path or STORE_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    with _init_lock:
+        if str(path) not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _migrate_json(conn)
+            _initialized.add(str(path))
+    return conn
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def current_month():
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+def _load_json(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _migrate_json(conn):
+    """One-time import of state.json and memory/nrs_store.json (the files are left in place)."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM state WHERE key = 'migrated_json_at'").fetchone():
+            conn.execute("ROLLBACK")
+            return
+        state = _load_json(LEGACY_STATE_FILE) or {}
+        memory = _load_json(LEGACY_MEMORY_FILE) or {}
+        for key, value in state.items():
+            if isinstance(value, (str, int, float)) or value is None:
+                conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+        for name, key in ROTATION_STATS.items():
+            value = (memory.get("stats") or {}).get(name)
+            if value:
+                conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+        month = memory.get("current_month")
+        if month:
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_month', ?)", (month,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO domains (domain, month, monthly_count, total_scans, last_scanned, last_findings) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(domain, month, d.get("monthly_count", 0), d.get("total_scans", 0),
+              d.get("last_scanned"), d.get("last_findings", 0))
+             for domain, d in (memory.get("domains") or {}).items()],
+        )
+        conn.execute("INSERT INTO state (key, value) VALUES ('migrated_json_at', ?)", (_now(),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# --- Squadron state ---
+
+def get_state(path=None):
+    """Squadron state as the dict state.json used to hold."""
+    conn = _connect(path)
+    try:
+        stored = {row["key"]: row["value"] for row in conn.execute("SELECT key, value FROM state")}
+    finally:
+        conn.close()
+    return {key: stored.get(key, default) for key, default in DEFAULT_STATE.items()}
+
+
+def update_state(increments=None, path=None, **values):
+    """
+    Atomically add `increments` ({counter: n}) to counters and set `values`.
+    Returns the updated state.
+    """
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, n in (increments or {}).items():
+                conn.execute(
+                    "INSERT INTO state (key, value) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = COALESCE(value, 0) + excluded.value",
+                    (key, n),
+                )
+            for key, value in values.items():
+                conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return get_state(path)
+
+
+def get_value(key, default=None, path=None):
+    """One stored state value (including keys outside DEFAULT_STATE, e.g. scheduler marks)."""
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+    finally:
+        conn.close()
+
+
+# --- Domain rotation ---
+
+def start_month(path=None):
+    """
+    Mark the current month as started. Returns True the first time a new month is
+    seen (monthly counts of earlier months then read as 0 — no rows are rewritten).
+    """
+    month = current_month()
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM state WHERE key = 'current_month'").fetchone()
+            if row is not None and row["value"] == month:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_month', ?)", (month,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+    finally:
+        conn.close()
+
+
+def _domain_row(row, month):
+    return {
+        "monthly_count": row["monthly_count"] if row["month"] == month else 0,
+        "total_scans": row["total_scans"],
+        "last_scanned": row["last_scanned"],
+        "last_findings": row["last_findings"],
+    }
+
+
+def domain_stats(domains=None, path=None):
+    """Rotation data per scanned domain ({domain: {...}}); `domains` limits the lookup."""
+    month = current_month()
+    conn = _connect(path)
+    try:
+        if domains is None:
+            rows = conn.execute("SELECT * FROM domains").fetchall()
+        else:
+            domains = list(domains)
+            rows = []
+            for i in range(0, len(domains), 500):
+                chunk = domains[i:i + 500]
+                rows += conn.execute(f"SELECT * FROM domains WHERE domain IN ({','.join('?' * len(chunk))})",
+                                     chunk).fetchall()
+        return {row["domain"]: _domain_row(row, month) for row in rows}
+    finally:
+        conn.close()
+
+
+def capped_domains(max_monthly, path=None):
+    """Domains already scanned `max_monthly` times this month."""
+    conn = _connect(path)
+    try:
+        return {row["domain"] for row in conn.execute(
+            "SELECT domain FROM domains WHERE month = ? AND monthly_count >= ?", (current_month(), max_monthly))}
+    finally:
+        conn.close()
+
+
+def record_sprint(domains, findings_count, findings_by_domain=None, path=None):
+    """Count one sprint: a scan for each domain plus the rotation totals, in one transaction."""
+    now, month = _now(), current_month()
+    findings_by_domain = findings_by_domain or {}
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for domain in domains:
+                conn.execute(
+                    "INSERT INTO domains (domain, month, monthly_count, total_scans, last_scanned, last_findings) "
+                    "VALUES (?, ?, 1, 1, ?, ?) "
+                    "ON CONFLICT (domain) DO UPDATE SET "
+                    "monthly_count = CASE WHEN month = excluded.month THEN monthly_count + 1 ELSE 1 END, "
+                    "month = excluded.month, total_scans = total_scans + 1, "
+                    "last_scanned = excluded.last_scanned, last_findings = excluded.last_findings",
+                    (domain, month, now, findings_by_domain.get(domain, 0)),
+                )
+                conn.execute(
+                    "UPDATE rotation SET (month, monthly_count, last_scanned) = "
+                    "(SELECT month, monthly_count, last_scanned FROM domains WHERE domains.domain = rotation.domain) "
+                    "WHERE domain = ?",
+                    (domain,),
+                )
+            for key, n in ((ROTATION_STATS["total_sprints"], 1), (ROTATION_STATS["total_runs"], 1),
+                           (ROTATION_STATS["total_findings"], findings_count)):
+                conn.execute(
+                    "INSERT INTO state (key, value) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = COALESCE(value, 0) + excluded.value",
+                    (key, n),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
+def rotation_stats(path=None):
+    """Sprint totals: {"total_runs", "total_findings", "total_sprints"}."""
+    conn = _connect(path)
+    try:
+        stored = {row["key"]: row["value"] for row in conn.execute(
+            f"SELECT key, value FROM state WHERE key IN ({','.join('?' * len(ROTATION_STATS))})",
+            list(ROTATION_STATS.values()))}
+        month = conn.execute("SELECT value FROM state WHERE key = 'current_month'").fetchone()
+    finally:
+        conn.close()
+    stats = {name: stored.get(key) or 0 for name, key in ROTATION_STATS.items()}
+    stats["current_month"] = month["value"] if month else None
+    return stats
+
+
+def rotation_signature(path=None):
+    """Signature of the targets config the rotation index was built from (None = never built)."""
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT value FROM state WHERE key = 'rotation_signature'").fetchone()
+        return row["value"] if row else None
+    finally:
+        conn.close()
+
+
+def rebuild_rotation(config, signature, path=None):
+    """
+    Rebuild the rotation index from a targets config: pools by priority (ties keep
+    file order), targets in pool order, each with its domain's current rotation data.
+    Settings are stored alongside so selection does not need the config.
+    """
+    pools = sorted(config.get("pools", []), key=lambda p: p.get("priority", 99))
+    rows = []
+    for pool in pools:
+        for target in pool.get("targets", []):
+            rows.append((len(rows), target["domain"], pool.get("id", "unknown"), pool.get("priority", 99),
+                         json.dumps(target, ensure_ascii=False)))
+    conn = _connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rotation")
+            conn.executemany(
+                "INSERT INTO rotation (id, domain, pool, pool_priority, last_scanned, data) "
+                "VALUES (?, ?, ?, ?, '" + NEVER_SCANNED + "', ?)",
+                rows,
+            )
+            conn.execute(
+                "UPDATE rotation SET (month, monthly_count, last_scanned) = "
+                "(SELECT month, monthly_count, COALESCE(last_scanned, ?) FROM domains "
+                "WHERE domains.domain = rotation.domain) "
+                "WHERE domain IN (SELECT domain FROM domains)",
+                (NEVER_SCANNED,),
+            )
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('rotation_signature', ?)", (signature,))
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('rotation_settings', ?)",
+                         (json.dumps(config.get("settings", {})),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def rotation_settings(path=None):
+    """The targets config settings the rotation index was built with."""
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT value FROM state WHERE key = 'rotation_settings'").fetchone()
+        return json.loads(row["value"]) if row else {}
+    finally:
+        conn.close()
+
+
+def next_targets(batch_size, max_monthly, exclude=(), path=None):
+    """
+    The next `batch_size` targets: lowest pool priority, then longest since
+    scanned, then config order — skipping domains at `max_monthly` scans this
+    month and domains in `exclude` (e.g. being scanned by an overlapping sprint).
+    Walks the rotation_order index, so cost grows with the batch, not the pool.
+    Returns (fresh target dicts with "pool", targets capped).
+    """
+    month = current_month()
+    exclude = sorted(exclude)
+    excluded = f" AND domain NOT IN ({','.join('?' * len(exclude))})" if exclude else ""
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT pool, data FROM rotation WHERE NOT (month IS ? AND monthly_count >= ?)" + excluded +
+            " ORDER BY pool_priority, last_scanned, id LIMIT ?",
+            (month, max_monthly, *exclude, batch_size),
+        ).fetchall()
+        capped = conn.execute("SELECT COUNT(*) FROM rotation WHERE month = ? AND monthly_count >= ?",
+                              (month, max_monthly)).fetchone()[0]
+    finally:
+        conn.close()
+    return [dict(json.loads(row["data"]), pool=row["pool"]) for row in rows], capped
+
+
+# --- Run history ---
+
+def log_run(kind, run_log, path=None):
+    """Append a run ("pipeline", "sprint", "send", ...) to the history. Returns its id."""
+    conn = _connect(path)
+    try:
+        cursor = conn.execute(
+            "INSERT INTO runs (kind, started_at, finished_at, status, data) VALUES (?, ?, ?, ?, ?)",
+            (kind, run_log.get("started_at") or run_log.get("timestamp") or _now(),
+             run_log.get("finished_at"), run_log.get("status"), json.dumps(run_log, default=str)),
+        )
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def recent_runs(kind=None, limit=10, path=None):
+    """Latest runs, newest first."""
+    sql = "SELECT * FROM runs"
+    params = []
+    if kind:
+        sql += " WHERE kind = ?"
+        params.append(kind)
+    sql += " ORDER BY started_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    conn = _connect(path)
+    try:
+        return [dict(json.loads(row["data"]), id=row["id"], kind=row["kind"]) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    state = get_state()
+    print(f"[nrs_state] status {state['status']} | scans {state['total_scans']} | "
+          f"findings {state['total_findings']} | queued {state['total_outreach_queued']} | "
+          f"sent {state['total_outreach_sent']}")
+    if "--runs" in sys.argv:
+        for run in recent_runs(limit=20):
+            print(f"  #{run['id']} {run['kind']} {run.get('started_at') or run.get('timestamp')} {run.get('status')}")
@@ -6,19 +6,26 @@ Ejecuta sprints NRS con rotacion inteligente de targets.
 
 import sys
 import json
+import math
+import multiprocessing
+import random
+import signal
+import socket
+import threading
 import time
-import traceback
 from datetime import datetime, timezone
+from multiprocessing.connection import wait
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from agents.nrs_chief import run_pipeline, heartbeat, status, _load_targets_config
+from agents.nrs_chief import run_pipeline, heartbeat, status, _load_targets_config, TARGETS_FILE
+from agents import nrs_state
 
 
 LOG_DIR = Path.home() / ".openclaw" / "squadrons" / "nrs-v2" / "logs"
-MEMORY_FILE = Path("memory/nrs_store.json")
+MEMORY_FILE = nrs_state.STORE_FILE  # rotation memory (memory/nrs_store.json is migrated once)
 
 
 def setup():
@@ -40,136 +47,78 @@ def log_run(run_data):
 
 # --- Memory Management ---
 
-def _load_memory():
-    """Load sprint rotation memory."""
-    if MEMORY_FILE.exists():
-        with open(MEMORY_FILE) as f:
-            return json.load(f)
+def _load_memory(domains=None):
+    """Sprint rotation memory from the state store (`domains` limits the domain lookup)."""
+    stats = nrs_state.rotation_stats()
     return {
-        "current_month": None,
-        "domains": {},
-        "stats": {"total_runs": 0, "total_findings": 0, "total_sprints": 0},
+        "current_month": stats.pop("current_month"),
+        "domains": nrs_state.domain_stats(domains),
+        "stats": stats,
     }
 
 
-def _save_memory(memory):
-    """Persist sprint rotation memory."""
-    with open(MEMORY_FILE, "w") as f:
-        json.dump(memory, f, indent=2, default=str)
+def _reset_monthly_if_needed():
+    """Start a new month's scan counts (counts of earlier months simply stop counting)."""
+    if nrs_state.start_month():
+        print(f"  New month ({nrs_state.current_month()}) — resetting monthly scan counts")
 
 
-def _reset_monthly_if_needed(memory):
-    """Reset monthly counts when a new month starts."""
-    current_month = datetime.now(timezone.utc).strftime("%Y-%m")
-    if memory.get("current_month") != current_month:
-        print(f"  New month ({current_month}) — resetting monthly scan counts")
-        for domain_data in memory.get("domains", {}).values():
-            domain_data["monthly_count"] = 0
-        memory["current_month"] = current_month
-        _save_memory(memory)
-    return memory
+# --- Sprint Target Selection ---
 
+def _targets_signature():
+    """Cheap change marker for targets.json (mtime + size)."""
+    try:
+        st = TARGETS_FILE.stat()
+    except OSError:
+        return "missing"
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _rotation_settings():
+    """Rebuild the rotation index if targets.json changed since it was built. Returns settings."""
+    signature = _targets_signature()
+    if nrs_state.rotation_signature() != signature:
+        count = nrs_state.rebuild_rotation(_load_targets_config(), signature)
+        print(f"  Rotation index rebuilt: {count} targets")
+    return nrs_state.rotation_settings()
 
-# --- Sprint Target Selection ---
 
-def _select_sprint_targets():
+def _select_sprint_targets(exclude=()):
     """
     Pick next batch of targets using round-robin across prioritized pools.
 
     Logic:
-    1. Load all targets from all pools (sorted by pool priority)
-    2. Filter out targets that hit monthly scan cap (2x default)
-    3. Sort remaining: pool priority ASC, then oldest-scanned first
-    4. Pick top `batch_size` targets
-
-    Returns list of target dicts.
+    1. Targets of all pools live in a persistent rotation index (rebuilt only
+       when targets.json changes), ordered by pool priority ASC, then
+       oldest-scanned first, then config order
+    2. Targets that hit the monthly scan cap (2x default) are skipped
+    3. The first `batch_size` are picked — an index walk, not a full sort
+       (domains in `exclude`, e.g. held by an overlapping sprint, are passed over)
+
+    Returns list of target dicts (copies; the config is never modified).
     """
-    memory = _load_memory()
-    memory = _reset_monthly_if_needed(memory)
+    _reset_monthly_if_needed()
 
-    config = _load_targets_config()
-    settings = config.get("settings", {})
+    settings = _rotation_settings()
     max_monthly = settings.get("max_scans_per_target_monthly", 2)
     batch_size = settings.get("batch_size", 3)
 
-    # Flatten all pools sorted by priority
-    all_targets = []
-    for pool in sorted(config.get("pools", []), key=lambda p: p.get("priority", 99)):
-        pool_id = pool.get("id", "unknown")
-        for target in pool.get("targets", []):
-            target["_pool"] = pool_id
-            target["_pool_priority"] = pool.get("priority", 99)
-            all_targets.append(target)
-
-    if not all_targets:
-        return []
-
-    # Filter: exclude targets at monthly cap
-    available = []
-    capped = 0
-    for t in all_targets:
-        domain = t["domain"]
-        domain_data = memory.get("domains", {}).get(domain, {})
-        monthly_count = domain_data.get("monthly_count", 0)
-        if monthly_count < max_monthly:
-            t["_last_scanned"] = domain_data.get("last_scanned", "1970-01-01T00:00:00")
-            t["_monthly_count"] = monthly_count
-            available.append(t)
-        else:
-            capped += 1
-
+    selected, capped = nrs_state.next_targets(batch_size, max_monthly, exclude)
     if capped:
         print(f"  {capped} targets at monthly cap ({max_monthly}x)")
 
-    if not available:
-        return []
-
-    # Sort: pool priority ASC, then oldest-scanned first (round-robin effect)
-    available.sort(key=lambda t: (t["_pool_priority"], t["_last_scanned"]))
-
-    # Pick batch
-    selected = available[:batch_size]
-
-    # Clean internal fields before returning
-    for t in selected:
-        t.pop("_pool", None)
-        t.pop("_pool_priority", None)
-        t.pop("_last_scanned", None)
-        t.pop("_monthly_count", None)
-
     return selected
 
 
-def _record_sprint(targets, findings_count):
-    """Record sprint results in memory."""
-    memory = _load_memory()
-    now = datetime.now(timezone.utc).isoformat()
-
-    for t in targets:
-        domain = t["domain"]
-        if domain not in memory["domains"]:
-            memory["domains"][domain] = {
-                "monthly_count": 0,
-                "total_scans": 0,
-                "last_scanned": None,
-                "last_findings": 0,
-            }
-        memory["domains"][domain]["monthly_count"] += 1
-        memory["domains"][domain]["total_scans"] += 1
-        memory["domains"][domain]["last_scanned"] = now
-
-    memory["stats"]["total_sprints"] = memory["stats"].get("total_sprints", 0) + 1
-    memory["stats"]["total_findings"] = (
-        memory["stats"].get("total_findings", 0) + findings_count
-    )
-    memory["stats"]["total_runs"] = memory["stats"].get("total_runs", 0) + 1
-    _save_memory(memory)
+def _record_sprint(targets, findings_count, findings_by_domain=None):
+    """Record sprint results in memory and the rotation index (one transaction)."""
+    nrs_state.record_sprint([t["domain"] for t in targets], findings_count, findings_by_domain)
 
 
 # --- Sprint Execution ---
 
-def execute():
-    """Execute a single NRS sprint (3 targets from pool rotation)."""
+def execute(targets=None):
+    """Execute a single NRS sprint (3 targets from pool rotation, unless `targets` are given)."""
     setup()
 
     print("\n" + "-" * 50)
@@ -177,7 +126,8 @@ def execute():
     print("-" * 50)
 
     # Select targets for this sprint
-    targets = _select_sprint_targets()
+    if targets is None:
+        targets = _select_sprint_targets()
 
     if not targets:
         print("  All targets at monthly cap. Add more targets or wait for next month.")
@@ -189,8 +139,9 @@ def execute():
     # Run pipeline with selected targets
     run_log = run_pipeline(targets=targets)
 
-    # Record results in memory
-    _record_sprint(targets, run_log.get("findings_total", 0))
+    # Record results in memory (a failed run didn't scan: its targets stay due)
+    if run_log.get("status") != "failed":
+        _record_sprint(targets, run_log.get("findings_total", 0), run_log.get("findings_by_domain"))
 
     # Save run log
     log_path = log_run(run_log)
@@ -199,6 +150,275 @@ def execute():
     return run_log
 
 
+def follow_up_step():
+    """Queue follow-ups that came due (cheap: reads only store changes since last cycle)."""
+    from agents.nrs_followup import run as follow_up, RUN_STATS as follow_up_stats
+    try:
+        queued = follow_up()
+    except Exception as e:
+        print(f"  Follow-up step failed: {e}")
+        return []
+    print(f"  Follow-ups: {len(queued)} queued | {follow_up_stats['index_size']} scheduled | "
+          f"next due: {follow_up_stats['next_due'] or 'none'}")
+    return queued
+
+
+def send_step(retry_failed=False):
+    """Send Governor-approved outreach over pooled SMTP sessions."""
+    from agents.nrs_chief import send
+    try:
+        return send(retry_failed=retry_failed)
+    except Exception as e:
+        print(f"  Send step failed: {e}")
+        return None
+
+
+# --- Loop Scheduler ---
+
+SCHEDULE_POLL_SECONDS = 300     # upper bound on one scheduler sleep
+RETRY_BASE_SECONDS = 60         # first retry of a failed sprint
+RETRY_MAX_SECONDS = 30 * 60
+MAX_SPRINT_ATTEMPTS = 4
+
+
+def _schedule_settings(interval_hours=None):
+    """
+    Loop schedule from targets.json settings: sprints_per_day (default 5),
+    schedule_jitter_minutes (10), max_concurrent_sprints (2) and
+    max_catch_up_sprints (one day's worth). --interval=H overrides sprints_per_day.
+    """
+    settings = _load_targets_config().get("settings", {})
+    interval = interval_hours * 3600 if interval_hours else 86400 / settings.get("sprints_per_day", 5)
+    return {
+        "interval": interval,
+        "jitter": min(settings.get("schedule_jitter_minutes", 10) * 60, interval / 2),
+        "max_concurrent": max(1, settings.get("max_concurrent_sprints", 2)),
+        "max_catch_up": settings.get("max_catch_up_sprints", max(1, round(86400 / interval))),
+    }
+
+
+def _sprint_process(targets):
+    """Child process for one scheduled sprint; exit status 0 only when the sprint completed."""
+    run_log = execute(targets)
+    sys.exit(1 if run_log.get("status") == "failed" else 0)
+
+
+def _slot_label(slot):
+    return datetime.fromtimestamp(slot, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+class SprintScheduler:
+    """
+    Loop mode without drift. Sprint slots sit on a fixed wall-clock grid (every
+    `interval` seconds since the epoch, so 5/day is 00:00, 04:48, 09:36 ... UTC),
+    each delayed by a jitter derived from the slot itself, so it survives restarts.
+
+    Slots are done through a persisted watermark (state key
+    scheduler_done_through): after downtime the missed slots run at once (at
+    most max_catch_up; older ones are skipped). A failed sprint is retried on
+    the same targets with bounded exponential backoff. Sprints run in child processes, up to
+    max_concurrent at a time, on disjoint targets. The follow-up and send steps
+    after a completed sprint run in a worker thread (one at a time; sprints that
+    finish meanwhile share the next run), which keeps the follow-up index warm
+    between sprints without blocking the loop. SIGHUP reloads the settings
+    and keeps the watermark.
+    """
+
+    def __init__(self, interval_hours=None, send=False):
+        self.interval_hours = interval_hours
+        self.send = send
+        self.settings = _schedule_settings(interval_hours)
+        self.done_through = nrs_state.get_value("scheduler_done_through")
+        if self.done_through is None:
+            # First start: the current slot is due, history is not
+            self.done_through = self._slot_at(time.time()) - self.settings["interval"]
+        self.completed = set()   # finished slots past the watermark
+        self.running = {}        # slot -> (process, targets, attempt)
+        self.retries = {}        # slot -> (retry_at, attempt, targets)
+        self.steps = None        # worker thread running the post-sprint steps
+        self.steps_due = False   # a sprint completed since the steps last started
+        self._context = multiprocessing.get_context("spawn")
+        self._waker_r, self._waker_w = socket.socketpair()
+        self._waker_r.setblocking(False)
+        self._reload = False
+        self._stop = False
+
+    def _slot_at(self, ts):
+        return math.floor(ts / self.settings["interval"]) * self.settings["interval"]
+
+    def _jitter(self, slot):
+        return random.Random(int(slot)).uniform(0, self.settings["jitter"])
+
+    def _signal(self, signum, frame):
+        if signum == getattr(signal, "SIGHUP", None):
+            self._reload = True
+        else:
+            self._stop = True
+        try:
+            self._waker_w.send(b"x")
+        except OSError:
+            pass
+
+    def _reload_settings(self):
+        self._reload = False
+        self.settings = _schedule_settings(self.interval_hours)
+        # Slots of the old grid that finished move the watermark; in-flight ones just finish
+        self.done_through = max([self.done_through] + list(self.completed))
+        self.completed.clear()
+        nrs_state.update_state(scheduler_done_through=self.done_through)
+        print(f"  [scheduler] Reloaded: every {self.settings['interval'] / 3600:.2f}h, "
+              f"up to {self.settings['max_concurrent']} at once")
+
+    def _pending(self, now):
+        """Grid slots past the watermark up to now that are not started, waiting or done."""
+        interval = self.settings["interval"]
+        first = self._slot_at(self.done_through) + interval
+        last = self._slot_at(now)
+        missed = int(round((last - first) / interval)) + 1
+        if missed > self.settings["max_catch_up"]:
+            skip_to = last - self.settings["max_catch_up"] * interval
+            print(f"  [scheduler] Skipping {missed - self.settings['max_catch_up']} missed slot(s) "
+                  f"before {_slot_label(skip_to + interval)}")
+            self.done_through = skip_to
+            nrs_state.update_state(scheduler_done_through=skip_to)
+            first = skip_to + interval
+        slots = []
+        slot = first
+        while slot <= last:
+            if slot not in self.completed and slot not in self.running and slot not in self.retries:
+                slots.append(slot)
+            slot += interval
+        return slots
+
+    def _finish(self, slot):
+        self.completed.add(slot)
+        interval = self.settings["interval"]
+        while self._slot_at(self.done_through) + interval in self.completed:
+            self.done_through = self._slot_at(self.done_through) + interval
+            self.completed.discard(self.done_through)
+        nrs_state.update_state(scheduler_done_through=self.done_through)
+
+    def _held_domains(self):
+        """Domains of running sprints and of failed ones waiting for their retry."""
+        held = [targets for _, targets, _ in self.running.values()]
+        held += [targets for _, _, targets in self.retries.values()]
+        return {t["domain"] for targets in held for t in targets}
+
+    def _start(self, slot, attempt, targets=None):
+        if targets is None:
+            targets = _select_sprint_targets(exclude=self._held_domains())
+        if not targets:
+            print(f"  [scheduler] Slot {_slot_label(slot)}: all targets capped or busy")
+            self._finish(slot)
+            return
+        process = self._context.Process(target=_sprint_process, args=(targets,))
+        process.start()
+        self.running[slot] = (process, targets, attempt)
+        print(f"  [scheduler] Slot {_slot_label(slot)} started (attempt {attempt + 1}, pid {process.pid}): "
+              f"{', '.join(t['domain'] for t in targets)}")
+
+    def _post_sprint_steps(self):
+        try:
+            follow_up_step()
+            if self.send:
+                send_step()
+        finally:
+            try:
+                self._waker_w.send(b"x")  # wake the loop to reap this thread
+            except OSError:
+                pass
+
+    def _start_steps(self):
+        self.steps_due = False
+        self.steps = threading.Thread(target=self._post_sprint_steps, name="nrs-post-sprint")
+        self.steps.start()
+
+    def _reap(self):
+        if self.steps is not None and not self.steps.is_alive():
+            self.steps.join()
+            self.steps = None
+        for slot, (process, targets, attempt) in list(self.running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self.running[slot]
+            if process.exitcode == 0:
+                self._finish(slot)
+                self.steps_due = True
+            elif self._stop:
+                # Interrupted on shutdown: the slot stays open and is caught up on restart
+                print(f"  [scheduler] Slot {_slot_label(slot)} interrupted; it runs again on restart")
+            elif attempt + 1 < MAX_SPRINT_ATTEMPTS:
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+                self.retries[slot] = (time.time() + delay, attempt + 1, targets)
+                print(f"  [scheduler] Slot {_slot_label(slot)} failed (exit {process.exitcode}); "
+                      f"retrying in {delay:.0f}s")
+            else:
+                print(f"  [scheduler] Slot {_slot_label(slot)} failed {attempt + 1} time(s); giving up")
+                self._finish(slot)
+        if self.steps_due and self.steps is None and not self._stop:
+            self._start_steps()
+
+    def _tick(self, now):
+        """Start what is due (oldest slot first) within the concurrency cap. Returns seconds to sleep."""
+        pending = [s for s in self._pending(now) if s + self._jitter(s) <= now]
+        retrying = [s for s, (at, _, _) in self.retries.items() if at <= now]
+        for slot in sorted(pending + retrying):
+            if len(self.running) >= self.settings["max_concurrent"]:
+                break
+            _, attempt, targets = self.retries.pop(slot, (None, 0, None))
+            self._start(slot, attempt, targets)
+
+        upcoming = [s + self._jitter(s) for s in self._pending(now) if s + self._jitter(s) > now]
+        next_slot = self._slot_at(now) + self.settings["interval"]
+        upcoming.append(next_slot + self._jitter(next_slot))
+        upcoming += [at for at, _, _ in self.retries.values()]
+        if len(self.running) >= self.settings["max_concurrent"]:
+            upcoming = [now + SCHEDULE_POLL_SECONDS]  # nothing can start until a sprint exits
+        return max(0.0, min(min(upcoming) - now, SCHEDULE_POLL_SECONDS))
+
+    def _drain_waker(self):
+        try:
+            while self._waker_r.recv(64):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def run(self):
+        """Run until SIGTERM/SIGINT; running sprints are waited for."""
+        for name in ("SIGHUP", "SIGTERM", "SIGINT"):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self._signal)
+        print(f"  Loop mode: {86400 / self.settings['interval']:.1f} sprints/day "
+              f"(every {self.settings['interval'] / 3600:.2f}h, jitter up to "
+              f"{self.settings['jitter'] / 60:.0f} min, {self.settings['max_concurrent']} at once)")
+        print(f"  Done through slot {_slot_label(self.done_through)}. SIGHUP reloads, Ctrl+C stops\n")
+
+        while not self._stop:
+            if self._reload:
+                self._reload_settings()
+            self._reap()
+            sleep = self._tick(time.time())
+            sentinels = [process.sentinel for process, _, _ in self.running.values()]
+            wait(sentinels + [self._waker_r], timeout=sleep)
+            self._drain_waker()
+
+        if self.running:
+            print(f"\n  Waiting for {len(self.running)} running sprint(s)...")
+            for process, _, _ in self.running.values():
+                process.join()
+            self._reap()
+        if self.steps is not None:
+            print("\n  Waiting for the follow-up/send steps...")
+            self.steps.join()
+            self.steps = None
+        if self.steps_due:
+            # Sprints that completed during shutdown still get their follow-ups queued
+            self._start_steps()
+            self.steps.join()
+        print("\n  Scheduler stopped.")
+
+
 def _show_memory():
     """Display sprint rotation memory stats."""
     memory = _load_memory()
@@ -250,7 +470,7 @@ def _show_memory():
 def main():
     """Main entry point with CLI flags."""
     if "--heartbeat" in sys.argv or "-hb" in sys.argv:
-        hb = heartbeat()
+        hb = heartbeat(force="--fresh" in sys.argv)
         log_path = log_run(hb)
         print(f"  Log: {log_path}")
         return
@@ -263,33 +483,26 @@ def main():
         _show_memory()
         return
 
+    if "--followups" in sys.argv:
+        follow_up_step()
+        return
+
+    if "--send" in sys.argv and "--loop" not in sys.argv:
+        send_step(retry_failed="--retry-failed" in sys.argv)
+        return
+
     # Default: run one sprint
     if "--loop" not in sys.argv:
         execute()
         return
 
-    # Loop mode: run every N hours
-    interval_hours = 4
+    # Loop mode: wall-clock sprint slots (sprints_per_day, or every --interval=H hours)
+    interval_hours = None
     for arg in sys.argv:
         if arg.startswith("--interval="):
-            interval_hours = int(arg.split("=")[1])
-
-    print(f"  Loop mode: sprinting every {interval_hours} hours")
-    print("  Press Ctrl+C to stop\n")
+            interval_hours = float(arg.split("=")[1])
 
-    while True:
-        try:
-            execute()
-            print(f"\n  Next sprint in {interval_hours} hours...")
-            time.sleep(interval_hours * 3600)
-        except KeyboardInterrupt:
-            print("\n\nStopped by user.")
-            break
-        except Exception as e:
-            print(f"\n  ERROR: {e}")
-            traceback.print_exc()
-            print(f"  Retrying in {interval_hours} hours...")
-            time.sleep(interval_hours * 3600)
+    SprintScheduler(interval_hours, send="--send" in sys.argv).run()
 
 
 if __name__ == "__main__":
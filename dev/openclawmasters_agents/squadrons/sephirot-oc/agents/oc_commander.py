@@ -249,8 +249,11 @@ def _save_run_state(state, run_log):
 
 # --- Heartbeat ---
 
-def heartbeat():
-    """Daily heartbeat check — verify all agents and services available."""
+def heartbeat(force=False):
+    """
+    Daily heartbeat check — verify all agents and services available.
+    LLM probes are cheap and cached (agents.health); `force` re-probes.
+    """
     print("\n" + "=" * 60)
     print("  Sephirot Agent OC — Heartbeat")
     print(f"  {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
@@ -266,18 +269,18 @@ def heartbeat():
         "issues": [],
     }
 
-    # Check agent imports
+    # Check agent files (oc_runner loads them by path; no import needed here)
     agents = ["oc_scanner", "oc_signal_filter", "oc_ranker", "oc_email_synth"]
     for agent_name in agents:
-        try:
-            __import__(f"agents.{agent_name}")
+        spec_path = Path(__file__).parent / f"{agent_name}.py"
+        if spec_path.exists():
             hb["agents"][agent_name] = "available"
             print(f"  {agent_name}: available")
-        except ImportError as e:
-            hb["agents"][agent_name] = f"error: {e}"
-            hb["issues"].append(f"{agent_name} import failed: {e}")
+        else:
+            hb["agents"][agent_name] = f"error: {spec_path.name} not found"
+            hb["issues"].append(f"{agent_name} not found")
             hb["status"] = "degraded"
-            print(f"  {agent_name}: ERROR — {e}")
+            print(f"  {agent_name}: ERROR — {spec_path.name} not found")
 
     # Check Tavily API key
     tavily_key = os.environ.get("TAVILY_API_KEY")
@@ -286,12 +289,14 @@ def heartbeat():
         hb["issues"].append("TAVILY_API_KEY not set — will use Google News RSS fallback")
     print(f"  Tavily: {'configured' if tavily_key else 'NOT CONFIGURED (fallback mode)'}")
 
-    # Check LLM
+    # Check LLM providers (parallel model-list probes, cached)
     try:
-        from agents.llm import generate
-        llm_ok = generate("Say OK", max_tokens=5, temperature=0) is not None
-    except Exception:
-        llm_ok = False
+        from agents import health
+        probes = health.probe(health.llm_checks(), force=force)
+    except Exception as e:
+        probes = {"llm": {"ok": False, "detail": str(e)}}
+    llm_ok = any(result["ok"] for result in probes.values())
+    hb["probes"] = probes
     hb["services"]["llm"] = "available" if llm_ok else "unavailable"
     if not llm_ok:
         hb["issues"].append("LLM provider unavailable")
@@ -5,7 +5,7 @@ Executes the daily intelligence pipeline: scan → filter → rank → email.
 Usage:
     python oc_runner.py                 # Single run (US hot market)
     python oc_runner.py --countries US,CN,UK   # Specific countries
-    python oc_runner.py --heartbeat     # Health check
+    python oc_runner.py --heartbeat     # Health check (cached probes; --fresh to re-probe)
     python oc_runner.py --status        # Show status
     python oc_runner.py --loop          # Run daily in loop mode
     python oc_runner.py --loop --interval=24  # Custom interval (hours)
@@ -120,7 +120,7 @@ def _parse_countries(args):
 def main():
     """Main entry point with CLI flags."""
     if "--heartbeat" in sys.argv or "-hb" in sys.argv:
-        hb = heartbeat()
+        hb = heartbeat(force="--fresh" in sys.argv)
         log_path = log_run(hb)
         print(f"  Log: {log_path}")
         return
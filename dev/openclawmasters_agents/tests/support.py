@@ -0,0 +1,63 @@
+"""
+Shared test fixtures: local stub servers and a scratch working directory.
+Agents keep their state under relative paths (memory/, content/), so every
+test runs from its own temporary directory.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler base for stub servers; silent, with a JSON reply helper."""
+
+    def log_message(self, *args):
+        pass
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def reply(self, status=200, body=b"", content_type="application/json", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(handler):
+    """Start a threaded HTTP server for `handler` on a free local port. Returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class WorkdirTestCase(unittest.TestCase):
+    """TestCase running in a fresh temporary working directory."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        self.workdir = tmp.name
+
+    def start_server(self, handler):
+        """serve() a handler for the duration of the test. Returns its base URL."""
+        server = serve(handler)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return base_url(server)
@@ -0,0 +1,162 @@
+"""LLM gateway against local stub OpenAI-compatible providers."""
+
+import json
+import time
+import unittest
+from unittest import mock
+
+from agents import llm
+from tests.support import StubHandler, serve, base_url
+
+
+def _completion(text, prompt_tokens=7, completion_tokens=3):
+    return {"choices": [{"message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}}
+
+
+def _sse(*events):
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+
+
+def provider_stub():
+    """
+    Handler class for one stub provider. POST /chat/completions answers from
+    `script` (status, body, headers), repeating the last entry; GET /models
+    answers with `models_status`. Requests are recorded.
+    """
+    class Provider(StubHandler):
+        script = [(200, _completion("OK"), {})]
+        models_status = 200
+        requests = []
+
+        def do_POST(self):
+            type(self).requests.append(("POST", self.path, json.loads(self.read_body())))
+            status, body, headers = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+            headers = dict(headers)
+            content_type = headers.pop("Content-Type", "application/json")
+            self.reply(status, body if isinstance(body, str) else json.dumps(body), content_type, headers)
+
+        def do_GET(self):
+            type(self).requests.append(("GET", self.path, None))
+            self.reply(self.models_status, json.dumps({"data": [{"id": "stub-model"}]}))
+
+    return Provider
+
+
+class GatewayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.primary, self.secondary = provider_stub(), provider_stub()
+        providers = {}
+        for name, handler in (("zai", self.primary), ("deepseek", self.secondary)):
+            server = serve(handler)
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+            providers[name] = {"base_url": base_url(server) + "/v1", "api_key": "test-key",
+                               "model": f"{name}-model", "rpm": 6000}
+        patchers = [
+            mock.patch.dict(llm.PROVIDERS, providers, clear=True),
+            mock.patch.dict(llm._limiters, {name: llm._RateLimiter(6000) for name in providers}, clear=True),
+            mock.patch.dict(llm._failed_at, clear=True),
+            mock.patch.object(llm, "PROVIDER_ORDER", ["zai", "deepseek"]),
+            mock.patch.object(llm, "RETRY_BASE_SECONDS", 0.01),
+            mock.patch.object(llm, "CACHE_ENABLED", False),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_retries_429_and_5xx_on_the_same_provider(self):
+        self.primary.script = [(429, {"error": "slow down"}, {"Retry-After": "0"}),
+                               (503, {"error": "overloaded"}, {}),
+                               (200, _completion("Hola", 11, 2), {})]
+
+        self.assertEqual(llm.generate("Say hola", max_tokens=10), "Hola")
+
+        self.assertEqual(len(self.primary.requests), 3)
+        self.assertEqual(self.secondary.requests, [])
+        call = llm.recent_calls(1)[0]
+        self.assertEqual((call["provider"], call["ok"]), ("zai", True))
+        self.assertEqual((call["prompt_tokens"], call["completion_tokens"]), (11, 2))
+        _, path, payload = self.primary.requests[-1]
+        self.assertEqual(path, "/v1/chat/completions")
+        self.assertEqual(payload["model"], "zai-model")
+
+    def test_fails_over_to_the_second_provider(self):
+        self.primary.script = [(500, {"error": "down"}, {})]
+        self.secondary.script = [(200, _completion("From deepseek"), {})]
+
+        self.assertEqual(llm.generate("Say hi"), "From deepseek")
+
+        self.assertEqual(len(self.primary.requests), llm.RETRIES_PER_PROVIDER + 1)
+        calls = llm.recent_calls(2)
+        self.assertEqual([(c["provider"], c["ok"]) for c in calls], [("zai", False), ("deepseek", True)])
+        # The failed provider goes last while it cools down
+        self.assertEqual(llm._provider_order(), ["deepseek", "zai"])
+
+    def test_client_errors_fail_over_without_retrying(self):
+        self.primary.script = [(401, {"error": "bad key"}, {})]
+        self.secondary.script = [(200, _completion("Fallback"), {})]
+
+        self.assertEqual(llm.generate("Say hi"), "Fallback")
+        self.assertEqual(len(self.primary.requests), 1)
+
+    def test_deadline_bounds_retries_and_failover(self):
+        self.primary.script = [(503, {"error": "overloaded"}, {})]
+        self.secondary.script = [(503, {"error": "overloaded"}, {})]
+
+        with mock.patch.object(llm, "RETRY_BASE_SECONDS", 0.4):
+            started = time.monotonic()
+            self.assertIsNone(llm.generate("Say hi", timeout=5, deadline=0.3))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_stream_parses_sse_and_records_reported_usage(self):
+        body = _sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hola"}}]},
+            {"choices": [{"delta": {"content": " mundo"}}]},
+            {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 4}},
+        )
+        self.primary.script = [(200, body, {"Content-Type": "text/event-stream"})]
+
+        self.assertEqual(list(llm.generate_stream("Say hola mundo")), ["Hola", " mundo"])
+
+        _, _, payload = self.primary.requests[0]
+        self.assertTrue(payload["stream"])
+        self.assertEqual(payload["stream_options"], {"include_usage": True})
+        call = llm.recent_calls(1)[0]
+        self.assertTrue(call["ok"] and call["stream"])
+        self.assertEqual((call["prompt_tokens"], call["completion_tokens"]), (12, 4))
+
+    def test_stream_without_usage_records_no_token_count(self):
+        body = _sse({"choices": [{"delta": {"content": "Hola"}}]})
+        self.primary.script = [(200, body, {"Content-Type": "text/event-stream"})]
+
+        self.assertEqual(list(llm.generate_stream("Say hola")), ["Hola"])
+        self.assertIsNone(llm.recent_calls(1)[0]["completion_tokens"])
+
+    def test_stream_fails_over_before_the_first_chunk(self):
+        self.primary.script = [(502, {"error": "bad gateway"}, {})]
+        body = _sse({"choices": [{"delta": {"content": "Backup"}}]})
+        self.secondary.script = [(200, body, {"Content-Type": "text/event-stream"})]
+
+        self.assertEqual(list(llm.generate_stream("Say hi")), ["Backup"])
+        self.assertEqual(len(self.primary.requests), llm.RETRIES_PER_PROVIDER + 1)
+
+    def test_probe_uses_the_models_endpoint(self):
+        self.assertEqual(llm.probe_provider("zai"), (True, "models endpoint"))
+        self.assertEqual(self.primary.requests, [("GET", "/v1/models", None)])
+
+    def test_probe_falls_back_to_a_tiny_completion(self):
+        self.primary.models_status = 404
+
+        self.assertEqual(llm.probe_provider("zai"), (True, "completion"))
+        methods = [method for method, _, _ in self.primary.requests]
+        self.assertEqual(methods, ["GET", "POST"])
+        self.assertEqual(self.primary.requests[1][2]["max_tokens"], 5)
+
+    def test_probe_reports_a_rejected_key(self):
+        self.primary.models_status = 401
+
+        self.assertEqual(llm.probe_provider("zai"), (False, "models endpoint: HTTP 401"))
+        self.assertEqual(len(self.primary.requests), 1)
@@ -0,0 +1,123 @@
+"""scan_github_batch() against a local stub of the GitHub API (GITHUB_API_URL)."""
+
+import json
+import os
+import re
+import urllib.parse
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from unittest import mock
+
+from agents import nrs_scanner
+from tests.support import StubHandler, WorkdirTestCase
+
+
+def _recent():
+    return (datetime.now(timezone.utc) - timedelta(days=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _node(owner, name, description="", pushed_at=None):
+    pushed_at = pushed_at or _recent()
+    return {"nameWithOwner": f"{owner}/{name}", "description": description, "pushedAt": pushed_at,
+            "isArchived": False, "stargazerCount": 0, "url": f"https://github.com/{owner}/{name}",
+            "owner": {"login": owner}}
+
+
+def _item(owner, name, description="", pushed_at=None):
+    pushed_at = pushed_at or _recent()
+    return {"full_name": f"{owner}/{name}", "description": description, "pushed_at": pushed_at,
+            "html_url": f"https://github.com/{owner}/{name}", "owner": {"login": owner}}
+
+
+class GitHubStub(StubHandler):
+    """
+    GraphQL answers every alias with tPago's repos except the ones listed in
+    `failing` (null, as GitHub does for an alias that errored); REST search
+    answers with APAP's repos.
+    """
+    graphql_queries = []
+    rest_queries = []
+    failing = set()
+
+    def do_POST(self):
+        query = json.loads(self.read_body())["query"]
+        type(self).graphql_queries.append(query)
+        data = {}
+        for alias, search in re.findall(r'(c\d+): search\(query: ("(?:[^"\\]|\\.)*")', query):
+            search = json.loads(search)
+            data[alias] = None if any(name in search for name in self.failing) else {"nodes": [
+                _node("tpago", "core", "internal api key store", "2019-01-01T00:00:00Z"),
+                _node("tpago", "web"),
+            ]}
+        self.reply(body=json.dumps({"data": data}))
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        type(self).rest_queries.append(urllib.parse.parse_qs(url.query)["q"][0])
+        self.reply(body=json.dumps({"items": [_item("apap", "portal", "db_password in config"),
+                                              _item("apap", "docs")]}))
+
+
+class ScanGitHubBatchTest(WorkdirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        GitHubStub.graphql_queries, GitHubStub.rest_queries, GitHubStub.failing = [], [], set()
+        url = self.start_server(GitHubStub)
+        patcher = mock.patch.object(nrs_scanner, "GITHUB_API_URL", url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, token="test-token"):
+        patcher = mock.patch.dict(os.environ, {"GITHUB_TOKEN": token})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_graphql_batch_with_rest_fallback(self):
+        self._token()
+        GitHubStub.failing = {"APAP"}
+
+        results = nrs_scanner.scan_github_batch(["tPago", "APAP", "tPago"])
+
+        # One aliased query for both companies; only the failed alias goes to REST
+        self.assertEqual(len(GitHubStub.graphql_queries), 1)
+        self.assertIn("c0: search", GitHubStub.graphql_queries[0])
+        self.assertIn("c1: search", GitHubStub.graphql_queries[0])
+        self.assertEqual(GitHubStub.rest_queries, ["APAP in:name,description,readme"])
+
+        self.assertEqual(list(results), ["tPago", "APAP"])
+        self.assertEqual(sorted(f["finding_type"] for f in results["tPago"]),
+                         ["github_abandoned", "github_sensitive_description"])
+        self.assertEqual([f["finding_type"] for f in results["APAP"]], ["github_sensitive_description"])
+
+        cache = json.loads(Path("memory/github_orgs.json").read_text())
+        self.assertEqual({name: entry["org"] for name, entry in cache.items()},
+                         {"tPago": "tpago", "APAP": "apap"})
+
+    def test_rest_only_without_token(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("GITHUB_TOKEN", None)
+            results = nrs_scanner.scan_github_batch(["APAP"])
+
+        self.assertEqual(GitHubStub.graphql_queries, [])
+        self.assertEqual(GitHubStub.rest_queries, ["APAP in:name,description,readme"])
+        self.assertEqual([f["finding_type"] for f in results["APAP"]], ["github_sensitive_description"])
+
+    def test_cached_org_is_searched_directly(self):
+        self._token()
+        fresh = datetime.now(timezone.utc).isoformat()
+        stale = (datetime.now(timezone.utc) - timedelta(days=nrs_scanner.GITHUB_ORG_CACHE_DAYS + 1)).isoformat()
+        Path("memory").mkdir()
+        Path("memory/github_orgs.json").write_text(json.dumps({
+            "tPago": {"org": "tpago", "resolved_at": fresh},
+            "APAP": {"org": "apap-old", "resolved_at": stale},
+        }))
+
+        nrs_scanner.scan_github_batch(["tPago", "APAP"])
+
+        query = GitHubStub.graphql_queries[0]
+        self.assertIn(json.dumps("user:tpago sort:updated"), query)
+        # A stale mapping is not trusted: the company is searched by name again
+        self.assertNotIn("apap-old", query)
+        self.assertIn(json.dumps("APAP in:name,description,readme sort:updated"), query)
+        self.assertEqual(GitHubStub.rest_queries, [])
@@ -0,0 +1,230 @@
+"""nrs_sender.run() against a socket-level stub SMTP server."""
+
+import email
+import smtplib
+import socketserver
+import threading
+import time
+import unittest
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from unittest import mock
+
+from agents import nrs_queue
+from agents import nrs_sender
+from tests.support import WorkdirTestCase
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Minimal ESMTP server (no TLS, no AUTH). `rcpt_replies` maps an address to
+    replies its RCPT commands get before the server starts accepting it.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.rcpt_commands = []
+        self.messages = []       # (received_at, recipients, parsed message)
+        self.rcpt_replies = {}
+
+    def rcpt_reply(self, address):
+        with self.lock:
+            self.rcpt_commands.append(address)
+            replies = self.rcpt_replies.get(address)
+            return replies.pop(0) if replies else "250 2.1.5 Ok"
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+
+    def write(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.write("220 stub ESMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.write("250-stub\r\n250 8BITMIME" if verb == "EHLO" else "250 stub")
+            elif verb == "MAIL":
+                recipients = []
+                self.write("250 2.1.0 Ok")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>").lower()
+                reply = server.rcpt_reply(address)
+                if reply.startswith("2"):
+                    recipients.append(address)
+                self.write(reply)
+            elif verb == "DATA":
+                self.write("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                with server.lock:
+                    server.messages.append((time.monotonic(), recipients,
+                                            email.message_from_bytes(b"".join(lines))))
+                self.write("250 2.0.0 Ok: queued")
+            elif verb in ("RSET", "NOOP"):
+                self.write("250 2.0.0 Ok")
+            elif verb == "QUIT":
+                self.write("221 2.0.0 Bye")
+                return
+            else:
+                self.write("502 5.5.2 Command not recognized")
+
+
+class SenderTest(WorkdirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.smtp = StubSMTPServer()
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.addCleanup(self.smtp.server_close)
+        self.addCleanup(self.smtp.shutdown)
+        self.config = {"smtp_host": "127.0.0.1", "smtp_port": self.smtp.server_address[1],
+                       "use_tls": False, "from_email": "nrs@openclaw.test"}
+        # The store remembers which files it has initialized, so each test gets its own path
+        patchers = [mock.patch.object(nrs_queue, "STORE_FILE", Path(self.workdir) / nrs_queue.STORE_FILE),
+                    mock.patch.object(nrs_sender, "RETRY_BASE_SECONDS", 0.01),
+                    mock.patch.object(nrs_sender, "RETRY_MAX_SECONDS", 0.05)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _approved(self, company, address, **fields):
+        record = {
+            "company": company,
+            "domain": address.rsplit("@", 1)[1],
+            "finding_type": "ssl_expired",
+            "status": "approved",
+            "letter_es": f"Carta para {company}",
+            "letter_en": f"Letter for {company}",
+            "subject_es": "Observacion",
+            "outreach_targets": [{"role": "CTO", "emails": [address]}],
+        }
+        record.update(fields)
+        return nrs_queue.add(record)
+
+    def _send(self, **options):
+        options.setdefault("interval", 0)
+        return nrs_sender.run(config=self.config, **options)
+
+    def test_messages_share_one_session(self):
+        for i in range(3):
+            self._approved(f"Company {i}", f"cto@company{i}.do")
+
+        sent = self._send(connections=1)
+
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(nrs_sender.RUN_STATS["sessions"], 1)
+
+    def test_mail_to_one_domain_is_spaced(self):
+        self._approved("Banco A", "ti@banco.do")
+        self._approved("Banco B", "cto@banco.do")
+        self._approved("Otra", "cto@otra.do")
+
+        self._send(connections=2, interval=0.3)
+
+        times = {recipients[0]: at for at, recipients, _ in self.smtp.messages}
+        self.assertEqual(len(times), 3)
+        self.assertGreaterEqual(abs(times["ti@banco.do"] - times["cto@banco.do"]), 0.25)
+
+    def test_transient_failure_is_retried_in_the_same_run(self):
+        record = self._approved("Flaky", "cto@flaky.do")
+        self.smtp.rcpt_replies["cto@flaky.do"] = ["451 4.7.1 Greylisted, try again later"]
+
+        sent = self._send()
+
+        self.assertEqual([r["id"] for r in sent], [record["id"]])
+        self.assertEqual(nrs_sender.RUN_STATS["retries"], 1)
+        self.assertEqual(nrs_sender.RUN_STATS["failed"], 0)
+        self.assertEqual(self.smtp.rcpt_commands, ["cto@flaky.do"] * 2)
+
+    def test_failed_letter_is_retried_after_the_cool_off(self):
+        record = self._approved("Flaky", "cto@flaky.do")
+        self.smtp.rcpt_replies["cto@flaky.do"] = ["451 4.3.0 Mailbox busy"] * nrs_sender.MAX_ATTEMPTS
+
+        self.assertEqual(self._send(), [])
+        failed = nrs_queue.get(record["id"])
+        self.assertEqual(failed["status"], "approved")
+        self.assertEqual(failed["send_failures"], 1)
+        self.assertIn("451", failed["send_error"])
+
+        # Within the cool-off the letter is left alone
+        self.assertEqual(self._send(), [])
+        self.assertEqual(nrs_sender.RUN_STATS["skipped"]["failed_before"], 1)
+        self.assertEqual(len(self.smtp.rcpt_commands), nrs_sender.MAX_ATTEMPTS)
+
+        with mock.patch.object(nrs_sender, "FAILED_RETRY_HOURS", 0):
+            sent = self._send()
+        self.assertEqual([r["id"] for r in sent], [record["id"]])
+        self.assertIsNone(sent[0]["send_error"])
+
+    def test_permanent_failure_is_marked_failed(self):
+        record = self._approved("Gone", "nobody@gone.do")
+        self.smtp.rcpt_replies["nobody@gone.do"] = ["550 5.1.1 No such user"]
+
+        self.assertEqual(self._send(), [])
+
+        self.assertEqual(nrs_sender.RUN_STATS["failed"], 1)
+        self.assertEqual(nrs_sender.RUN_STATS["retries"], 0)
+        self.assertEqual(self.smtp.rcpt_commands, ["nobody@gone.do"])
+        failed = nrs_queue.get(record["id"])
+        self.assertEqual(failed["status"], "approved")
+        self.assertIn("550", failed["send_error"])
+        self.assertIsNone(failed.get("claim"))
+
+    def test_sent_letter_moves_to_sent_with_a_fresh_follow_up_date(self):
+        overdue = (datetime.now(timezone.utc) - timedelta(days=3)).isoformat()
+        record = self._approved("Banco", "cto@banco.do", follow_up_date=overdue)
+
+        before = datetime.now(timezone.utc)
+        self._send()
+
+        sent = nrs_queue.get(record["id"])
+        self.assertEqual(sent["status"], "sent")
+        self.assertEqual(sent["sent_to"], ["cto@banco.do"])
+        self.assertIsNone(sent.get("claim"))
+        follow_up_date = datetime.fromisoformat(sent["follow_up_date"])
+        self.assertGreaterEqual(follow_up_date, before + timedelta(days=nrs_sender.FOLLOW_UP_DAYS))
+        self.assertEqual(nrs_queue.counts().get("approved", 0), 0)
+
+        _, _, message = self.smtp.messages[0]
+        self.assertEqual(message["Message-ID"], sent["message_id"])
+        self.assertEqual(message.get_content_type(), "text/plain")
+        self.assertTrue((Path(nrs_queue.EXPORT_DIRS["sent"]) / sent["filename"]).exists())
+
+
+class IsTransientTest(unittest.TestCase):
+
+    def test_classification(self):
+        cases = [
+            (smtplib.SMTPResponseException(421, b"Too busy"), True),
+            (smtplib.SMTPResponseException(554, b"Rejected"), False),
+            (smtplib.SMTPRecipientsRefused({"a@x.do": (450, b"busy")}), True),
+            (smtplib.SMTPRecipientsRefused({"a@x.do": (450, b"busy"), "b@x.do": (550, b"no")}), False),
+            (smtplib.SMTPServerDisconnected("Connection unexpectedly closed"), True),
+            (ConnectionRefusedError(111, "Connection refused"), True),
+            (TimeoutError("timed out"), True),
+            (smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server."), False),
+            (smtplib.SMTPException("No suitable authentication method found."), False),
+        ]
+        for error, transient in cases:
+            with self.subTest(error=repr(error)):
+                self.assertIs(nrs_sender._is_transient(error), transient)